@@ -0,0 +1,91 @@
+"""Key flights on their natural key and fare context
+
+Searches upsert flights on (source_api, flight_number, departure_time,
+arrival_time, currency, passengers, trip_type) instead of inserting a row
+per search, which needs the uq_flights_natural_key constraint. Existing
+rows get the fare context of a one-passenger one-way search and the source
+and currency defaults the app stores; rows that then share a key are
+merged into the newest one, with every reference re-pointed to it.
+
+Checks what is already there, so it also runs on a database that
+create_all built, and on one with the earlier three-column key. Run it
+before starting a version that upserts flights.
+
+Revision ID: 0001_flight_natural_key
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_flight_natural_key"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+KEY = ("source_api", "flight_number", "departure_time", "arrival_time", "currency", "passengers", "trip_type")
+
+# Columns pointing at flights.id; tables a database does not have yet are skipped
+REFERENCES = (
+    ("price_history", "flight_id"),
+    ("bookings", "flight_id"),
+    ("bookings", "return_flight_id"),
+    ("notifications", "related_flight_id"),
+    ("tracked_routes", "last_flight_id"),
+    ("price_alerts", "triggered_flight_id"),
+)
+
+SAME_KEY = " AND ".join(f"keep.{column} = dup.{column}" for column in KEY)
+# Rows with a newer row on the same key; the newest row of each key is kept
+DUPLICATES = f"SELECT dup.id FROM flights dup WHERE EXISTS (SELECT 1 FROM flights keep WHERE {SAME_KEY} AND keep.id > dup.id)"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("flights")}
+    existing = {constraint["name"]: constraint["column_names"] for constraint in inspector.get_unique_constraints("flights")}
+    # A key create_all built from a newer model already covers this one and must not be narrowed
+    covered = set(KEY) <= set(existing.get("uq_flights_natural_key") or ())
+
+    with op.batch_alter_table("flights") as batch:
+        if "passengers" not in columns:
+            batch.add_column(sa.Column("passengers", sa.Integer(), nullable=False, server_default="1"))
+        if "trip_type" not in columns:
+            batch.add_column(sa.Column("trip_type", sa.String(20), nullable=False, server_default="one_way"))
+
+    # NULLs never conflict, so give key columns the values the app writes
+    op.execute("UPDATE flights SET source_api = 'skyscanner' WHERE source_api IS NULL")
+    op.execute("UPDATE flights SET currency = 'USD' WHERE currency IS NULL")
+
+    if not covered:
+        op.create_index("ix_flights_natural_key_dedupe", "flights", list(KEY))
+        for table, column in REFERENCES:
+            if inspector.has_table(table):
+                op.execute(
+                    f"UPDATE {table} SET {column} = ("
+                    f"SELECT MAX(keep.id) FROM flights dup JOIN flights keep ON {SAME_KEY} WHERE dup.id = {table}.{column}"
+                    f") WHERE {column} IN ({DUPLICATES})"
+                )
+        if inspector.has_table("flight_raw_data"):
+            op.execute(f"DELETE FROM flight_raw_data WHERE flight_id IN ({DUPLICATES})")
+        op.execute(f"DELETE FROM flights WHERE id IN ({DUPLICATES})")
+        op.drop_index("ix_flights_natural_key_dedupe", "flights")
+
+        with op.batch_alter_table("flights") as batch:
+            if "uq_flights_natural_key" in existing:
+                batch.drop_constraint("uq_flights_natural_key", type_="unique")
+            batch.create_unique_constraint("uq_flights_natural_key", list(KEY))
+
+    if "ix_price_history_flight_id" not in {index["name"] for index in inspector.get_indexes("price_history")}:
+        op.create_index("ix_price_history_flight_id", "price_history", ["flight_id"])
+
+
+def downgrade() -> None:
+    # Merged duplicates are not split up again
+    op.drop_index("ix_price_history_flight_id", "price_history")
+    with op.batch_alter_table("flights") as batch:
+        batch.drop_constraint("uq_flights_natural_key", type_="unique")
+        batch.drop_column("trip_type")
+        batch.drop_column("passengers")
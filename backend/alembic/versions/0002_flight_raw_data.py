@@ -0,0 +1,91 @@
+"""Move raw flight payloads to the compressed flight_raw_data side table
+
+flights.raw_data held each flight's API data as JSON text, which made every
+flight lookup drag it along. Payloads move, zlib-compressed as
+search_persistence.compress_payload writes them, to flight_raw_data, and
+the column is dropped. Payloads already in the side table are newer and
+are kept.
+
+Checks what is already there, so it also runs on a database where
+create_all made the side table.
+
+Revision ID: 0002_flight_raw_data
+Revises: 0001_flight_natural_key
+Create Date: 2026-10-17
+"""
+import zlib
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_flight_raw_data"
+down_revision = "0001_flight_natural_key"
+branch_labels = None
+depends_on = None
+
+# Flights copied per round trip
+BATCH_SIZE = 1000
+
+flights = sa.table("flights", sa.column("id", sa.Integer), sa.column("raw_data", sa.Text))
+flight_raw_data = sa.table("flight_raw_data", sa.column("flight_id", sa.Integer), sa.column("payload", sa.LargeBinary))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("flight_raw_data"):
+        op.create_table(
+            "flight_raw_data",
+            sa.Column("flight_id", sa.Integer(), sa.ForeignKey("flights.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("payload", sa.LargeBinary(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    if "raw_data" not in {column["name"] for column in inspector.get_columns("flights")}:
+        return
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(flights.c.id, flights.c.raw_data)
+            .where(flights.c.raw_data.isnot(None), flights.c.id > last_id)
+            .order_by(flights.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        stored = set(bind.execute(
+            sa.select(flight_raw_data.c.flight_id).where(flight_raw_data.c.flight_id.in_([row.id for row in rows]))
+        ).scalars())
+        payloads = [
+            {"flight_id": row.id, "payload": zlib.compress(row.raw_data.encode(), 6)}
+            for row in rows if row.raw_data and row.id not in stored
+        ]
+        if payloads:
+            bind.execute(flight_raw_data.insert(), payloads)
+
+    with op.batch_alter_table("flights") as batch:
+        batch.drop_column("raw_data")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    with op.batch_alter_table("flights") as batch:
+        batch.add_column(sa.Column("raw_data", sa.Text(), nullable=True))
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(flight_raw_data.c.flight_id, flight_raw_data.c.payload)
+            .where(flight_raw_data.c.flight_id > last_id)
+            .order_by(flight_raw_data.c.flight_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].flight_id
+        bind.execute(
+            flights.update().where(flights.c.id == sa.bindparam("row_id")).values(raw_data=sa.bindparam("text")),
+            [{"row_id": row.flight_id, "text": zlib.decompress(row.payload).decode()} for row in rows]
+        )
+    op.drop_table("flight_raw_data")
@@ -0,0 +1,80 @@
+"""Key round-trip flights on their inbound flight too
+
+Round trips sharing an outbound flight but returning on different flights
+were stored as one row. flights.return_leg_key holds the inbound flight
+("<flight number>@<departure>", empty for one-way) and joins
+uq_flights_natural_key, so each outbound/inbound pair keeps its own row.
+
+Checks what is already there, so it also runs on a database that
+create_all built. Downgrading merges round trips that only differ in their
+inbound flight into the newest one, with every reference re-pointed to it.
+
+Revision ID: 0003_flight_return_leg
+Revises: 0002_flight_raw_data
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_flight_return_leg"
+down_revision = "0002_flight_raw_data"
+branch_labels = None
+depends_on = None
+
+OLD_KEY = ("source_api", "flight_number", "departure_time", "arrival_time", "currency", "passengers", "trip_type")
+KEY = OLD_KEY + ("return_leg_key",)
+
+# Columns pointing at flights.id; tables a database does not have yet are skipped
+REFERENCES = (
+    ("price_history", "flight_id"),
+    ("bookings", "flight_id"),
+    ("bookings", "return_flight_id"),
+    ("notifications", "related_flight_id"),
+    ("tracked_routes", "last_flight_id"),
+    ("price_alerts", "triggered_flight_id"),
+)
+
+SAME_OLD_KEY = " AND ".join(f"keep.{column} = dup.{column}" for column in OLD_KEY)
+# Rows with a newer row on the old key; the newest row of each key is kept
+OLD_DUPLICATES = f"SELECT dup.id FROM flights dup WHERE EXISTS (SELECT 1 FROM flights keep WHERE {SAME_OLD_KEY} AND keep.id > dup.id)"
+
+
+def _natural_key(inspector) -> tuple:
+    existing = {constraint["name"]: constraint["column_names"] for constraint in inspector.get_unique_constraints("flights")}
+    return tuple(existing.get("uq_flights_natural_key") or ())
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("flights")}
+    current = _natural_key(inspector)
+    if "return_leg_key" in columns and current == KEY:
+        return
+
+    with op.batch_alter_table("flights") as batch:
+        if "return_leg_key" not in columns:
+            batch.add_column(sa.Column("return_leg_key", sa.String(64), nullable=False, server_default=""))
+        if current:
+            batch.drop_constraint("uq_flights_natural_key", type_="unique")
+        batch.create_unique_constraint("uq_flights_natural_key", list(KEY))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    op.create_index("ix_flights_natural_key_dedupe", "flights", list(OLD_KEY))
+    for table, column in REFERENCES:
+        if inspector.has_table(table):
+            op.execute(
+                f"UPDATE {table} SET {column} = ("
+                f"SELECT MAX(keep.id) FROM flights dup JOIN flights keep ON {SAME_OLD_KEY} WHERE dup.id = {table}.{column}"
+                f") WHERE {column} IN ({OLD_DUPLICATES})"
+            )
+    op.execute(f"DELETE FROM flight_raw_data WHERE flight_id IN ({OLD_DUPLICATES})")
+    op.execute(f"DELETE FROM flights WHERE id IN ({OLD_DUPLICATES})")
+    op.drop_index("ix_flights_natural_key_dedupe", "flights")
+
+    with op.batch_alter_table("flights") as batch:
+        batch.drop_constraint("uq_flights_natural_key", type_="unique")
+        batch.create_unique_constraint("uq_flights_natural_key", list(OLD_KEY))
+        batch.drop_column("return_leg_key")
@@ -1,33 +1,57 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..api.dependencies import get_current_user
 from ..models.user import User
 from ..services.flight_service import FlightService
-from ..services.price_prediction_service import PricePredictionService
+from ..services.price_prediction_service import price_prediction_service
+from ..services.reference_data import reference_data
+from ..services.price_tracker import price_tracker
+from ..services.price_alerts import price_alert_service
 from ..schemas.flight import (
     FlightSearchRequest, 
     FlightResponse, 
+    FlightSearchPage,
+    FareCalendarRequest,
+    FareCalendar,
+    MultiCitySearchRequest,
+    Itinerary,
+    AirportResponse,
+    TrackedRouteCreate,
+    TrackedRouteResponse,
+    PriceAlertCreate,
+    PriceAlertResponse,
     PricePredictionRequest,
     PricePredictionResponse
 )
 
 router = APIRouter(prefix="/flights", tags=["flights"])
 flight_service = FlightService()
-price_prediction_service = PricePredictionService()
 
 
 @router.post("/search", response_model=List[FlightResponse])
 async def search_flights(
     search_request: FlightSearchRequest,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
-    """Search for flights."""
+    """Search for flights.
+    
+    Returns the first page of results. When there are more, the X-Next-Cursor
+    header holds a cursor for /flights/search/results; X-Total-Count holds
+    the size of the full result set.
+    """
     try:
-        flights = await flight_service.search_flights(db, search_request, current_user)
-        return flights
+        page = await flight_service.search_flights_page(db, search_request, current_user)
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+        response.headers["X-Total-Count"] = str(page.total)
+        return page.flights
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -35,6 +59,168 @@ async def search_flights(
         )
 
 
+@router.post("/search/stream")
+async def search_flights_stream(
+    search_request: FlightSearchRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """Search for flights, streaming results as each region produces them.
+    
+    Emits "flights" events per region batch and a final "summary" event with
+    the first page of ranked results and a next_cursor, as NDJSON or
+    server-sent events.
+    """
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in flight_service.search_flights_stream(db, search_request, current_user):
+                yield _format_event(event, format)
+        except Exception as e:
+            yield _format_event({"event": "error", "detail": f"Flight search failed: {str(e)}"}, format)
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/search/multi-city", response_model=List[Itinerary])
+async def search_multi_city(
+    multi_request: MultiCitySearchRequest,
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """Search a multi-city trip.
+    
+    Returns the cheapest itineraries with one connecting flight per leg,
+    each with its per-leg prices and total.
+    """
+    try:
+        return await flight_service.search_multi_city(multi_request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/search/results", response_model=FlightSearchPage)
+async def get_search_results_page(
+    cursor: str,
+    limit: int = Query(50, ge=1, le=200)
+):
+    """Page through the full results of an earlier search without searching again."""
+    try:
+        page = flight_service.get_results_page(cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Search results expired, please search again"
+        )
+    return page
+
+
+@router.post("/calendar", response_model=FareCalendar)
+async def get_fare_calendar(
+    calendar_request: FareCalendarRequest,
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """Cheapest fare per day over a date range.
+    
+    With return dates set, also returns the cheapest fare back per return
+    day and a departure x return matrix of round-trip prices.
+    """
+    try:
+        return await flight_service.get_fare_calendar(calendar_request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/airports", response_model=List[AirportResponse])
+async def search_airports(
+    q: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Airport typeahead: airports whose code, city or name starts with q."""
+    return reference_data.search_airports(q, limit)
+
+
+@router.post("/tracked", response_model=TrackedRouteResponse, status_code=status.HTTP_201_CREATED)
+async def track_route(
+    tracked_request: TrackedRouteCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Track a route's price; the cheapest fare is re-priced in the background and drops are notified."""
+    try:
+        return price_tracker.track(db, current_user, tracked_request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/tracked", response_model=List[TrackedRouteResponse])
+async def get_tracked_routes(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Routes the current user is tracking, with their latest prices."""
+    return price_tracker.get_tracked_routes(db, current_user)
+
+
+@router.delete("/tracked/{tracked_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def untrack_route(
+    tracked_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stop tracking a route."""
+    if not price_tracker.untrack(db, current_user, tracked_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tracked route not found"
+        )
+
+
+@router.post("/alerts", response_model=PriceAlertResponse, status_code=status.HTTP_201_CREATED)
+async def create_price_alert(
+    alert_request: PriceAlertCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get notified once when a fare on the route in travel_month (YYYY-MM) is at or below max_price."""
+    try:
+        return price_alert_service.create_alert(db, current_user, alert_request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/alerts", response_model=List[PriceAlertResponse])
+async def get_price_alerts(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The current user's price alerts, active ones first."""
+    return price_alert_service.get_alerts(db, current_user)
+
+
+@router.delete("/alerts/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_price_alert(
+    alert_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a price alert."""
+    if not price_alert_service.delete_alert(db, current_user, alert_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Price alert not found"
+        )
+
+
+def _format_event(event: Dict[str, Any], format: str) -> str:
+    data = json.dumps(jsonable_encoder(event))
+    if format == "sse":
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
 @router.get("/{flight_id}", response_model=FlightResponse)
 async def get_flight(
     flight_id: int,
@@ -50,6 +236,24 @@ async def get_flight(
     return flight
 
 
+@router.get("/{flight_id}/raw")
+async def get_flight_raw_data(
+    flight_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get the original API data stored for a flight."""
+    raw_data = flight_service.get_flight_raw_data(db, flight_id)
+    if raw_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Raw data not found"
+        )
+    return {
+        "flight_id": flight_id,
+        "raw_data": raw_data
+    }
+
+
 @router.get("/{flight_id}/price-history")
 async def get_flight_price_history(
     flight_id: int,
@@ -21,13 +21,130 @@ class Settings(BaseSettings):
     nordvpn_token: Optional[str] = os.getenv("NORDVPN_TOKEN")
     nordvpn_connect: Optional[str] = os.getenv("NORDVPN_CONNECT")
     
+    # Regional egress pool
+    egress_proxy_template: Optional[str] = os.getenv("EGRESS_PROXY_TEMPLATE")  # e.g. "socks5://user-{session}:pass@{region}.proxy.example:1080"; {session} is new per connection
+    egress_connections_per_region: int = 50  # Proxied egress only; matches skyscanner_max_concurrency so searches do not queue for egress
+    egress_checkout_timeout_seconds: float = 2.0  # Longest a search waits for a free proxied egress
+    egress_max_failures: int = 3  # Consecutive failures before a connection is recycled
+    egress_health_check_interval: float = 30.0
+    egress_health_check_url: str = "https://www.gstatic.com/generate_204"
+    
     # Redis
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     
+    # Search result cache
+    search_cache_enabled: bool = True
+    search_cache_ttl_seconds: int = 300  # Served as fresh
+    search_cache_stale_seconds: int = 900  # Served stale while refreshing in the background
+    search_cache_local_entries: int = 1000  # In-process LRU tier in front of Redis
+    search_cache_redis_retry_seconds: float = 30.0  # Skip Redis this long after an error
+    
+    # Coalescing of identical in-flight searches
+    search_coalesce_enabled: bool = True
+    search_coalesce_distributed: bool = False  # Also coalesce across workers through a Redis lock
+    search_coalesce_lock_ttl_seconds: float = 15.0
+    
     # External APIs
     skyscanner_base_url: str = "https://partners.api.skyscanner.net/apiservices"
     exchange_rate_base_url: str = "https://api.exchangerate-api.com/v4"
     
+    # Shared provider HTTP clients
+    http_max_connections: int = 100  # Per provider and egress
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    skyscanner_timeout_seconds: float = 10.0
+    skyscanner_http2: bool = True
+    exchange_rate_timeout_seconds: float = 5.0
+    exchange_rate_http2: bool = False
+    
+    # Flight search
+    search_providers: list = ["skyscanner"]  # See providers.registry.PROVIDER_FACTORIES
+    search_regions: list = ["US", "UK", "DE", "FR", "IT"]
+    region_timeout_seconds: float = 8.0  # Per-region deadline
+    search_budget_seconds: float = 12.0  # Overall budget for the region fan-out
+    search_result_limit: int = 50  # Ranked results per page
+    search_results_ttl_seconds: int = 900  # How long a search's full result set can be paged
+    search_results_max_bytes: int = 64 * 1024 * 1024  # Bound on the in-process result store
+    search_results_max_entries: int = 500
+    
+    # Best-value ranking weights (applied to min-max normalised values)
+    ranking_price_weight: float = 0.6
+    ranking_duration_weight: float = 0.3
+    ranking_stops_weight: float = 0.1
+    
+    # Flight providers
+    skyscanner_max_concurrency: int = 50  # Concurrent region searches across all requests
+    local_fake_provider_flights: int = 200
+    local_fake_provider_batches: int = 2
+    local_fake_provider_latency_seconds: float = 0.05
+    local_fake_provider_timeout_seconds: float = 2.0
+    local_fake_provider_max_concurrency: int = 100
+    
+    # Fare calendar
+    calendar_max_days: int = 62  # Departure plus return days in one calendar request
+    calendar_max_concurrency: int = 4  # Days searched at once per calendar request
+    
+    # Multi-city search
+    multi_city_max_legs: int = 6
+    multi_city_candidates_per_leg: int = 50  # Cheapest flights per leg considered for combinations
+    multi_city_min_connection_minutes: int = 120  # Between arriving on one leg and departing on the next
+    multi_city_max_results: int = 50
+    
+    # Region selection
+    region_selection_enabled: bool = True
+    region_selection_top_k: int = 2  # Regions searched per route once it has been learned
+    region_selection_exploration_rate: float = 0.1  # Chance of searching one extra region to keep scores fresh
+    region_selection_min_searches: int = 5  # Searches of a route before its regions are narrowed
+    region_selection_smoothing: float = 0.2  # Weight of the latest search in a region's score
+    region_selection_tolerance: float = 0.01  # Fares within this fraction of the cheapest count as cheapest
+    region_selection_max_routes: int = 10000
+    
+    # Exchange rates
+    exchange_rate_source: str = "api"  # "api", or "static" for the built-in offline table
+    exchange_rate_base_currency: str = "USD"
+    exchange_rate_refresh_seconds: float = 3600.0
+    exchange_rate_max_age_seconds: float = 86400.0  # Refresh at startup when the snapshot is older than this
+    exchange_rate_snapshot_path: Optional[str] = os.getenv("EXCHANGE_RATE_SNAPSHOT_PATH", "exchange_rates.json")
+    
+    # Price tracking
+    price_tracking_enabled: bool = True
+    price_tracking_interval_seconds: float = 21600.0  # How often each tracked route is re-priced
+    price_tracking_rate_per_second: float = 5.0  # Route checks started per second across all tracked routes
+    price_tracking_burst: int = 20
+    price_tracking_batch_size: int = 200  # Routes checked and written per round
+    price_tracking_max_concurrency: int = 20  # Route checks running at once
+    price_tracking_drop_threshold: float = 0.05  # Notify when the price falls this fraction below the last notified price
+    price_tracking_max_routes_per_user: int = 50
+    
+    # Price alerts
+    price_alerts_max_per_user: int = 100
+    
+    # Price prediction
+    price_model_cache_max_entries: int = 10000  # Fitted models kept, one per flight
+    price_model_cache_max_bytes: int = 16 * 1024 * 1024
+    
+    # Reference data
+    airports_path: str = os.path.join(os.path.dirname(__file__), "data", "airports.csv")  # iata,name,city,country
+    carriers_path: str = os.path.join(os.path.dirname(__file__), "data", "carriers.csv")  # iata,name
+    airport_search_max_scan: int = 500  # Index keys read per typeahead query
+    
+    # Upstream resilience
+    circuit_breaker_enabled: bool = True
+    circuit_failure_threshold: int = 5  # Consecutive failures or slow calls before a circuit opens
+    circuit_latency_threshold_seconds: Optional[float] = 4.0  # A first batch later than this counts as a failure
+    circuit_open_seconds: float = 30.0  # How long an open circuit skips its target before probing
+    hedge_enabled: bool = False
+    hedge_percentile: float = 95.0  # Fire a duplicate call once the first batch is later than this
+    hedge_min_samples: int = 20  # Latency samples needed before hedging a target
+    hedge_min_delay_seconds: float = 0.5
+    hedge_window: int = 200  # Recent first-batch latencies kept per target
+    
+    # Skyscanner live-pricing polling
+    skyscanner_poll_initial_delay: float = 0.3
+    skyscanner_poll_max_delay: float = 2.0
+    skyscanner_poll_backoff: float = 1.6
+    skyscanner_poll_deadline_seconds: float = 7.0  # From session creation; stays inside region_timeout_seconds
+    
     # CORS
     allowed_origins: list = ["http://localhost:5173", "http://localhost:3000"]
     
@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession # 👈 NEW: Import async engine and session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text # To use text() for simple queries
+from sqlalchemy import create_engine, text # To use text() for simple queries
+from sqlalchemy.engine import make_url
+from functools import lru_cache
 from .config import settings
 import logging
 
@@ -24,6 +26,23 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+
+def sync_database_url():
+    """The app database URL with a synchronous driver, for worker threads and migrations."""
+    url = make_url(settings.database_url)
+    if url.drivername == "postgresql+asyncpg":
+        url = url.set(drivername="postgresql+psycopg2")
+    elif url.drivername == "sqlite+aiosqlite":
+        url = url.set(drivername="sqlite")
+    return url
+
+
+@lru_cache(maxsize=1)
+def get_sync_sessionmaker() -> sessionmaker:
+    """Synchronous sessions on the same database, for background work run in worker threads."""
+    sync_engine = create_engine(sync_database_url(), pool_pre_ping=True, pool_recycle=300)
+    return sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -8,6 +8,19 @@ from .config import settings
 from .database import test_connection, engine, Base
 from .models import * # Import all models to ensure they're registered
 from .api import auth, flights, bookings, notifications
+from .services.egress_pool import egress_pool
+from .services.http_clients import provider_clients
+from .services.search_cache import search_cache
+from .services.single_flight import single_flight
+from .services.result_store import search_result_store
+from .services.providers import provider_registry
+from .services.resilience import upstream_health
+from .services.region_selector import region_selector
+from .services.exchange_rates import exchange_rate_service
+from .services.reference_data import reference_data
+from .services.price_tracker import price_tracker
+from .services.price_alerts import price_alert_service
+from .services.price_prediction_service import price_prediction_service
 
 # Configure structured logging
 structlog.configure(
@@ -57,10 +70,26 @@ async def lifespan(app: FastAPI):
         # The exception is now properly raised from the asynchronous block
         raise
     
+    # Airport and carrier reference data for typeahead and result parsing
+    reference_data.load()
+    
+    # Open per-region egress connections and shared provider clients
+    await egress_pool.start(settings.search_regions)
+    await provider_clients.start()
+    await exchange_rate_service.start()
+    await price_alert_service.start()
+    await price_tracker.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down SkyNinja API")
+    await price_tracker.close()
+    await single_flight.close()
+    await search_cache.close()
+    await exchange_rate_service.close()
+    await provider_clients.aclose()
+    await egress_pool.close()
 
 
 # Create FastAPI application
@@ -80,6 +109,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # Add trusted host middleware
@@ -128,6 +158,33 @@ async def health_check():
         raise HTTPException(status_code=503, detail="Service unavailable")
 
 
+@app.get("/health/pools")
+async def pool_stats():
+    """Connection pool utilisation for sizing under load."""
+    return {
+        "http_clients": provider_clients.get_stats(),
+        "egress": egress_pool.get_stats(),
+        "providers": provider_registry.get_stats(),
+        "upstreams": upstream_health.get_stats(),
+        "region_selection": region_selector.get_stats(),
+        "price_tracking": price_tracker.get_stats(),
+        "price_alerts": price_alert_service.get_stats()
+    }
+
+
+@app.get("/health/cache")
+async def cache_stats():
+    """Search cache hit/miss/stale counters, search coalescing, result store, exchange rate, reference data and price model stats."""
+    return {
+        **search_cache.get_stats(),
+        "coalescing": single_flight.get_stats(),
+        "result_store": search_result_store.get_stats(),
+        "exchange_rates": exchange_rate_service.get_stats(),
+        "reference_data": reference_data.get_stats(),
+        "price_models": price_prediction_service.get_stats()
+    }
+
+
 @app.get("/info")
 async def api_info():
     """API information endpoint."""
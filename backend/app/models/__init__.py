@@ -1,13 +1,16 @@
 from .user import User
-from .flight import Flight, FlightSearch, PriceHistory
+from .flight import Flight, FlightRawData, FlightSearch, PriceHistory, TrackedRoute, PriceAlert
 from .booking import Booking, BookingStatus
 from .notification import Notification
 
 __all__ = [
     "User",
     "Flight", 
+    "FlightRawData",
     "FlightSearch",
     "PriceHistory",
+    "TrackedRoute",
+    "PriceAlert",
     "Booking",
     "BookingStatus",
     "Notification"
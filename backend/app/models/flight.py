@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, Enum, UniqueConstraint, LargeBinary
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -12,6 +12,13 @@ class FlightType(enum.Enum):
 
 class Flight(Base):
     __tablename__ = "flights"
+    __table_args__ = (
+        # One row per scheduled flight, source and fare context; searches upsert prices onto it
+        UniqueConstraint(
+            "source_api", "flight_number", "departure_time", "arrival_time", "currency", "passengers", "trip_type",
+            "return_leg_key", name="uq_flights_natural_key"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     flight_number = Column(String(20), nullable=False)
@@ -35,6 +42,9 @@ class Flight(Base):
     taxes = Column(Float, default=0.0)
     fees = Column(Float, default=0.0)
     total_price = Column(Float, nullable=False)
+    passengers = Column(Integer, nullable=False, default=1)  # Prices are for this many passengers
+    trip_type = Column(String(20), nullable=False, default=FlightType.ONE_WAY.value)  # FlightType value of the search
+    return_leg_key = Column(String(64), nullable=False, default="", server_default="")  # Inbound flight of a round trip; empty for one-way
     
     # Availability
     available_seats = Column(Integer, nullable=True)
@@ -52,7 +62,20 @@ class Flight(Base):
     # External API data
     external_id = Column(String(100), nullable=True)
     source_api = Column(String(50), nullable=True)  # e.g., "skyscanner", "amadeus"
-    raw_data = Column(Text, nullable=True)  # JSON string of original API response
+    
+    # Original API data lives in a side table so flight lookups stay narrow
+    raw_data = relationship("FlightRawData", uselist=False, back_populates="flight", cascade="all, delete-orphan")
+
+
+class FlightRawData(Base):
+    __tablename__ = "flight_raw_data"
+
+    flight_id = Column(Integer, ForeignKey("flights.id", ondelete="CASCADE"), primary_key=True)
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed JSON of the parsed API result
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    flight = relationship("Flight", back_populates="raw_data")
 
 
 class FlightSearch(Base):
@@ -90,7 +113,7 @@ class PriceHistory(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     search_id = Column(Integer, ForeignKey("flight_searches.id"), nullable=False)
-    flight_id = Column(Integer, ForeignKey("flights.id"), nullable=True)
+    flight_id = Column(Integer, ForeignKey("flights.id"), nullable=True, index=True)
     
     # Price data
     price = Column(Float, nullable=False)
@@ -103,3 +126,57 @@ class PriceHistory(Base):
     # Relationships
     search = relationship("FlightSearch", back_populates="price_history")
     flight = relationship("Flight")
+
+
+class TrackedRoute(Base):
+    __tablename__ = "tracked_routes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    # Route being watched; trackers with the same route share one re-pricing
+    origin_code = Column(String(10), nullable=False)
+    destination_code = Column(String(10), nullable=False)
+    departure_date = Column(DateTime(timezone=True), nullable=False)
+    return_date = Column(DateTime(timezone=True), nullable=True)
+    passengers = Column(Integer, default=1)
+    preferred_currency = Column(String(3), default="USD")
+    is_active = Column(Boolean, default=True, index=True)
+    
+    # Latest re-pricing, and the price a drop is measured against
+    last_price = Column(Float, nullable=True)
+    last_flight_id = Column(Integer, ForeignKey("flights.id"), nullable=True)
+    baseline_price = Column(Float, nullable=True)  # First price seen, then the price of the last drop notified
+    last_checked_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    user = relationship("User", back_populates="tracked_routes")
+
+
+class PriceAlert(Base):
+    __tablename__ = "price_alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    # Subscription: any fare on the route departing in travel_month at or below max_price
+    origin_code = Column(String(10), nullable=False)
+    destination_code = Column(String(10), nullable=False)
+    travel_month = Column(String(7), nullable=False)  # YYYY-MM
+    max_price = Column(Float, nullable=False)
+    currency = Column(String(3), default="USD")
+    is_active = Column(Boolean, default=True, index=True)
+    
+    # The fare that set it off; an alert fires once
+    triggered_price = Column(Float, nullable=True)
+    triggered_flight_id = Column(Integer, ForeignKey("flights.id"), nullable=True)
+    triggered_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    user = relationship("User", back_populates="price_alerts")
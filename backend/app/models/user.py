@@ -27,3 +27,5 @@ class User(Base):
     bookings = relationship("Booking", back_populates="user")
     flight_searches = relationship("FlightSearch", back_populates="user")
     notifications = relationship("Notification", back_populates="user")
+    tracked_routes = relationship("TrackedRoute", back_populates="user")
+    price_alerts = relationship("PriceAlert", back_populates="user")
@@ -1,5 +1,5 @@
 from .user import UserCreate, UserUpdate, UserResponse, UserLogin
-from .flight import FlightSearchRequest, FlightResponse, PriceHistoryResponse
+from .flight import FlightSearchRequest, FlightResponse, FlightSearchPage, PriceHistoryResponse, SearchSort, FareCalendarRequest, FareCalendar, SearchLeg, MultiCitySearchRequest, ItineraryLeg, Itinerary, AirportResponse, TrackedRouteCreate, TrackedRouteResponse, PriceAlertCreate, PriceAlertResponse
 from .booking import BookingCreate, BookingResponse, BookingUpdate
 from .notification import NotificationResponse, NotificationCreate
 
@@ -9,8 +9,21 @@ __all__ = [
     "UserResponse",
     "UserLogin",
     "FlightSearchRequest",
+    "SearchSort",
     "FlightResponse",
+    "FlightSearchPage",
     "PriceHistoryResponse",
+    "FareCalendarRequest",
+    "FareCalendar",
+    "SearchLeg",
+    "MultiCitySearchRequest",
+    "ItineraryLeg",
+    "Itinerary",
+    "AirportResponse",
+    "TrackedRouteCreate",
+    "TrackedRouteResponse",
+    "PriceAlertCreate",
+    "PriceAlertResponse",
     "BookingCreate",
     "BookingResponse",
     "BookingUpdate",
@@ -1,7 +1,14 @@
 from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from ..models.flight import FlightType
+import enum
+
+
+class SearchSort(str, enum.Enum):
+    CHEAPEST = "cheapest"
+    FASTEST = "fastest"
+    BEST_VALUE = "best_value"
 
 
 class FlightSearchRequest(BaseModel):
@@ -15,6 +22,7 @@ class FlightSearchRequest(BaseModel):
     max_stops: int = 2
     max_price: Optional[float] = None
     preferred_currency: str = "USD"
+    sort_by: SearchSort = SearchSort.CHEAPEST
 
 
 class FlightResponse(BaseModel):
@@ -45,6 +53,133 @@ class FlightResponse(BaseModel):
         from_attributes = True
 
 
+class FlightSearchPage(BaseModel):
+    flights: List[FlightResponse]
+    next_cursor: Optional[str] = None  # Opaque; pass to /flights/search/results for the next page
+    total: int
+
+
+class FareCalendarRequest(BaseModel):
+    origin_code: str
+    destination_code: str
+    start_date: datetime
+    end_date: datetime
+    return_start_date: Optional[datetime] = None  # Set both return dates for round-trip prices
+    return_end_date: Optional[datetime] = None
+    passengers: int = 1
+    preferred_airlines: Optional[List[str]] = None
+    max_stops: int = 2
+    preferred_currency: str = "USD"
+
+
+class FareCalendar(BaseModel):
+    currency: str
+    departure_dates: List[date]
+    outbound_prices: List[Optional[float]]  # Cheapest one-way fare per departure date
+    return_dates: List[date] = []
+    return_prices: List[Optional[float]] = []  # Cheapest one-way fare back per return date
+    round_trip_prices: List[List[Optional[float]]] = []  # [departure][return]; None if the return is before departure or either day has no fare
+
+
+class SearchLeg(BaseModel):
+    origin_code: str
+    destination_code: str
+    departure_date: datetime
+
+
+class MultiCitySearchRequest(BaseModel):
+    legs: List[SearchLeg]
+    passengers: int = 1
+    preferred_airlines: Optional[List[str]] = None
+    max_stops: int = 2
+    max_price: Optional[float] = None  # Applies to the itinerary total
+    preferred_currency: str = "USD"
+    limit: int = 10  # Cheapest itineraries to return
+
+
+class ItineraryLeg(BaseModel):
+    flight_number: str
+    airline_code: str
+    airline_name: str
+    origin_code: str
+    origin_name: str
+    destination_code: str
+    destination_name: str
+    departure_time: datetime
+    arrival_time: datetime
+    duration_minutes: int
+    stops: int
+    is_direct: bool
+    price: float
+    currency: str
+    source_api: Optional[str] = None
+
+
+class Itinerary(BaseModel):
+    total_price: float
+    currency: str
+    legs: List[ItineraryLeg]
+
+
+class AirportResponse(BaseModel):
+    code: str
+    name: str
+    city: str
+    country: str
+
+
+class TrackedRouteCreate(BaseModel):
+    origin_code: str
+    destination_code: str
+    departure_date: datetime
+    return_date: Optional[datetime] = None
+    passengers: int = 1
+    preferred_currency: str = "USD"
+
+
+class TrackedRouteResponse(BaseModel):
+    id: int
+    origin_code: str
+    destination_code: str
+    departure_date: datetime
+    return_date: Optional[datetime] = None
+    passengers: int
+    preferred_currency: str
+    is_active: bool
+    last_price: Optional[float] = None
+    last_flight_id: Optional[int] = None
+    last_checked_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class PriceAlertCreate(BaseModel):
+    origin_code: str
+    destination_code: str
+    travel_month: str  # YYYY-MM
+    max_price: float
+    currency: str = "USD"
+
+
+class PriceAlertResponse(BaseModel):
+    id: int
+    origin_code: str
+    destination_code: str
+    travel_month: str
+    max_price: float
+    currency: str
+    is_active: bool
+    triggered_price: Optional[float] = None
+    triggered_flight_id: Optional[int] = None
+    triggered_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class PriceHistoryResponse(BaseModel):
     id: int
     search_id: int
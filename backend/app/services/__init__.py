@@ -3,6 +3,19 @@ from .flight_service import FlightService
 from .booking_service import BookingService
 from .notification_service import NotificationService
 from .vpn_service import VPNService
+from .egress_pool import EgressPool
+from .http_clients import ProviderClientPool
+from .search_cache import SearchCache
+from .single_flight import SingleFlight
+from .ranking import FlightRanker
+from .result_store import SearchResultStore
+from .providers import FlightProvider, ProviderRegistry
+from .resilience import CircuitBreaker, UpstreamHealth
+from .region_selector import RegionSelector
+from .exchange_rates import ExchangeRateService
+from .reference_data import ReferenceData
+from .price_tracker import PriceTracker
+from .price_alerts import PriceAlertService
 from .price_prediction_service import PricePredictionService
 
 __all__ = [
@@ -11,5 +24,20 @@ __all__ = [
     "BookingService",
     "NotificationService",
     "VPNService",
+    "EgressPool",
+    "ProviderClientPool",
+    "SearchCache",
+    "SingleFlight",
+    "FlightRanker",
+    "SearchResultStore",
+    "FlightProvider",
+    "ProviderRegistry",
+    "CircuitBreaker",
+    "UpstreamHealth",
+    "RegionSelector",
+    "ExchangeRateService",
+    "ReferenceData",
+    "PriceTracker",
+    "PriceAlertService",
     "PricePredictionService"
 ]
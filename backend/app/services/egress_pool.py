@@ -0,0 +1,238 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+import httpx
+from ..config import settings
+from .vpn_service import VPNService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Errors that say the egress itself is broken; anything else (HTTP errors from
+# the provider, parse errors, the caller's own timeouts) leaves it alone
+EGRESS_ERRORS = (httpx.ProxyError, httpx.ConnectError, httpx.ConnectTimeout)
+
+
+@dataclass(eq=False)
+class EgressConnection:
+    """A regional egress that a caller checks out from the pool."""
+    region: str
+    proxy_url: Optional[str] = None
+    healthy: bool = True
+    consecutive_failures: int = 0
+    last_checked: Optional[float] = None
+    opened_at: float = field(default_factory=time.monotonic)
+
+
+class EgressUnavailable(Exception):
+    """No healthy egress connection for a region was free within the checkout timeout."""
+
+
+class EgressPool:
+    """Per-region pool of egress connections.
+
+    Every region owns its own connections, so overlapping searches and
+    concurrent region queries never switch a shared VPN under each other.
+    Without a proxy template egress is direct: there is nothing to hand out,
+    so a region gets one shared connection that callers never wait for.
+    Waiting for a proxied connection is bounded by `checkout_timeout`.
+
+    Only healthy connections are handed out. One that fails `max_failures`
+    times in a row through proxy or connect errors, or fails a health check,
+    is parked until a health check finds it, or a freshly opened egress in
+    its place, reachable again. A region with no healthy connection left
+    fails checkouts at once, so searches go on in the other regions.
+    """
+
+    def __init__(
+        self,
+        vpn_service: Optional[VPNService] = None,
+        connections_per_region: int = settings.egress_connections_per_region,
+        max_failures: int = settings.egress_max_failures,
+        health_check_interval: float = settings.egress_health_check_interval,
+        checkout_timeout: float = settings.egress_checkout_timeout_seconds
+    ):
+        self.vpn_service = vpn_service or VPNService()
+        self.connections_per_region = connections_per_region
+        self.max_failures = max_failures
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        self._connections: Dict[str, List[EgressConnection]] = {}
+        self._idle: Dict[str, asyncio.Queue] = {}
+        self._parked: Dict[str, Set[EgressConnection]] = {}
+        self._direct: Dict[str, EgressConnection] = {}
+        self._lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def start(self, regions: Optional[List[str]] = None) -> None:
+        """Open connections for the given regions and start health checks."""
+        for region in regions or settings.search_regions:
+            await self._ensure_region(region)
+
+        if self._health_task is None and self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+
+    async def close(self) -> None:
+        """Stop health checks and drop all connections."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+        self._connections.clear()
+        self._idle.clear()
+        self._parked.clear()
+        self._direct.clear()
+
+    @asynccontextmanager
+    async def checkout(self, region: str) -> AsyncIterator[EgressConnection]:
+        """Check out an egress for a region, returning it to the pool afterwards.
+
+        Raises EgressUnavailable when the region has no healthy connection
+        or none frees up within `checkout_timeout`; direct egress never waits.
+        Only proxy and connect errors count against the connection.
+        """
+        await self._ensure_region(region)
+        direct = self._direct.get(region)
+        if direct is not None:
+            yield direct
+            return
+
+        queue = self._idle[region]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.checkout_timeout
+        while True:
+            if not any(c.healthy for c in self._connections[region]):
+                raise EgressUnavailable(f"No healthy egress for region {region}")
+            try:
+                connection = await asyncio.wait_for(queue.get(), timeout=max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                raise EgressUnavailable(f"No egress free for region {region} after {self.checkout_timeout}s") from None
+            if connection.healthy:
+                break
+            # Failed a health check while idle
+            self._parked[region].add(connection)
+
+        try:
+            yield connection
+        except EGRESS_ERRORS:
+            self._record_failure(connection)
+            raise
+        else:
+            connection.consecutive_failures = 0
+        finally:
+            self._release(connection)
+
+    async def health_check(self) -> Dict[str, bool]:
+        """Probe every proxied egress in place and replace the ones that fail.
+
+        Connections stay in circulation while they are probed, and each
+        distinct proxy is probed once however many connections share it.
+        Returns a per-region flag telling whether at least one connection
+        in that region is healthy.
+        """
+        status = {region: True for region in self._direct}
+        for region, connections in list(self._connections.items()):
+            proxies = list({connection.proxy_url for connection in connections})
+            results = await asyncio.gather(
+                *(self.vpn_service.check_egress(proxy_url) for proxy_url in proxies),
+                return_exceptions=True
+            )
+            reachable = {proxy_url for proxy_url, ok in zip(proxies, results) if ok is True}
+            now = time.monotonic()
+            for connection in connections:
+                connection.last_checked = now
+                if connection.proxy_url in reachable:
+                    connection.healthy = True
+                    connection.consecutive_failures = 0
+                else:
+                    connection.healthy = False
+                    await self._reopen(connection)
+
+            parked = self._parked[region]
+            for connection in [c for c in parked if c.healthy]:
+                parked.discard(connection)
+                self._idle[region].put_nowait(connection)
+            status[region] = any(c.healthy for c in connections)
+            if not status[region]:
+                logger.warning(f"No healthy egress left for region {region}")
+
+        return status
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return connection counts per region."""
+        stats: Dict[str, Dict[str, Any]] = {region: {"direct": True} for region in self._direct}
+        for region, connections in self._connections.items():
+            stats[region] = {
+                "size": len(connections),
+                "idle": self._idle[region].qsize(),
+                "healthy": sum(1 for c in connections if c.healthy),
+                "parked": len(self._parked[region])
+            }
+        return stats
+
+    async def _ensure_region(self, region: str) -> None:
+        if region in self._idle or region in self._direct:
+            return
+
+        async with self._lock:
+            if region in self._idle or region in self._direct:
+                return
+
+            proxy_url = await self.vpn_service.open_egress(region)
+            if proxy_url is None:
+                self._direct[region] = EgressConnection(region=region)
+                logger.info(f"Using direct egress for region {region}")
+                return
+
+            queue = asyncio.Queue()
+            connections = []
+            for i in range(self.connections_per_region):
+                connection = EgressConnection(
+                    region=region,
+                    proxy_url=proxy_url if i == 0 else await self.vpn_service.open_egress(region)
+                )
+                connections.append(connection)
+                queue.put_nowait(connection)
+
+            self._connections[region] = connections
+            self._idle[region] = queue
+            self._parked[region] = set()
+            logger.info(f"Opened {len(connections)} egress connections for region {region}")
+
+    async def _reopen(self, connection: EgressConnection) -> None:
+        """Swap in a freshly opened egress if it passes a probe; otherwise leave the connection unhealthy."""
+        try:
+            proxy_url = await self.vpn_service.open_egress(connection.region)
+            if proxy_url != connection.proxy_url and await self.vpn_service.check_egress(proxy_url):
+                connection.proxy_url = proxy_url
+                connection.healthy = True
+                connection.consecutive_failures = 0
+                connection.opened_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"Error reopening egress for region {connection.region}: {e}")
+
+    def _release(self, connection: EgressConnection) -> None:
+        if connection.healthy:
+            self._idle[connection.region].put_nowait(connection)
+        else:
+            self._parked[connection.region].add(connection)
+
+    def _record_failure(self, connection: EgressConnection) -> None:
+        connection.consecutive_failures += 1
+        if connection.consecutive_failures >= self.max_failures:
+            logger.warning(f"Egress for region {connection.region} marked unhealthy, parked until it passes a health check")
+            connection.healthy = False
+
+    async def _health_check_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.error(f"Error running egress health check: {e}")
+
+
+egress_pool = EgressPool()
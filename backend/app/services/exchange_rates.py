@@ -0,0 +1,256 @@
+import asyncio
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+import numpy as np
+from ..config import settings
+from .http_clients import ProviderClientPool, provider_clients as default_provider_clients
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Monetary fields of a flight dict converted together
+PRICE_FIELDS = ("price", "base_price", "taxes", "fees")
+
+# Approximate units per USD for the offline source; not for real pricing
+STATIC_RATES: Dict[str, float] = {
+    "USD": 1.0,
+    "EUR": 0.92,
+    "GBP": 0.79,
+    "CHF": 0.88,
+    "JPY": 151.0,
+    "CAD": 1.36,
+    "AUD": 1.52,
+    "SEK": 10.6,
+    "NOK": 10.8,
+    "DKK": 6.87,
+    "PLN": 3.96,
+    "INR": 83.3,
+    "SGD": 1.35,
+    "AED": 3.67,
+}
+
+
+class RateSource(ABC):
+    """Where ExchangeRateService gets its rates from."""
+
+    @abstractmethod
+    async def fetch(self, base_currency: str) -> Dict[str, float]:
+        """Return units of each currency per unit of base_currency."""
+
+
+class StaticRateSource(RateSource):
+    """Fixed rate table, for tests, benchmarks and running without the network."""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        self.rates = dict(rates or STATIC_RATES)
+        self.fetches = 0
+
+    async def fetch(self, base_currency: str) -> Dict[str, float]:
+        self.fetches += 1
+        anchor = self.rates[base_currency]
+        return {code: rate / anchor for code, rate in self.rates.items()}
+
+
+class ExchangeRateApiSource(RateSource):
+    """Latest rates from exchangerate-api.com through the shared provider client."""
+
+    def __init__(
+        self,
+        http_clients: Optional[ProviderClientPool] = None,
+        base_url: str = settings.exchange_rate_base_url,
+        api_key: Optional[str] = settings.exchange_rate_api_key
+    ):
+        self.http_clients = http_clients or default_provider_clients
+        self.base_url = base_url
+        self.api_key = api_key
+
+    async def fetch(self, base_currency: str) -> Dict[str, float]:
+        client = self.http_clients.get("exchange_rate")
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        response = await client.get(f"{self.base_url}/latest/{base_currency}", headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        # v4 answers with "rates", v6 with "conversion_rates"
+        return data.get("rates") or data.get("conversion_rates") or {}
+
+
+class ExchangeRateService:
+    """In-memory exchange rate table with periodic refresh and an on-disk snapshot.
+
+    Rates are held as units of each currency per `base_currency`. On start
+    the last snapshot is loaded so conversions work without the network; the
+    table is refreshed right away when that snapshot is missing or older
+    than `max_age`, and every `refresh_interval` seconds after that. Each
+    successful refresh rewrites the snapshot.
+    """
+
+    def __init__(
+        self,
+        source: Optional[RateSource] = None,
+        base_currency: str = settings.exchange_rate_base_currency,
+        refresh_interval: float = settings.exchange_rate_refresh_seconds,
+        snapshot_path: Optional[str] = settings.exchange_rate_snapshot_path,
+        max_age: float = settings.exchange_rate_max_age_seconds
+    ):
+        if source is None:
+            source = StaticRateSource() if settings.exchange_rate_source == "static" else ExchangeRateApiSource()
+        self.source = source
+        self.base_currency = base_currency.upper()
+        self.refresh_interval = refresh_interval
+        self.snapshot_path = snapshot_path
+        self.max_age = max_age
+        self.updated_at: Optional[float] = None
+        self._index: Dict[str, int] = {}
+        self._values = np.empty(0, dtype=np.float64)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.stats = {"refreshes": 0, "refresh_errors": 0, "converted_flights": 0, "unknown_currency": 0}
+
+    async def start(self) -> None:
+        """Load the snapshot, refresh if it is stale and start periodic refreshes."""
+        self.load_snapshot()
+        if self.updated_at is None or time.time() - self.updated_at > self.max_age:
+            await self.refresh()
+        if self._refresh_task is None and self.refresh_interval > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+
+    async def refresh(self) -> bool:
+        """Fetch the latest rates; on failure the current table stays in use."""
+        try:
+            rates = await self.source.fetch(self.base_currency)
+            self._set_rates(rates, time.time())
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            logger.error(f"Error refreshing exchange rates: {e}")
+            return False
+
+        self.stats["refreshes"] += 1
+        self.save_snapshot()
+        return True
+
+    def load_snapshot(self) -> bool:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            if snapshot.get("base") != self.base_currency:
+                logger.warning(f"Ignoring exchange rate snapshot with base {snapshot.get('base')}")
+                return False
+            self._set_rates(snapshot["rates"], snapshot["updated_at"])
+            return True
+        except Exception as e:
+            logger.error(f"Error loading exchange rate snapshot: {e}")
+            return False
+
+    def save_snapshot(self) -> None:
+        if not self.snapshot_path or self.updated_at is None:
+            return
+        try:
+            # Write then rename so a crash never leaves a half-written snapshot
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"base": self.base_currency, "updated_at": self.updated_at, "rates": self.get_rates()}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.error(f"Error saving exchange rate snapshot: {e}")
+
+    def _set_rates(self, rates: Dict[str, float], updated_at: float) -> None:
+        table = {code.upper(): float(rate) for code, rate in rates.items() if rate and float(rate) > 0}
+        if self.base_currency not in table:
+            table[self.base_currency] = 1.0
+        if len(table) < 2:
+            raise ValueError("Exchange rate table is empty")
+        # Both are rebuilt before either is assigned; conversions run on the loop thread, so they never see a mix
+        codes = sorted(table)
+        self._values = np.array([table[code] for code in codes], dtype=np.float64)
+        self._index = {code: i for i, code in enumerate(codes)}
+        self.updated_at = updated_at
+
+    def get_rates(self) -> Dict[str, float]:
+        return {code: float(self._values[i]) for code, i in self._index.items()}
+
+    def rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """Units of to_currency per unit of from_currency, or None if either is unknown."""
+        source = self._index.get(from_currency.upper())
+        target = self._index.get(to_currency.upper())
+        if source is None or target is None:
+            return None
+        return float(self._values[target] / self._values[source])
+
+    def convert(self, amount: float, from_currency: str, to_currency: str) -> Optional[float]:
+        rate = self.rate(from_currency, to_currency)
+        return round(amount * rate, 2) if rate is not None else None
+
+    def convert_flights(self, flights: List[Dict[str, Any]], currency: str) -> List[Dict[str, Any]]:
+        """Convert a batch of flight dicts to `currency` in place, in one vectorised pass.
+
+        Converted flights keep their original price and currency under
+        original_price and original_currency. Returns the converted batch:
+        flights in a currency the table does not know are dropped, since
+        their prices cannot be compared with the rest. Without a rate for
+        `currency` itself the batch is returned unconverted.
+        """
+        target = self._index.get(currency.upper())
+        if not flights or target is None:
+            if flights and self._index:
+                logger.warning(f"No exchange rate for {currency}, leaving prices unconverted")
+            return flights
+
+        index = self._index
+        base = self.base_currency
+        codes = [(flight_data.get("currency") or base).upper() for flight_data in flights]
+        source = np.array([index.get(code, -1) for code in codes], dtype=np.int64)
+        known = source >= 0
+        unknown = len(flights) - int(np.count_nonzero(known))
+        if unknown:
+            self.stats["unknown_currency"] += unknown
+            logger.warning(f"Dropping {unknown} flight(s) priced in currencies without an exchange rate")
+            kept = np.flatnonzero(known).tolist()
+            flights = [flights[i] for i in kept]
+            codes = [codes[i] for i in kept]
+            source = source[known]
+        needs = np.flatnonzero(source != target)
+        if needs.size == 0:
+            return flights
+
+        rows = needs.tolist()
+        # One row per flight, one column per price field; numpy turns missing (None) fields into NaN
+        amounts = np.array([[flights[i].get(field) for field in PRICE_FIELDS] for i in rows], dtype=np.float64)
+        factors = self._values[target] / self._values[source[needs]]
+        converted = np.round(amounts * factors[:, None], 2).tolist()
+        target_code = currency.upper()
+        for i, values in zip(rows, converted):
+            flight_data = flights[i]
+            flight_data["original_price"] = flight_data.get("price")
+            flight_data["original_currency"] = codes[i]
+            for field, value in zip(PRICE_FIELDS, values):
+                if value == value:  # NaN marks a field the flight does not have
+                    flight_data[field] = value
+            flight_data["currency"] = target_code
+        self.stats["converted_flights"] += len(rows)
+        return flights
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "base_currency": self.base_currency,
+            "currencies": len(self._index),
+            "age_seconds": round(time.time() - self.updated_at, 1) if self.updated_at else None,
+        }
+
+
+exchange_rate_service = ExchangeRateService()
@@ -1,13 +1,24 @@
-import httpx
 import asyncio
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List, Optional, Dict, Any, Tuple
+from datetime import date, datetime, time, timedelta
 from sqlalchemy.orm import Session
 from ..config import settings
-from ..models.flight import Flight, FlightSearch, PriceHistory
+from ..models.flight import Flight, FlightRawData, FlightSearch, PriceHistory
 from ..models.user import User
-from ..schemas.flight import FlightSearchRequest, FlightResponse, PricePredictionRequest
-from .vpn_service import VPNService
+from ..schemas.flight import FareCalendar, FareCalendarRequest, FlightSearchRequest, FlightResponse, FlightSearchPage, Itinerary, ItineraryLeg, MultiCitySearchRequest, PricePredictionRequest
+from .egress_pool import EgressPool, EgressUnavailable, egress_pool as default_egress_pool
+from .exchange_rates import ExchangeRateService, exchange_rate_service as default_exchange_rate_service
+from .providers import FlightProvider, ProviderRegistry, provider_registry as default_provider_registry
+from .itinerary import k_cheapest_combinations
+from .price_alerts import PriceAlertService, price_alert_service as default_price_alert_service
+from .ranking import FlightRanker, flight_ranker as default_flight_ranker
+from .region_selector import RegionSelector, region_selector as default_region_selector
+from .resilience import UpstreamHealth, upstream_health as default_upstream_health
+from .result_store import SearchResultStore, search_result_store as default_result_store
+from .search_cache import SearchCache, search_cache as default_search_cache
+from .search_persistence import decompress_payload, find_flights, flight_key, flight_row, insert_missing_flights, insert_price_history, natural_key, price_history_rows, upsert_flights, upsert_raw_data
+from .single_flight import SingleFlight, single_flight as default_single_flight
 import logging
 import json
 
@@ -15,250 +26,668 @@ logger = logging.getLogger(__name__)
 
 
 class FlightService:
-    def __init__(self):
-        self.skyscanner_api_key = settings.skyscanner_api_key
-        self.skyscanner_base_url = settings.skyscanner_base_url
-        self.vpn_service = VPNService()
+    def __init__(
+        self,
+        egress_pool: Optional[EgressPool] = None,
+        providers: Optional[ProviderRegistry] = None,
+        search_cache: Optional[SearchCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        ranker: Optional[FlightRanker] = None,
+        result_store: Optional[SearchResultStore] = None,
+        upstream_health: Optional[UpstreamHealth] = None,
+        region_selector: Optional[RegionSelector] = None,
+        exchange_rates: Optional[ExchangeRateService] = None,
+        price_alerts: Optional[PriceAlertService] = None
+    ):
+        self.egress_pool = egress_pool or default_egress_pool
+        self.providers = providers or default_provider_registry
+        self.search_cache = search_cache or default_search_cache
+        self.single_flight = single_flight or default_single_flight
+        self.ranker = ranker or default_flight_ranker
+        self.result_store = result_store or default_result_store
+        self.upstream_health = upstream_health or default_upstream_health
+        self.region_selector = region_selector or default_region_selector
+        self.exchange_rates = exchange_rates or default_exchange_rate_service
+        self.price_alerts = price_alerts or default_price_alert_service
 
     async def search_flights(self, db: Session, search_request: FlightSearchRequest, user: Optional[User] = None) -> List[FlightResponse]:
         """Search for flights using multiple APIs and regions."""
-        try:
-            # Create search record
-            search_record = FlightSearch(
-                user_id=user.id if user else None,
-                origin_code=search_request.origin_code,
-                destination_code=search_request.destination_code,
-                departure_date=search_request.departure_date,
-                return_date=search_request.return_date,
-                passengers=search_request.passengers,
-                flight_type=search_request.flight_type,
-                preferred_airlines=json.dumps(search_request.preferred_airlines) if search_request.preferred_airlines else None,
-                max_stops=search_request.max_stops,
-                max_price=search_request.max_price,
-                preferred_currency=search_request.preferred_currency
-            )
-            db.add(search_record)
-            db.commit()
-            db.refresh(search_record)
+        page = await self.search_flights_page(db, search_request, user)
+        return page.flights
 
-            # Search from multiple regions using VPN
-            all_flights = []
-            regions = ["US", "UK", "DE", "FR", "IT"]  # Different regions to search from
-            
-            for region in regions:
+    async def search_flights_page(self, db: Session, search_request: FlightSearchRequest, user: Optional[User] = None) -> FlightSearchPage:
+        """Search for flights and return the first page with a cursor to the rest."""
+        async for event in self.search_flights_stream(db, search_request, user):
+            if event["event"] == "summary":
+                return FlightSearchPage(flights=event["flights"], next_cursor=event["next_cursor"], total=event["total"])
+        return FlightSearchPage(flights=[], total=0)
+
+    def get_results_page(self, cursor: str, limit: int = settings.search_result_limit) -> Optional[FlightSearchPage]:
+        """Page through a stored search result without searching again.
+        
+        Returns None when the result has expired or been evicted; raises
+        ValueError for a malformed cursor.
+        """
+        result_id, offset = self.result_store.decode_cursor(cursor)
+        page = self.result_store.page(result_id, offset, limit)
+        if page is None:
+            return None
+        
+        rows, total = page
+        next_cursor = self.result_store.encode_cursor(result_id, offset + limit) if offset + limit < total else None
+        return FlightSearchPage(flights=[FlightResponse(**row) for row in rows], next_cursor=next_cursor, total=total)
+
+    async def get_fare_calendar(self, calendar_request: FareCalendarRequest) -> FareCalendar:
+        """Cheapest fare per day over a date range, plus round-trip combinations of those days.
+        
+        Every day is one search through the search cache and coalescing, so
+        days searched recently cost no provider calls and calendars that
+        overlap share them. At most calendar_max_concurrency days are searched
+        at once. A round-trip price is the cheapest outbound fare on its
+        departure day plus the cheapest fare back on its return day. Raises
+        ValueError for an empty or oversized date range.
+        """
+        departure_dates = self._date_range(calendar_request.start_date, calendar_request.end_date)
+        return_dates = []
+        if calendar_request.return_start_date and calendar_request.return_end_date:
+            return_dates = self._date_range(calendar_request.return_start_date, calendar_request.return_end_date)
+        if len(departure_dates) + len(return_dates) > settings.calendar_max_days:
+            raise ValueError(f"A fare calendar covers at most {settings.calendar_max_days} days")
+        
+        semaphore = asyncio.Semaphore(settings.calendar_max_concurrency)
+        
+        async def cheapest(origin_code: str, destination_code: str, day: date) -> Optional[float]:
+            search_request = FlightSearchRequest(
+                origin_code=origin_code,
+                destination_code=destination_code,
+                departure_date=datetime.combine(day, time.min),
+                passengers=calendar_request.passengers,
+                preferred_airlines=calendar_request.preferred_airlines,
+                max_stops=calendar_request.max_stops,
+                preferred_currency=calendar_request.preferred_currency
+            )
+            async with semaphore:
                 try:
-                    # Switch VPN region
-                    await self.vpn_service.switch_region(region)
-                    search_record.search_region = region
-                    
-                    # Search flights from this region
-                    region_flights = await self._search_skyscanner(search_request, region)
-                    all_flights.extend(region_flights)
-                    
-                    # Store price history
-                    for flight_data in region_flights:
-                        price_record = PriceHistory(
-                            search_id=search_record.id,
-                            price=flight_data.get("price", 0),
-                            currency=flight_data.get("currency", "USD"),
-                            region=region
-                        )
-                        db.add(price_record)
-                    
+                    flights = await self._search_day(search_request)
                 except Exception as e:
-                    logger.error(f"Error searching from region {region}: {e}")
-                    continue
+                    logger.error(f"Error searching {origin_code}-{destination_code} on {day} for the fare calendar: {e}")
+                    return None
+            ranked = self.ranker.rank(flights, search_request, limit=1)
+            return round(ranked[0]["price"], 2) if ranked else None
+        
+        origin, destination = calendar_request.origin_code, calendar_request.destination_code
+        prices = await asyncio.gather(
+            *(cheapest(origin, destination, day) for day in departure_dates),
+            *(cheapest(destination, origin, day) for day in return_dates)
+        )
+        outbound_prices = prices[:len(departure_dates)]
+        return_prices = prices[len(departure_dates):]
+        round_trip_prices = [
+            [
+                round(out + back, 2) if out is not None and back is not None and return_day >= departure_day else None
+                for return_day, back in zip(return_dates, return_prices)
+            ]
+            for departure_day, out in zip(departure_dates, outbound_prices)
+        ] if return_dates else []
+        
+        return FareCalendar(
+            currency=calendar_request.preferred_currency,
+            departure_dates=departure_dates,
+            outbound_prices=outbound_prices,
+            return_dates=return_dates,
+            return_prices=return_prices,
+            round_trip_prices=round_trip_prices
+        )
+
+    async def search_multi_city(self, multi_request: MultiCitySearchRequest) -> List[Itinerary]:
+        """Search every leg concurrently and return the cheapest connecting itineraries.
+        
+        Each leg is a one-way search through the search cache and
+        coalescing. The multi_city_candidates_per_leg cheapest flights of each
+        leg that pass the filters are combined best-first, so only as many
+        combinations are looked at as it takes to find `limit` itineraries
+        whose legs leave at least multi_city_min_connection_minutes after the
+        previous one lands. Raises ValueError for too few or too many legs or
+        legs out of date order.
+        """
+        legs = multi_request.legs
+        if not 2 <= len(legs) <= settings.multi_city_max_legs:
+            raise ValueError(f"A multi-city search needs 2 to {settings.multi_city_max_legs} legs")
+        if any(later.departure_date.date() < earlier.departure_date.date() for earlier, later in zip(legs, legs[1:])):
+            raise ValueError("Legs must be in departure date order")
+        
+        leg_requests = [
+            FlightSearchRequest(
+                origin_code=leg.origin_code,
+                destination_code=leg.destination_code,
+                departure_date=leg.departure_date,
+                passengers=multi_request.passengers,
+                preferred_airlines=multi_request.preferred_airlines,
+                max_stops=multi_request.max_stops,
+                preferred_currency=multi_request.preferred_currency
+            )
+            for leg in legs
+        ]
+        leg_flights = await asyncio.gather(*(self._search_day(leg_request) for leg_request in leg_requests))
+        candidates = [
+            self.ranker.rank(flights, leg_request, limit=settings.multi_city_candidates_per_leg)
+            for flights, leg_request in zip(leg_flights, leg_requests)
+        ]
+        
+        combinations = k_cheapest_combinations(
+            candidates,
+            k=min(multi_request.limit, settings.multi_city_max_results),
+            min_connection=timedelta(minutes=settings.multi_city_min_connection_minutes),
+            max_total=multi_request.max_price
+        )
+        return [
+            Itinerary(
+                total_price=total,
+                currency=multi_request.preferred_currency,
+                legs=[
+                    ItineraryLeg(**{field: flight_data.get(field) for field in ItineraryLeg.model_fields})
+                    for flight_data in flights
+                ]
+            )
+            for total, flights in combinations
+        ]
+
+    @staticmethod
+    def _date_range(start: datetime, end: datetime) -> List[date]:
+        days = (end.date() - start.date()).days + 1
+        if days < 1:
+            raise ValueError("The end date must not be before the start date")
+        if days > settings.calendar_max_days:
+            raise ValueError(f"A fare calendar covers at most {settings.calendar_max_days} days")
+        return [start.date() + timedelta(days=offset) for offset in range(days)]
 
-            # Remove duplicates and sort by price
-            unique_flights = self._deduplicate_flights(all_flights)
-            sorted_flights = sorted(unique_flights, key=lambda x: x.get("price", float('inf')))
+    async def search_flights_stream(self, db: Session, search_request: FlightSearchRequest, user: Optional[User] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Search for flights, yielding events as regions produce results.
+        
+        Yields a "flights" event for every batch a region delivers and a final
+        "summary" event with the first page of the deduplicated, filtered,
+        ranked and stored results. The full ranked set is kept in the result
+        store and the summary carries a cursor to it. Identical recent
+        searches are answered from the search cache. Batches and results
+        honour the request's filters and sort order. Regional providers are
+        searched only in the regions the region selector picks for the route;
+        the cache key stays on the configured regions so that choice does not
+        split the cache.
+        """
+        try:
+            search_record = self._create_search_record(db, search_request, user)
+            regions = self.region_selector.select(search_request.origin_code, search_request.destination_code, settings.search_regions)
+            cache_key = self.search_cache.make_key(search_request, settings.search_regions, self.providers.names())
             
-            # Store flights in database
-            stored_flights = []
-            for flight_data in sorted_flights[:50]:  # Limit to top 50 results
-                flight = Flight(
-                    flight_number=flight_data.get("flight_number", ""),
-                    airline_code=flight_data.get("airline_code", ""),
-                    airline_name=flight_data.get("airline_name", ""),
-                    origin_code=flight_data.get("origin_code", ""),
-                    origin_name=flight_data.get("origin_name", ""),
-                    destination_code=flight_data.get("destination_code", ""),
-                    destination_name=flight_data.get("destination_name", ""),
-                    departure_time=flight_data.get("departure_time"),
-                    arrival_time=flight_data.get("arrival_time"),
-                    duration_minutes=flight_data.get("duration_minutes", 0),
-                    base_price=flight_data.get("base_price", 0),
-                    currency=flight_data.get("currency", "USD"),
-                    taxes=flight_data.get("taxes", 0),
-                    fees=flight_data.get("fees", 0),
-                    total_price=flight_data.get("price", 0),
-                    available_seats=flight_data.get("available_seats"),
-                    booking_class=flight_data.get("booking_class"),
-                    aircraft_type=flight_data.get("aircraft_type"),
-                    stops=flight_data.get("stops", 0),
-                    is_direct=flight_data.get("is_direct", True),
-                    external_id=flight_data.get("external_id"),
-                    source_api="skyscanner",
-                    raw_data=json.dumps(flight_data)
+            cached = await self.search_cache.get(cache_key)
+            if cached is not None:
+                unique_flights, fresh = cached
+                region_flights = {}
+                if not fresh:
+                    self.search_cache.refresh_in_background(
+                        cache_key,
+                        lambda: self._fetch_unique_flights(search_request, regions)
+                    )
+                yield {"event": "flights", "region": None, "cached": True, "flights": self.ranker.rank(unique_flights, search_request)}
+            else:
+                # Identical searches in flight right now share one provider fan-out
+                call, is_leader = self.single_flight.join(
+                    cache_key,
+                    lambda publish: self._fetch_live(search_request, regions, cache_key, publish)
                 )
-                db.add(flight)
-                stored_flights.append(flight)
+                async for region, batch in call.follow():
+                    yield {"event": "flights", "region": region, "coalesced": not is_leader, "flights": self.ranker.rank(batch, search_request)}
+                
+                region_flights, unique_flights = await call.result()
+                if not is_leader:
+                    # Only the leader records price history for a coalesced search
+                    region_flights = {}
             
-            db.commit()
+            ranked_flights = self.ranker.rank(unique_flights, search_request)
+            if region_flights:
+                stored_rows = self._store_results(db, search_record, regions, region_flights, unique_flights, ranked_flights)
+            else:
+                # Cached or coalesced results were stored by the search that fetched them
+                stored_rows = self._reuse_results(db, search_record, unique_flights, ranked_flights)
             
-            # Update search record with results count
-            search_record.results_count = len(stored_flights)
-            db.commit()
+            page_size = settings.search_result_limit
+            next_cursor = None
+            total = len(stored_rows)
+            if total > page_size:
+                result_id, total = self.result_store.put([
+                    {field: row[field] for field in FlightResponse.model_fields} for row in stored_rows
+                ])
+                next_cursor = self.result_store.encode_cursor(result_id, page_size)
             
-            # Convert to response format
-            return [FlightResponse.from_orm(flight) for flight in stored_flights]
+            yield {
+                "event": "summary",
+                "search_id": search_record.id,
+                "cached": cached is not None,
+                "flights": [FlightResponse(**row) for row in stored_rows[:page_size]],
+                "next_cursor": next_cursor,
+                "total": total
+            }
             
         except Exception as e:
             logger.error(f"Error in flight search: {e}")
             raise
 
-    async def _search_skyscanner(self, search_request: FlightSearchRequest, region: str) -> List[Dict[str, Any]]:
-        """Search flights using Skyscanner API."""
-        if not self.skyscanner_api_key:
-            logger.warning("Skyscanner API key not configured")
-            return []
+    async def _fetch_live(
+        self,
+        search_request: FlightSearchRequest,
+        regions: List[str],
+        cache_key: str,
+        publish: Callable[[Tuple[Optional[str], List[Dict[str, Any]]]], None]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """Run the provider fan-out once for all coalesced callers and cache the result.
         
-        try:
-            async with httpx.AsyncClient() as client:
-                # Create session
-                session_url = f"{self.skyscanner_base_url}/pricing/v1.0"
-                session_data = {
-                    "country": region,
-                    "currency": search_request.preferred_currency,
-                    "locale": "en-US",
-                    "originPlace": search_request.origin_code,
-                    "destinationPlace": search_request.destination_code,
-                    "outboundDate": search_request.departure_date.strftime("%Y-%m-%d"),
-                    "adults": search_request.passengers
-                }
-                
-                if search_request.return_date:
-                    session_data["inboundDate"] = search_request.return_date.strftime("%Y-%m-%d")
-                
-                headers = {
-                    "X-RapidAPI-Key": self.skyscanner_api_key,
-                    "Content-Type": "application/x-www-form-urlencoded"
-                }
-                
-                response = await client.post(session_url, data=session_data, headers=headers)
-                response.raise_for_status()
-                
-                # Poll for results
-                session_key = response.headers.get("Location", "").split("/")[-1]
-                results_url = f"{self.skyscanner_base_url}/pricing/uk2/v1.0/{session_key}"
-                
-                # Poll for results (simplified - in production, use proper polling)
-                await asyncio.sleep(2)
-                results_response = await client.get(results_url, headers=headers)
-                results_response.raise_for_status()
-                
-                return self._parse_skyscanner_results(results_response.json())
-                
-        except Exception as e:
-            logger.error(f"Error searching Skyscanner: {e}")
-            return []
+        Publishes (region, batch) as batches arrive and returns the per-region
+        flights together with the deduplicated list. With distributed
+        coalescing another worker may already be running the same search; its
+        cached result is then used and no regions are returned.
+        """
+        if settings.search_coalesce_distributed:
+            async with self.single_flight.redis_lock(cache_key) as acquired:
+                if not acquired:
+                    unique_flights = await self.single_flight.wait_for_leader(
+                        cache_key,
+                        lambda: self.search_cache.peek(cache_key)
+                    )
+                    if unique_flights is not None:
+                        publish((None, unique_flights))
+                        return {}, unique_flights
+                return await self._fetch_and_cache(search_request, regions, cache_key, publish)
+        
+        return await self._fetch_and_cache(search_request, regions, cache_key, publish)
 
-    def _parse_skyscanner_results(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Parse Skyscanner API results."""
-        flights = []
+    async def _fetch_and_cache(
+        self,
+        search_request: FlightSearchRequest,
+        regions: List[str],
+        cache_key: str,
+        publish: Callable[[Tuple[Optional[str], List[Dict[str, Any]]]], None]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        region_results: Dict[Optional[str], Dict[Tuple[str, str, str], Dict[str, Any]]] = {}
+        async for region, batch in self._iter_sources(search_request, regions):
+            self._merge_cheapest(region_results.setdefault(region, {}), batch)
+            publish((region, batch))
         
-        try:
-            itineraries = results.get("Itineraries", [])
-            legs = results.get("Legs", [])
-            carriers = results.get("Carriers", [])
-            places = results.get("Places", [])
-            
-            for itinerary in itineraries:
-                pricing_options = itinerary.get("PricingOptions", [])
-                if not pricing_options:
-                    continue
-                
-                # Get the cheapest option
-                cheapest_option = min(pricing_options, key=lambda x: x.get("Price", float('inf')))
-                price = cheapest_option.get("Price", 0)
-                
-                # Get leg information
-                outbound_leg_id = itinerary.get("OutboundLegId")
-                inbound_leg_id = itinerary.get("InboundLegId")
-                
-                for leg in legs:
-                    if leg.get("Id") == outbound_leg_id:
-                        flight_data = self._parse_leg(leg, carriers, places, price)
-                        if flight_data:
-                            flights.append(flight_data)
-                        break
-                        
-        except Exception as e:
-            logger.error(f"Error parsing Skyscanner results: {e}")
+        region_flights = {region: list(flights.values()) for region, flights in region_results.items()}
+        unique_flights = self._deduplicate_flights(
+            [flight for flights in region_flights.values() for flight in flights]
+        )
+        if region_flights:
+            await self.search_cache.set(cache_key, unique_flights)
+        return region_flights, unique_flights
+
+    async def _fetch_unique_flights(self, search_request: FlightSearchRequest, regions: List[str]) -> List[Dict[str, Any]]:
+        """Run the provider fan-out and return deduplicated flights, without touching the database."""
+        region_flights = await self._search_regions(search_request, regions)
+        return self._deduplicate_flights([flight for flights in region_flights.values() for flight in flights])
+
+    async def _search_day(self, search_request: FlightSearchRequest) -> List[Dict[str, Any]]:
+        """Deduplicated flights for one search, from the search cache or one coalesced fan-out.
+        
+        Nothing is written to the database; the region selector still
+        learns from the fan-out.
+        """
+        regions = self.region_selector.select(search_request.origin_code, search_request.destination_code, settings.search_regions)
+        cache_key = self.search_cache.make_key(search_request, settings.search_regions, self.providers.names())
+        
+        cached = await self.search_cache.get(cache_key)
+        if cached is not None:
+            unique_flights, fresh = cached
+            if not fresh:
+                self.search_cache.refresh_in_background(
+                    cache_key,
+                    lambda: self._fetch_unique_flights(search_request, regions)
+                )
+            return unique_flights
         
-        return flights
+        call, is_leader = self.single_flight.join(
+            cache_key,
+            lambda publish: self._fetch_live(search_request, regions, cache_key, publish)
+        )
+        region_flights, unique_flights = await call.result()
+        if is_leader:
+            self._observe_regions(search_request.origin_code, search_request.destination_code, regions, region_flights)
+        return unique_flights
+
+    async def reprice(self, search_request: FlightSearchRequest) -> Tuple[Dict[Optional[str], List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """Fresh per-region prices for a route, skipping cached results.
 
-    def _parse_leg(self, leg: Dict[str, Any], carriers: List[Dict], places: List[Dict], price: float) -> Optional[Dict[str, Any]]:
-        """Parse a flight leg into our format."""
+        Joins an identical live search if one is running and refreshes the
+        search cache, so users searching the route next are answered from
+        it. Returns (per-region flights, deduplicated flights); the regions
+        are empty when another caller led the fan-out.
+        """
+        regions = self.region_selector.select(search_request.origin_code, search_request.destination_code, settings.search_regions)
+        cache_key = self.search_cache.make_key(search_request, settings.search_regions, self.providers.names())
+        call, is_leader = self.single_flight.join(
+            cache_key,
+            lambda publish: self._fetch_live(search_request, regions, cache_key, publish)
+        )
+        region_flights, unique_flights = await call.result()
+        if not is_leader:
+            return {}, unique_flights
+        self._observe_regions(search_request.origin_code, search_request.destination_code, regions, region_flights)
+        return region_flights, unique_flights
+
+    def _create_search_record(self, db: Session, search_request: FlightSearchRequest, user: Optional[User]) -> FlightSearch:
+        search_record = FlightSearch(
+            user_id=user.id if user else None,
+            origin_code=search_request.origin_code,
+            destination_code=search_request.destination_code,
+            departure_date=search_request.departure_date,
+            return_date=search_request.return_date,
+            passengers=search_request.passengers,
+            flight_type=search_request.flight_type,
+            preferred_airlines=json.dumps(search_request.preferred_airlines) if search_request.preferred_airlines else None,
+            max_stops=search_request.max_stops,
+            max_price=search_request.max_price,
+            preferred_currency=search_request.preferred_currency
+        )
+        db.add(search_record)
+        db.commit()
+        db.refresh(search_record)
+        return search_record
+
+    def _store_results(
+        self,
+        db: Session,
+        search_record: FlightSearch,
+        regions: List[str],
+        region_results: Dict[str, List[Dict[str, Any]]],
+        unique_flights: List[Dict[str, Any]],
+        ranked_flights: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Upsert the flights a search fetched and record every region's prices, in one transaction.
+        
+        Each flight is stored once per fare context (currency, passengers and
+        trip type) on its natural key and repriced by later searches; price history rows point at that canonical row and the
+        parsed API data goes, compressed, to the flight_raw_data side table.
+        Rows are written with multi-row statements and ids come back through
+        RETURNING. Once committed, the per-region prices also update the
+        region selector's scores for the route and set off matching price
+        alerts.
+        Returns the stored rows, with ids, for ranked_flights in rank order.
+        """
         try:
-            # Get carrier information
-            carrier_id = leg.get("Carriers", [0])[0] if leg.get("Carriers") else None
-            carrier = next((c for c in carriers if c.get("Id") == carrier_id), {})
-            
-            # Get origin and destination
-            origin_id = leg.get("OriginStation")
-            destination_id = leg.get("DestinationStation")
-            
-            origin = next((p for p in places if p.get("Id") == origin_id), {})
-            destination = next((p for p in places if p.get("Id") == destination_id), {})
-            
-            # Calculate duration
-            departure_time = datetime.fromisoformat(leg.get("Departure", "").replace("Z", "+00:00"))
-            arrival_time = datetime.fromisoformat(leg.get("Arrival", "").replace("Z", "+00:00"))
-            duration_minutes = int((arrival_time - departure_time).total_seconds() / 60)
+            stored_rows = upsert_flights(db, [flight_row(flight_data) for flight_data in unique_flights])
+            stored_by_key = {natural_key(row): row for row in stored_rows}
+            flight_ids = {key: row["id"] for key, row in stored_by_key.items()}
+            upsert_raw_data(db, flight_ids, unique_flights)
+            ticks = price_history_rows(search_record.id, region_results, flight_ids)
+            insert_price_history(db, ticks)
             
-            return {
-                "flight_number": f"{carrier.get('Code', '')}{leg.get('FlightNumber', '')}",
-                "airline_code": carrier.get("Code", ""),
-                "airline_name": carrier.get("Name", ""),
-                "origin_code": origin.get("Code", ""),
-                "origin_name": origin.get("Name", ""),
-                "destination_code": destination.get("Code", ""),
-                "destination_name": destination.get("Name", ""),
-                "departure_time": departure_time,
-                "arrival_time": arrival_time,
-                "duration_minutes": duration_minutes,
-                "base_price": price * 0.8,  # Estimate base price
-                "currency": "USD",
-                "taxes": price * 0.15,  # Estimate taxes
-                "fees": price * 0.05,  # Estimate fees
-                "price": price,
-                "stops": len(leg.get("Stops", [])),
-                "is_direct": len(leg.get("Stops", [])) == 0,
-                "external_id": str(leg.get("Id", "")),
-                "available_seats": None,
-                "booking_class": "Economy",
-                "aircraft_type": None
-            }
+            searched_regions = [region for region in region_results if region]
+            if searched_regions:
+                search_record.search_region = searched_regions[-1]
             
-        except Exception as e:
-            logger.error(f"Error parsing leg: {e}")
-            return None
+            ranked_rows = [stored_by_key[flight_key(flight_data)] for flight_data in ranked_flights]
+            search_record.results_count = len(ranked_rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        self._observe_regions(search_record.origin_code, search_record.destination_code, regions, region_results)
+        if ticks:
+            self.price_alerts.notify_matches(db, {
+                (search_record.origin_code, search_record.destination_code, search_record.departure_date.date()): ticks
+            })
+        return ranked_rows
+
+    def _observe_regions(
+        self,
+        origin_code: str,
+        destination_code: str,
+        regions: List[str],
+        region_results: Dict[Optional[str], List[Dict[str, Any]]]
+    ) -> None:
+        """Score one fan-out's regions; regions searched by regional providers that produced nothing lose."""
+        if not region_results:
+            return  # Another worker ran the fan-out
+        searched = regions if any(provider.regional for provider in self.providers.all()) else []
+        self.region_selector.observe(origin_code, destination_code, region_results, searched)
+
+    def _reuse_results(
+        self,
+        db: Session,
+        search_record: FlightSearch,
+        unique_flights: List[Dict[str, Any]],
+        ranked_flights: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Find the stored rows for results this search did not fetch itself.
+        
+        Cache hits and coalesced followers show prices another search
+        already recorded, so no flight is repriced and no price history is
+        added. Flights that are not stored yet, such as ones cached by
+        another worker that is still writing them, are inserted if still
+        absent, so they never overwrite a fresher price.
+        Returns the stored rows, with ids, for ranked_flights in rank order.
+        """
+        try:
+            found, missing = find_flights(db, [flight_row(flight_data) for flight_data in unique_flights])
+            stored_by_key = {natural_key(row): row for row in found + insert_missing_flights(db, missing)}
+            ranked_keys = [flight_key(flight_data) for flight_data in ranked_flights]
+            ranked_rows = [stored_by_key[key] for key in ranked_keys if key in stored_by_key]
+            search_record.results_count = len(ranked_rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return ranked_rows
+
+    async def _search_regions(self, search_request: FlightSearchRequest, regions: List[str]) -> Dict[Optional[str], List[Dict[str, Any]]]:
+        """Search all providers and regions concurrently and collect the cheapest flights per region."""
+        region_results: Dict[Optional[str], Dict[Tuple[str, str, str], Dict[str, Any]]] = {}
+        async for region, batch in self._iter_sources(search_request, regions):
+            self._merge_cheapest(region_results.setdefault(region, {}), batch)
+        return {region: list(flights.values()) for region, flights in region_results.items()}
+
+    async def _iter_sources(self, search_request: FlightSearchRequest, regions: List[str]) -> AsyncIterator[Tuple[Optional[str], List[Dict[str, Any]]]]:
+        """Search every provider concurrently, yielding (region, flights) batches as they arrive.
+        
+        Regional providers are searched once per region, others once with
+        region None. Each call first waits locally for a provider slot and
+        an egress; only then does its provider timeout start, so local
+        queueing never counts against the upstream's health. The whole
+        fan-out runs under the search budget. A call that fails or runs late
+        stops contributing; batches it delivered before that are kept.
+        Providers and regions whose circuit is open are skipped. Every batch
+        is converted to the request's preferred currency before it is yielded,
+        so merging, deduplication and ranking compare like with like; flights
+        in a currency without an exchange rate are left out.
+        """
+        sources = [
+            (provider, region)
+            for provider in self.providers.all()
+            for region in (regions if provider.regional else [None])
+        ]
+        if not sources:
+            return
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def produce(provider: FlightProvider, region: Optional[str]) -> None:
+            progress: Dict[str, float] = {}
+            try:
+                if not self.upstream_health.allow(provider.name, region):
+                    logger.warning(f"Circuit open, skipping {provider.name} from region {region}")
+                    return
+                async with self._source_slot(provider, region) as proxy_url:
+                    latency = await asyncio.wait_for(
+                        self._pump_source(search_request, provider, region, proxy_url, queue, progress),
+                        timeout=provider.timeout
+                    )
+                self.upstream_health.record_success(provider.name, region, latency)
+            except EgressUnavailable as e:
+                # A local bottleneck, not an upstream failure; the circuit is left alone
+                provider.stats["egress_unavailable"] += 1
+                logger.warning(f"Skipped {provider.name} from region {region}: {e}")
+            except asyncio.TimeoutError:
+                provider.stats["timeouts"] += 1
+                if "first_batch" in progress:
+                    # Slow to finish but answering: its batches are kept and the upstream counts as up
+                    self.upstream_health.record_success(provider.name, region, progress["first_batch"])
+                    logger.warning(f"Stopped {provider.name} from region {region} at its timeout after it delivered results")
+                else:
+                    self.upstream_health.record_failure(provider.name, region)
+                    logger.error(f"Timed out searching {provider.name} from region {region}")
+            except Exception as e:
+                provider.stats["errors"] += 1
+                self.upstream_health.record_failure(provider.name, region)
+                logger.error(f"Error searching {provider.name} from region {region}: {e!r}")
+            finally:
+                queue.put_nowait(None)
+        
+        tasks = [asyncio.create_task(produce(provider, region)) for provider, region in sources]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.search_budget_seconds
+        running = len(tasks)
+        
+        try:
+            while running:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    logger.warning(f"Search budget exceeded, dropping {running} unfinished provider call(s)")
+                    break
+                
+                if item is None:
+                    running -= 1
+                    continue
+                region, batch = item
+                batch = self.exchange_rates.convert_flights(batch, search_request.preferred_currency)
+                if batch:
+                    yield region, batch
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _pump_source(
+        self,
+        search_request: FlightSearchRequest,
+        provider: FlightProvider,
+        region: Optional[str],
+        proxy_url: Optional[str],
+        queue: asyncio.Queue,
+        progress: Dict[str, float]
+    ) -> float:
+        """Stream one provider call into the queue and return how long its first batch took.
+        
+        The first batch's latency is also put in progress["first_batch"] as
+        soon as it arrives, for a caller that cuts the call short.
+        The caller holds the first call's slot and egress (proxy_url). With
+        hedging on, a duplicate call is fired, in a slot of its own, when no
+        batch has arrived by the target's latency percentile. The first call
+        to deliver a batch is kept and the other is cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first_batch: Optional[float] = None
+        winner: Optional[int] = None
+        attempts: Dict[asyncio.Task, int] = {}
+        
+        async def attempt(number: int) -> None:
+            if number == 0:
+                await deliver(number, proxy_url)
+            else:
+                async with self._source_slot(provider, region) as hedge_proxy_url:
+                    await deliver(number, hedge_proxy_url)
+        
+        async def deliver(number: int, attempt_proxy_url: Optional[str]) -> None:
+            nonlocal first_batch, winner
+            async for batch in provider.search_in_slot(search_request, region, attempt_proxy_url):
+                if winner is None:
+                    winner = number
+                    first_batch = progress["first_batch"] = loop.time() - started
+                    self.upstream_health.record_first_batch(provider.name, region, first_batch)
+                    if number:
+                        self.upstream_health.stats["hedge_wins"] += 1
+                    for task, other in attempts.items():
+                        if other != number:
+                            task.cancel()
+                if winner == number:
+                    queue.put_nowait((region, batch))
+        
+        def start(number: int) -> None:
+            attempts[asyncio.create_task(attempt(number))] = number
+        
+        start(0)
+        hedge_delay = self.upstream_health.hedge_delay(provider.name, region)
+        pending = set(attempts)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                timeout = None
+                if hedge_delay is not None and len(attempts) == 1 and winner is None:
+                    timeout = max(started + hedge_delay - loop.time(), 0)
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.upstream_health.stats["hedges"] += 1
+                    start(1)
+                    pending = {task for task in attempts if not task.done()}
+                    continue
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None or winner == attempts[task]:
+                        return first_batch if first_batch is not None else loop.time() - started
+            if error is not None:
+                raise error
+            return first_batch if first_batch is not None else loop.time() - started
+        finally:
+            for task in attempts:
+                task.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    @asynccontextmanager
+    async def _source_slot(self, provider: FlightProvider, region: Optional[str]) -> AsyncIterator[Optional[str]]:
+        """Hold a provider slot and, for regional providers, an egress; yields the proxy URL to call through."""
+        async with provider.slot():
+            if not provider.regional:
+                yield None
+                return
+            async with self.egress_pool.checkout(region) as egress:
+                yield egress.proxy_url
+
+    def _merge_cheapest(self, flights_by_id: Dict[Tuple[str, str, str], Dict[str, Any]], batch: List[Dict[str, Any]]) -> None:
+        """Merge a batch into flights_by_id, keeping the cheapest price per provider offer."""
+        for flight_data in batch:
+            # Repriced itineraries replace earlier, more expensive ones
+            key = (flight_data.get("source_api", "skyscanner"), flight_data["external_id"], flight_data.get("return_leg_key", ""))
+            current = flights_by_id.get(key)
+            if current is None or flight_data["price"] < current["price"]:
+                flights_by_id[key] = flight_data
 
     def _deduplicate_flights(self, flights: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate flights based on flight number and times."""
-        seen = set()
+        """Remove duplicate flights based on flight number, times and return flight.
+        
+        When several providers or regions offer the same flight, the cheapest
+        offer is kept in the position the flight was first seen. Round trips
+        sharing an outbound flight stay apart when their inbound flights differ.
+        """
+        index: Dict[Tuple[Any, ...], int] = {}
         unique_flights = []
         
         for flight in flights:
             key = (
                 flight.get("flight_number", ""),
                 flight.get("departure_time"),
-                flight.get("arrival_time")
+                flight.get("arrival_time"),
+                flight.get("return_leg_key", "")
             )
-            if key not in seen:
-                seen.add(key)
+            position = index.get(key)
+            if position is None:
+                index[key] = len(unique_flights)
                 unique_flights.append(flight)
+            elif flight.get("price", float('inf')) < unique_flights[position].get("price", float('inf')):
+                unique_flights[position] = flight
         
         return unique_flights
 
@@ -266,6 +695,11 @@ class FlightService:
         """Get a flight by ID."""
         return db.query(Flight).filter(Flight.id == flight_id).first()
 
+    def get_flight_raw_data(self, db: Session, flight_id: int) -> Optional[Dict[str, Any]]:
+        """Get the stored API data for a flight, decompressed."""
+        raw = db.query(FlightRawData).filter(FlightRawData.flight_id == flight_id).first()
+        return decompress_payload(raw.payload) if raw else None
+
     def get_price_history(self, db: Session, flight_id: int, days: int = 30) -> List[PriceHistory]:
         """Get price history for a flight."""
         cutoff_date = datetime.utcnow() - timedelta(days=days)
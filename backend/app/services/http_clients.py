@@ -0,0 +1,176 @@
+import httpx
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class ProviderClientConfig:
+    """Connection settings for one upstream provider."""
+    timeout: float
+    http2: bool = False
+    max_connections: int = settings.http_max_connections
+    max_keepalive_connections: int = settings.http_max_keepalive_connections
+    keepalive_expiry: float = settings.http_keepalive_expiry
+
+
+DEFAULT_PROVIDER_CONFIGS: Dict[str, ProviderClientConfig] = {
+    "skyscanner": ProviderClientConfig(
+        timeout=settings.skyscanner_timeout_seconds,
+        http2=settings.skyscanner_http2
+    ),
+    "exchange_rate": ProviderClientConfig(
+        timeout=settings.exchange_rate_timeout_seconds,
+        http2=settings.exchange_rate_http2
+    ),
+}
+
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps a pooled transport and counts requests going through it."""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+        self.errors_total = 0
+        self.wait_seconds_total = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.requests_total += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            return await self._transport.handle_async_request(request)
+        except Exception:
+            self.errors_total += 1
+            raise
+        finally:
+            self.wait_seconds_total += time.perf_counter() - start
+            self.in_flight -= 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        # httpcore does not expose pool state publicly; read it defensively.
+        pool = getattr(self._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for c in connections if getattr(c, "is_idle", lambda: False)())
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+            "avg_request_seconds": round(self.wait_seconds_total / self.requests_total, 4) if self.requests_total else 0.0,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+        }
+
+
+class ProviderClientPool:
+    """Shared keep-alive HTTP clients, one per provider and egress proxy.
+
+    Clients are created lazily and live until the application shuts down, so
+    repeated provider calls reuse TCP/TLS connections instead of paying a new
+    handshake per request.
+    """
+
+    def __init__(self, configs: Optional[Dict[str, ProviderClientConfig]] = None):
+        self.configs = dict(configs or DEFAULT_PROVIDER_CONFIGS)
+        self._clients: Dict[Tuple[str, Optional[str]], httpx.AsyncClient] = {}
+        self._transports: Dict[Tuple[str, Optional[str]], _InstrumentedTransport] = {}
+        self._closed = False
+
+    async def start(self) -> None:
+        """Create the direct (non-proxied) client for every configured provider."""
+        self._closed = False
+        for provider in self.configs:
+            self.get(provider)
+
+    def get(self, provider: str, proxy_url: Optional[str] = None) -> httpx.AsyncClient:
+        """Return the shared client for a provider, optionally through a proxy."""
+        if self._closed:
+            raise RuntimeError("Provider client pool is closed")
+
+        key = (provider, proxy_url)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._create_client(provider, proxy_url)
+            self._clients[key] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close every client and its connections."""
+        self._closed = True
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._transports.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing provider client: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool utilisation per provider, summed over egress proxies."""
+        stats: Dict[str, Any] = {}
+        for (provider, _), transport in self._transports.items():
+            config = self.configs[provider]
+            entry = stats.setdefault(provider, {
+                "clients": 0,
+                "max_connections": config.max_connections,
+                "http2": config.http2 and HTTP2_AVAILABLE,
+                "in_flight": 0,
+                "peak_in_flight": 0,
+                "requests_total": 0,
+                "errors_total": 0,
+                "open_connections": 0,
+                "idle_connections": 0,
+            })
+            transport_stats = transport.get_stats()
+            entry["clients"] += 1
+            for field in ("in_flight", "requests_total", "errors_total", "open_connections", "idle_connections"):
+                entry[field] += transport_stats[field]
+            entry["peak_in_flight"] = max(entry["peak_in_flight"], transport_stats["peak_in_flight"])
+        return stats
+
+    def _create_client(self, provider: str, proxy_url: Optional[str]) -> httpx.AsyncClient:
+        config = self.configs.get(provider)
+        if config is None:
+            raise ValueError(f"Unknown provider: {provider}")
+
+        http2 = config.http2
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning(f"HTTP/2 requested for {provider} but h2 is not installed, using HTTP/1.1")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry
+        )
+        transport = _InstrumentedTransport(httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=limits,
+            proxy=httpx.Proxy(proxy_url) if proxy_url else None
+        ))
+        self._transports[(provider, proxy_url)] = transport
+
+        logger.info(f"Created shared HTTP client for {provider} (proxy={'yes' if proxy_url else 'no'}, http2={http2})")
+        return httpx.AsyncClient(transport=transport, timeout=config.timeout)
+
+
+provider_clients = ProviderClientPool()
@@ -0,0 +1,68 @@
+import heapq
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def connects(previous: Dict[str, Any], following: Dict[str, Any], min_connection: timedelta) -> bool:
+    """Whether `following` departs at least `min_connection` after `previous` arrives."""
+    try:
+        return following["departure_time"] >= previous["arrival_time"] + min_connection
+    except TypeError:
+        # Mixed naive/aware datetimes from different providers; compare wall-clock times
+        return following["departure_time"].replace(tzinfo=None) >= previous["arrival_time"].replace(tzinfo=None) + min_connection
+
+
+def k_cheapest_combinations(
+    legs: Sequence[Sequence[Dict[str, Any]]],
+    k: int,
+    min_connection: timedelta = timedelta(0),
+    max_total: Optional[float] = None,
+    max_expansions: Optional[int] = None
+) -> List[Tuple[float, List[Dict[str, Any]]]]:
+    """Return up to k (total_price, flights) combinations, one flight per leg, cheapest first.
+
+    Each leg's candidates must be sorted by price ascending. Combinations are
+    enumerated best-first from a heap: a state is a tuple of per-leg indices
+    and its successors advance one index at or after the last one advanced,
+    so every state is produced exactly once and never before a cheaper one.
+    Combinations whose flights do not connect are skipped, and so is every
+    successor that keeps both flights of their first broken connection, since
+    none of its own successors can fix it. Enumeration stops after k results,
+    once totals exceed max_total, or after max_expansions states (default
+    1000 * k) so sparse connections cannot run away.
+    """
+    if k <= 0 or not legs or any(not candidates for candidates in legs):
+        return []
+
+    prices = [[flight_data["price"] for flight_data in candidates] for candidates in legs]
+    max_expansions = max_expansions or 1000 * k
+    start = tuple(0 for _ in legs)
+    heap: List[Tuple[float, Tuple[int, ...], int]] = [(sum(leg_prices[0] for leg_prices in prices), start, 0)]
+    results: List[Tuple[float, List[Dict[str, Any]]]] = []
+    expansions = 0
+
+    while heap and len(results) < k and expansions < max_expansions:
+        total, state, last = heapq.heappop(heap)
+        if max_total is not None and total > max_total:
+            break
+        expansions += 1
+
+        flights = [legs[leg][index] for leg, index in enumerate(state)]
+        broken = next((i for i in range(len(flights) - 1) if not connects(flights[i], flights[i + 1], min_connection)), None)
+        if broken is None:
+            results.append((round(total, 2), flights))
+
+        # Successors only advance legs from `last` on, so past broken + 1 the break is permanent
+        stop = len(legs) if broken is None else min(broken + 2, len(legs))
+        for leg in range(last, stop):
+            index = state[leg] + 1
+            if index < len(legs[leg]):
+                successor = state[:leg] + (index,) + state[leg + 1:]
+                heapq.heappush(heap, (total - prices[leg][state[leg]] + prices[leg][index], successor, leg))
+
+    if len(results) < k and expansions >= max_expansions:
+        logger.warning(f"Stopped combining itineraries after {expansions} candidates with {len(results)} of {k} found")
+    return results
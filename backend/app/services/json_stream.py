@@ -0,0 +1,226 @@
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Iterable, List, Optional, Tuple
+
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[,\]}\s]')
+_WHITESPACE = " \t\r\n"
+_OPENERS = "{["
+
+
+class _ValueScanner:
+    """Resumable search for the end of one JSON value in a growing buffer."""
+
+    def __init__(self, buffer: str, start: int):
+        self.start = start
+        self.pos = start + 1
+        first = buffer[start]
+        self.in_string = first == '"'
+        self.depth = 1 if first in _OPENERS else 0
+        self.scalar = not self.in_string and self.depth == 0
+
+    def scan(self, buffer: str) -> Optional[int]:
+        """Return the end offset (exclusive) of the value, or None if more data is needed."""
+        if self.scalar:
+            match = _SCALAR_END.search(buffer, self.pos)
+            if match is None:
+                self.pos = len(buffer)
+                return None
+            return match.start()
+
+        while True:
+            if self.in_string:
+                match = _STRING_SPECIAL.search(buffer, self.pos)
+                if match is None:
+                    self.pos = len(buffer)
+                    return None
+                if buffer[match.start()] == "\\":
+                    if match.start() + 1 >= len(buffer):
+                        self.pos = match.start()
+                        return None
+                    self.pos = match.start() + 2
+                    continue
+                self.in_string = False
+                self.pos = match.end()
+                if self.depth == 0:
+                    return self.pos
+                continue
+
+            match = _STRUCTURAL.search(buffer, self.pos)
+            if match is None:
+                self.pos = len(buffer)
+                return None
+            char = buffer[match.start()]
+            self.pos = match.end()
+            if char == '"':
+                self.in_string = True
+            elif char in _OPENERS:
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return self.pos
+
+
+class JsonArrayStreamer:
+    """Incremental decoder for a top-level JSON object with large array members.
+
+    Elements of the members named in `arrays` are decoded and emitted one at a
+    time as ("Key", element) while bytes arrive. Members named in `skip` are
+    scanned past without being decoded. Any other member is decoded whole and
+    emitted as ("Key", value). Memory use is bounded by the largest single
+    element rather than by the document.
+    """
+
+    _START, _KEY, _COLON, _VALUE, _AFTER_VALUE, _ITEM, _AFTER_ITEM, _DONE = range(8)
+
+    def __init__(self, arrays: Iterable[str], skip: Iterable[str] = ()):
+        self.arrays = set(arrays)
+        self.skip = set(skip)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = self._START
+        self._key: Optional[str] = None
+        self._scanner: Optional[_ValueScanner] = None
+        # Buffer length to wait for before retrying a value that did not decode yet;
+        # grows geometrically so a large value is not re-decoded on every chunk.
+        self._retry_at = 0
+        self._final = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == self._DONE
+
+    def feed(self, data: bytes) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return every item completed by it."""
+        if self._scanner is None and self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._retry_at = max(self._retry_at - self._pos, 0)
+            self._pos = 0
+        self._buffer += self._text.decode(data)
+        return self._drain()
+
+    def finish(self) -> List[Tuple[str, Any]]:
+        """Signal the end of input and return any remaining items."""
+        self._buffer += self._text.decode(b"", final=True)
+        self._final = True
+        items = self._drain()
+        if self._state != self._DONE:
+            raise ValueError("Truncated JSON document")
+        return items
+
+    def _drain(self) -> List[Tuple[str, Any]]:
+        items: List[Tuple[str, Any]] = []
+        while self._step(items):
+            pass
+        return items
+
+    def _step(self, items: List[Tuple[str, Any]]) -> bool:
+        """Advance by one token; return False when more data is needed."""
+        buffer = self._buffer
+        if self._scanner is not None:
+            return self._finish_skip()
+
+        while self._pos < len(buffer) and buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        if self._pos >= len(buffer) or self._state == self._DONE:
+            return False
+        char = buffer[self._pos]
+
+        if self._state == self._START:
+            self._expect(char, "{")
+            self._state = self._KEY
+        elif self._state == self._KEY and char == "}":
+            self._pos += 1
+            self._state = self._DONE
+        elif self._state == self._COLON:
+            self._expect(char, ":")
+            self._state = self._VALUE
+        elif self._state == self._AFTER_VALUE:
+            if char == "}":
+                self._pos += 1
+                self._state = self._DONE
+            else:
+                self._expect(char, ",")
+                self._state = self._KEY
+        elif self._state == self._AFTER_ITEM:
+            if char == "]":
+                self._pos += 1
+                self._state = self._AFTER_VALUE
+            else:
+                self._expect(char, ",")
+                self._state = self._ITEM
+        elif self._state == self._ITEM and char == "]":
+            self._pos += 1
+            self._state = self._AFTER_VALUE
+        elif self._state == self._VALUE and char == "[" and self._key in self.arrays:
+            self._pos += 1
+            self._state = self._ITEM
+        elif self._state == self._VALUE and self._key in self.skip:
+            self._scanner = _ValueScanner(buffer, self._pos)
+            return self._finish_skip()
+        else:
+            return self._decode_value(items)
+        return True
+
+    def _decode_value(self, items: List[Tuple[str, Any]]) -> bool:
+        buffer = self._buffer
+        if not self._final:
+            if len(buffer) < self._retry_at:
+                return False
+            # A number at the end of the buffer may still be growing
+            if buffer[self._pos] not in '{["' and _SCALAR_END.search(buffer, self._pos) is None:
+                return False
+
+        try:
+            value, end = self._decoder.raw_decode(buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._final:
+                raise
+            self._retry_at = self._pos + 2 * (len(buffer) - self._pos)
+            return False
+
+        self._retry_at = 0
+        self._pos = end
+        if self._state == self._KEY:
+            if not isinstance(value, str):
+                raise ValueError(f"Expected an object key at offset {self._pos}")
+            self._key = value
+            self._state = self._COLON
+        elif self._state == self._ITEM:
+            items.append((self._key, value))
+            self._state = self._AFTER_ITEM
+        else:
+            items.append((self._key, value))
+            self._state = self._AFTER_VALUE
+        return True
+
+    def _finish_skip(self) -> bool:
+        end = self._scanner.scan(self._buffer)
+        if end is None:
+            if self._final:
+                raise ValueError("Truncated JSON document")
+            return False
+        self._scanner = None
+        self._pos = end
+        self._state = self._AFTER_VALUE
+        return True
+
+    def _expect(self, char: str, expected: str) -> None:
+        if char != expected:
+            raise ValueError(f"Expected {expected!r} at offset {self._pos}, got {char!r}")
+        self._pos += 1
+
+
+async def iter_json_arrays(chunks: AsyncIterator[bytes], arrays: Iterable[str], skip: Iterable[str] = ()) -> AsyncIterator[Tuple[str, Any]]:
+    """Decode a byte stream with JsonArrayStreamer, yielding items as they complete."""
+    streamer = JsonArrayStreamer(arrays, skip)
+    async for chunk in chunks:
+        for item in streamer.feed(chunk):
+            yield item
+    for item in streamer.finish():
+        yield item
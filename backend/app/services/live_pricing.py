@@ -0,0 +1,145 @@
+import asyncio
+import httpx
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from ..config import settings
+from .json_stream import iter_json_arrays
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATUS_COMPLETE = "UpdatesComplete"
+
+# Payload members decoded element by element, and members never decoded at all
+STREAMED_MEMBERS = ("Itineraries", "Legs", "Carriers", "Places")
+SKIPPED_MEMBERS = ("Segments", "Agents", "Currencies")
+
+# The only leg fields that parsing reads
+LEG_FIELDS = ("Id", "Carriers", "FlightNumber", "OriginStation", "DestinationStation", "Departure", "Arrival", "Stops")
+
+
+@dataclass
+class PollUpdate:
+    """Result of one poll that brought new or repriced itineraries."""
+    payload: Dict[str, Any]  # Latest cumulative session payload, compacted
+    itineraries: List[Dict[str, Any]]  # Itineraries that are new or cheaper since the last update
+    complete: bool
+    polls: int
+
+
+def itinerary_key(itinerary: Dict[str, Any]) -> Tuple[Any, Any]:
+    return itinerary.get("OutboundLegId"), itinerary.get("InboundLegId")
+
+
+def itinerary_price(itinerary: Dict[str, Any]) -> float:
+    return min((o.get("Price", float('inf')) for o in itinerary.get("PricingOptions", [])), default=float('inf'))
+
+
+def compact_itinerary(itinerary: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce an itinerary to its legs and cheapest price, dropping deeplinks and agents."""
+    return {
+        "OutboundLegId": itinerary.get("OutboundLegId"),
+        "InboundLegId": itinerary.get("InboundLegId"),
+        "PricingOptions": [{"Price": itinerary_price(itinerary)}] if itinerary.get("PricingOptions") else [],
+    }
+
+
+async def read_compact_payload(chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+    """Decode a live-pricing response body incrementally into a compact payload.
+    
+    The raw body and the fully decoded document are never held in memory;
+    each itinerary and leg is reduced to the fields parsing needs as soon as
+    it has been decoded. Memory is not bounded, though: every compacted
+    itinerary, leg, carrier and place is kept until the body ends, so use
+    grows with the compacted payload, which is much smaller than the body.
+    """
+    payload: Dict[str, Any] = {member: [] for member in STREAMED_MEMBERS}
+    async for key, value in iter_json_arrays(chunks, STREAMED_MEMBERS, SKIPPED_MEMBERS):
+        if key == "Itineraries":
+            payload[key].append(compact_itinerary(value))
+        elif key == "Legs":
+            payload[key].append({field: value[field] for field in LEG_FIELDS if field in value})
+        elif key in STREAMED_MEMBERS:
+            payload[key].append(value)
+        else:
+            payload[key] = value
+    return payload
+
+
+class LivePricingPoller:
+    """Polls a Skyscanner live-pricing session until it completes or a deadline expires.
+
+    The first poll happens after a short delay. While polls keep bringing new
+    itineraries the delay stays put; polls that bring nothing back off
+    exponentially up to max_delay. Every poll with changes is yielded, so
+    callers can use early results before the session finishes.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        initial_delay: float = settings.skyscanner_poll_initial_delay,
+        max_delay: float = settings.skyscanner_poll_max_delay,
+        backoff: float = settings.skyscanner_poll_backoff,
+        deadline: float = settings.skyscanner_poll_deadline_seconds
+    ):
+        self.client = client
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.deadline = deadline
+
+    async def poll(
+        self,
+        results_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        started: Optional[float] = None
+    ) -> AsyncIterator[PollUpdate]:
+        """Yield each poll that changes the results.
+
+        The deadline runs from started (loop time) when given, so time spent
+        creating the session counts against it.
+        """
+        loop = asyncio.get_running_loop()
+        deadline_at = (loop.time() if started is None else started) + self.deadline
+        delay = self.initial_delay
+        best_prices: Dict[Tuple[Any, Any], float] = {}
+        polls = 0
+
+        while True:
+            remaining = deadline_at - loop.time()
+            if remaining <= 0:
+                logger.warning(f"Live pricing session not complete after {polls} polls, returning partial results")
+                return
+
+            await asyncio.sleep(min(delay, remaining))
+            async with self.client.stream("GET", results_url, headers=headers) as response:
+                polls += 1
+
+                # 304: nothing new yet. 429: we are polling too fast.
+                if response.status_code == 304:
+                    delay = min(delay * self.backoff, self.max_delay)
+                    continue
+                if response.status_code == 429:
+                    delay = self.max_delay
+                    continue
+                response.raise_for_status()
+
+                payload = await read_compact_payload(response.aiter_bytes())
+
+            changed = []
+            for itinerary in payload.get("Itineraries", []):
+                key = itinerary_key(itinerary)
+                price = itinerary_price(itinerary)
+                if price < best_prices.get(key, float('inf')):
+                    best_prices[key] = price
+                    changed.append(itinerary)
+
+            complete = payload.get("Status") == STATUS_COMPLETE
+            if changed or complete:
+                yield PollUpdate(payload=payload, itineraries=changed, complete=complete, polls=polls)
+            if complete:
+                return
+
+            if not changed:
+                delay = min(delay * self.backoff, self.max_delay)
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from datetime import datetime, timedelta
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from ..models.notification import Notification, NotificationType, NotificationStatus
 from ..models.user import User
@@ -113,23 +114,87 @@ class NotificationService:
 
     def send_price_drop_notification(self, db: Session, user: User, flight_id: int, old_price: float, new_price: float) -> Notification:
         """Send a price drop notification."""
+        return self.create_notification(db, self.price_drop_notification(user.id, flight_id, old_price, new_price))
+
+    def price_drop_notification(self, user_id: int, flight_id: Optional[int], old_price: float, new_price: float, currency: str = "USD") -> NotificationCreate:
+        """Build, without saving, the notification for a tracked price dropping from old_price to new_price."""
         price_drop_percent = ((old_price - new_price) / old_price) * 100
+        old_text, new_text = (
+            (f"${old_price:.2f}", f"${new_price:.2f}") if currency == "USD"
+            else (f"{old_price:.2f} {currency}", f"{new_price:.2f} {currency}")
+        )
         
-        notification_data = NotificationCreate(
-            user_id=user.id,
+        return NotificationCreate(
+            user_id=user_id,
             title="Price Drop Alert! 🎉",
-            message=f"Great news! The price for your tracked flight has dropped by {price_drop_percent:.1f}% from ${old_price:.2f} to ${new_price:.2f}.",
+            message=f"Great news! The price for your tracked flight has dropped by {price_drop_percent:.1f}% from {old_text} to {new_text}.",
             notification_type=NotificationType.PRICE_DROP,
             priority=2,  # High priority
             related_flight_id=flight_id,
-            extra_metadata={
+            metadata={
                 "old_price": old_price,
                 "new_price": new_price,
+                "currency": currency,
                 "price_drop_percent": price_drop_percent
             }
         )
+
+    def price_alert_notification(
+        self,
+        user_id: int,
+        flight_id: Optional[int],
+        origin_code: str,
+        destination_code: str,
+        travel_month: str,
+        max_price: float,
+        price: float,
+        currency: str = "USD"
+    ) -> NotificationCreate:
+        """Build, without saving, the notification for a fare at or below a price alert's max_price."""
+        price_text, max_text = (
+            (f"${price:.2f}", f"${max_price:.2f}") if currency == "USD"
+            else (f"{price:.2f} {currency}", f"{max_price:.2f} {currency}")
+        )
+        month_text = datetime.strptime(travel_month, "%Y-%m").strftime("%B %Y")
+
+        return NotificationCreate(
+            user_id=user_id,
+            title="Price Alert! 🔔",
+            message=f"{origin_code} → {destination_code} in {month_text} is now {price_text}, under your alert of {max_text}.",
+            notification_type=NotificationType.PRICE_DROP,
+            priority=2,  # High priority
+            related_flight_id=flight_id,
+            metadata={
+                "origin_code": origin_code,
+                "destination_code": destination_code,
+                "travel_month": travel_month,
+                "max_price": max_price,
+                "price": price,
+                "currency": currency
+            }
+        )
+
+    def create_notifications(self, db: Session, notifications_data: List[NotificationCreate]) -> int:
+        """Insert many notifications with one multi-row INSERT. Nothing is committed; the caller owns the transaction."""
+        if not notifications_data:
+            return 0
         
-        return self.create_notification(db, notification_data)
+        db.execute(insert(Notification.__table__), [
+            {
+                "user_id": notification_data.user_id,
+                "title": notification_data.title,
+                "message": notification_data.message,
+                "notification_type": notification_data.notification_type,
+                "priority": notification_data.priority,
+                "scheduled_at": notification_data.scheduled_at,
+                "related_booking_id": notification_data.related_booking_id,
+                "related_flight_id": notification_data.related_flight_id,
+                "related_search_id": notification_data.related_search_id,
+                "extra_metadata": json.dumps(notification_data.metadata) if notification_data.metadata else None
+            }
+            for notification_data in notifications_data
+        ])
+        return len(notifications_data)
 
     def send_booking_confirmation(self, db: Session, user: User, booking_id: int, booking_reference: str) -> Notification:
         """Send booking confirmation notification."""
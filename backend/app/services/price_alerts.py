@@ -0,0 +1,306 @@
+import asyncio
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import get_sync_sessionmaker
+from ..models.flight import PriceAlert
+from ..models.user import User
+from ..schemas.flight import PriceAlertCreate
+from .exchange_rates import ExchangeRateService, exchange_rate_service as default_exchange_rate_service
+from .notification_service import NotificationService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (origin, destination, travel month as YYYY-MM); alerts are bucketed by this and their currency
+AlertRoute = Tuple[str, str, str]
+
+# (alert id, route, currency, max price) of an alert taken out of the index by a match
+ClaimedAlert = Tuple[int, AlertRoute, str, float]
+
+
+class _Bucket:
+    """One route, month and currency's alerts, as parallel arrays sorted by max price."""
+
+    __slots__ = ("thresholds", "ids")
+
+    def __init__(self):
+        self.thresholds = array("d")
+        self.ids = array("q")
+
+
+class AlertIndex:
+    """Active price alerts indexed for matching fares without scanning subscriptions.
+
+    Alerts are bucketed by route, travel month and currency, and each bucket
+    keeps its max prices sorted. A fare matches every alert whose max price
+    is at or above it, which is always the tail of the bucket, so a match is
+    one bisect per currency quoted on the route. Alerts fire once: claim()
+    cuts the matched tail out of the bucket, so the work besides the bisect
+    is paid once per alert, not once per fare.
+
+    Fares are recorded from worker threads as well as the event loop, so
+    every operation holds a lock.
+    """
+
+    def __init__(self):
+        self._routes: Dict[AlertRoute, Dict[str, _Bucket]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def replace(self, alerts: Iterable[Tuple[int, str, str, str, str, float]]) -> None:
+        """Rebuild the index from (id, origin, destination, month, currency, max price) rows."""
+        grouped: Dict[Tuple[str, str, str, str], List[Tuple[float, int]]] = {}
+        for alert_id, origin, destination, month, currency, max_price in alerts:
+            key = (origin, destination, month, currency)
+            entries = grouped.get(key)
+            if entries is None:
+                entries = grouped[key] = []
+            entries.append((max_price, alert_id))
+
+        routes: Dict[AlertRoute, Dict[str, _Bucket]] = {}
+        size = 0
+        for (origin, destination, month, currency), entries in grouped.items():
+            entries.sort()
+            bucket = _Bucket()
+            bucket.thresholds = array("d", [max_price for max_price, _ in entries])
+            bucket.ids = array("q", [alert_id for _, alert_id in entries])
+            routes.setdefault((origin, destination, month), {})[currency] = bucket
+            size += len(entries)
+        with self._lock:
+            self._routes, self._size = routes, size
+
+    def add(self, alert_id: int, route: AlertRoute, currency: str, max_price: float) -> None:
+        with self._lock:
+            bucket = self._routes.setdefault(route, {}).get(currency)
+            if bucket is None:
+                bucket = self._routes[route][currency] = _Bucket()
+            i = bisect_right(bucket.thresholds, max_price)
+            bucket.thresholds.insert(i, max_price)
+            bucket.ids.insert(i, alert_id)
+            self._size += 1
+
+    def remove(self, alert_id: int, route: AlertRoute, currency: str, max_price: float) -> bool:
+        with self._lock:
+            bucket = self._routes.get(route, {}).get(currency)
+            if bucket is None:
+                return False
+            i = bisect_left(bucket.thresholds, max_price)
+            # Alerts with the same max price sit together; find this one among them
+            while i < len(bucket.ids) and bucket.thresholds[i] == max_price:
+                if bucket.ids[i] == alert_id:
+                    del bucket.thresholds[i]
+                    del bucket.ids[i]
+                    self._size -= 1
+                    self._drop_if_empty(route, currency)
+                    return True
+                i += 1
+            return False
+
+    def claim(self, route: AlertRoute, price_in: Callable[[str], Optional[float]]) -> List[ClaimedAlert]:
+        """Take out and return every alert on `route` that the fare matches.
+
+        price_in(currency) is the fare in that currency, or None when it
+        cannot be expressed in it; only currencies with alerts are asked.
+        """
+        claimed: List[ClaimedAlert] = []
+        with self._lock:
+            for currency, bucket in list(self._routes.get(route, {}).items()):
+                price = price_in(currency)
+                if price is None:
+                    continue
+                i = bisect_left(bucket.thresholds, price)
+                if i == len(bucket.thresholds):
+                    continue
+                claimed.extend((alert_id, route, currency, max_price) for alert_id, max_price in zip(bucket.ids[i:], bucket.thresholds[i:]))
+                del bucket.thresholds[i:]
+                del bucket.ids[i:]
+                self._drop_if_empty(route, currency)
+            self._size -= len(claimed)
+        return claimed
+
+    def restore(self, claimed: List[ClaimedAlert]) -> None:
+        """Put claimed alerts back, when their notifications could not be written."""
+        for alert_id, route, currency, max_price in claimed:
+            self.add(alert_id, route, currency, max_price)
+
+    def _drop_if_empty(self, route: AlertRoute, currency: str) -> None:
+        buckets = self._routes[route]
+        if not buckets[currency].ids:
+            del buckets[currency]
+            if not buckets:
+                del self._routes[route]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"alerts": self._size, "routes": len(self._routes)}
+
+
+def travel_month(text: str) -> str:
+    """Normalise a YYYY-MM month, raising ValueError for anything else."""
+    return datetime.strptime(text.strip(), "%Y-%m").strftime("%Y-%m")
+
+
+class PriceAlertService:
+    """Price alert subscriptions ("LHR → JFK under $400 in March 2027"), matched as fares are recorded.
+
+    Every price history tick written by a search or the price tracker is
+    passed to notify_matches(), which finds the alerts it satisfies through
+    the AlertIndex. A fare in another currency is converted to each alert
+    currency on the route at current exchange rates. Each matched alert gets
+    one notification and is deactivated.
+    """
+
+    def __init__(
+        self,
+        notification_service: Optional[NotificationService] = None,
+        exchange_rates: Optional[ExchangeRateService] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_per_user: int = settings.price_alerts_max_per_user
+    ):
+        self.notification_service = notification_service or NotificationService()
+        self.exchange_rates = exchange_rates or default_exchange_rate_service
+        self.session_factory = session_factory  # Defaults to synchronous sessions on the app database
+        self.max_per_user = max_per_user
+        self.index = AlertIndex()
+        self.stats = {"routes_matched": 0, "alerts_triggered": 0, "match_errors": 0}
+
+    async def start(self) -> None:
+        """Load active alerts into the index."""
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception as e:
+            logger.error(f"Error loading price alerts: {e}")
+
+    def load(self) -> None:
+        start = time.perf_counter()
+        with (self.session_factory or get_sync_sessionmaker())() as db:
+            rows = db.query(
+                PriceAlert.id, PriceAlert.origin_code, PriceAlert.destination_code,
+                PriceAlert.travel_month, PriceAlert.currency, PriceAlert.max_price
+            ).filter(PriceAlert.is_active == True).all()
+        self.index.replace(rows)
+        logger.info(f"Loaded {len(rows)} price alerts in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    def create_alert(self, db: Session, user: User, alert_request: PriceAlertCreate) -> PriceAlert:
+        month = travel_month(alert_request.travel_month)
+        if alert_request.max_price <= 0:
+            raise ValueError("max_price must be positive")
+        active = db.query(PriceAlert).filter(PriceAlert.user_id == user.id, PriceAlert.is_active == True).count()
+        if active >= self.max_per_user:
+            raise ValueError(f"At most {self.max_per_user} price alerts can be active at once")
+
+        alert = PriceAlert(
+            user_id=user.id,
+            origin_code=alert_request.origin_code.upper(),
+            destination_code=alert_request.destination_code.upper(),
+            travel_month=month,
+            max_price=alert_request.max_price,
+            currency=alert_request.currency.upper()
+        )
+        db.add(alert)
+        db.commit()
+        db.refresh(alert)
+        self.index.add(alert.id, (alert.origin_code, alert.destination_code, month), alert.currency, alert.max_price)
+        return alert
+
+    def delete_alert(self, db: Session, user: User, alert_id: int) -> bool:
+        alert = db.query(PriceAlert).filter(PriceAlert.id == alert_id, PriceAlert.user_id == user.id).first()
+        if not alert:
+            return False
+        if alert.is_active:
+            self.index.remove(alert.id, (alert.origin_code, alert.destination_code, alert.travel_month), alert.currency, alert.max_price)
+        db.delete(alert)
+        db.commit()
+        return True
+
+    def get_alerts(self, db: Session, user: User) -> List[PriceAlert]:
+        return db.query(PriceAlert).filter(PriceAlert.user_id == user.id).order_by(
+            PriceAlert.is_active.desc(), PriceAlert.travel_month
+        ).all()
+
+    def notify_matches(self, db: Session, ticks_by_route: Dict[Tuple[str, str, date], List[Dict[str, Any]]]) -> int:
+        """Notify the alerts matched by freshly recorded price ticks, in their own transaction.
+
+        ticks_by_route maps (origin, destination, departure date) to
+        PriceHistory rows. Call it after the ticks are committed. Returns the
+        number of alerts triggered; on failure the alerts stay active.
+        """
+        claimed: List[ClaimedAlert] = []
+        fares: Dict[Tuple[AlertRoute, str], Tuple[float, Optional[int]]] = {}
+        for (origin, destination, departure), ticks in ticks_by_route.items():
+            cheapest: Dict[str, Dict[str, Any]] = {}
+            for tick in ticks:
+                currency = (tick.get("currency") or "USD").upper()
+                if tick.get("price") and (currency not in cheapest or tick["price"] < cheapest[currency]["price"]):
+                    cheapest[currency] = tick
+            if not cheapest:
+                continue
+
+            route = (origin.upper(), destination.upper(), departure.strftime("%Y-%m"))
+            route_claims = self.index.claim(route, lambda currency: self._fare_in(route, currency, cheapest, fares))
+            if route_claims:
+                self.stats["routes_matched"] += 1
+                claimed += route_claims
+        if not claimed:
+            return 0
+
+        try:
+            users = dict(db.query(PriceAlert.id, PriceAlert.user_id).filter(
+                PriceAlert.id.in_([alert_id for alert_id, _, _, _ in claimed]),
+                PriceAlert.is_active == True
+            ).all())
+            triggered_at = datetime.now(timezone.utc)
+            updates, notifications = [], []
+            for alert_id, route, currency, max_price in claimed:
+                if alert_id not in users:
+                    continue  # Deleted since it was indexed
+                price, flight_id = fares[(route, currency)]
+                updates.append({"row_id": alert_id, "is_active": False, "triggered_price": price, "triggered_flight_id": flight_id, "triggered_at": triggered_at})
+                notifications.append(self.notification_service.price_alert_notification(
+                    users[alert_id], flight_id, route[0], route[1], route[2], max_price, price, currency
+                ))
+            if updates:
+                db.execute(update(PriceAlert.__table__).where(PriceAlert.__table__.c.id == bindparam("row_id")), updates)
+                self.notification_service.create_notifications(db, notifications)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self.index.restore(claimed)
+            self.stats["match_errors"] += 1
+            logger.error(f"Error notifying {len(claimed)} price alerts: {e}")
+            return 0
+
+        self.stats["alerts_triggered"] += len(updates)
+        return len(updates)
+
+    def _fare_in(
+        self,
+        route: AlertRoute,
+        currency: str,
+        cheapest: Dict[str, Dict[str, Any]],
+        fares: Dict[Tuple[AlertRoute, str], Tuple[float, Optional[int]]]
+    ) -> Optional[float]:
+        """The route's cheapest tick in `currency`, converting other currencies; remembers the fare for the notification."""
+        best = None
+        for tick_currency, tick in cheapest.items():
+            price = tick["price"] if tick_currency == currency else self.exchange_rates.convert(tick["price"], tick_currency, currency)
+            if price is not None and (best is None or price < best[0]):
+                best = (price, tick.get("flight_id"))
+        if best is not None:
+            fares[(route, currency)] = best
+        return best[0] if best else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, **self.index.get_stats()}
+
+
+price_alert_service = PriceAlertService()
@@ -1,8 +1,12 @@
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from ..config import settings
 from ..models.flight import Flight, PriceHistory
 from ..schemas.flight import PricePredictionRequest, PricePredictionResponse
 from sklearn.linear_model import LinearRegression
@@ -12,10 +16,101 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# Rough per-model overhead besides its arrays, for the cache's byte accounting
+MODEL_OVERHEAD_BYTES = 400
+
+
+@dataclass(frozen=True)
+class FittedModel:
+    """A polynomial regression fitted on one flight's price history, reduced to its coefficients.
+
+    The arrays are read-only, so one fitted model can serve any number of
+    requests without one changing what another predicts with.
+    """
+    version: Tuple[int, int]  # (row count, newest row id) of the price history it was fitted on
+    history_length: int
+    powers: np.ndarray  # Exponent of each input feature in each polynomial term
+    coef: np.ndarray
+    intercept: float
+
+    @classmethod
+    def fit(cls, X: np.ndarray, y: np.ndarray, version: Tuple[int, int], degree: int) -> "FittedModel":
+        poly_features = PolynomialFeatures(degree=degree)
+        model = LinearRegression().fit(poly_features.fit_transform(X), y)
+        powers = np.array(poly_features.powers_, dtype=np.float64)
+        coef = np.array(model.coef_, dtype=np.float64)
+        powers.setflags(write=False)
+        coef.setflags(write=False)
+        return cls(version, len(X), powers, coef, float(model.intercept_))
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Predict a price for each row of features, as LinearRegression on PolynomialFeatures would."""
+        terms = np.prod(features[:, None, :].astype(np.float64) ** self.powers, axis=2)
+        return terms @ self.coef + self.intercept
+
+    @property
+    def size(self) -> int:
+        return self.powers.nbytes + self.coef.nbytes + MODEL_OVERHEAD_BYTES
+
+
+class FittedModelCache:
+    """Fitted models by flight id, each valid for one version of the flight's price history.
+
+    A lookup with a newer version misses, and the refitted model replaces
+    the old one. Least recently used models are evicted to stay within
+    `max_entries` and `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.price_model_cache_max_entries,
+        max_bytes: int = settings.price_model_cache_max_bytes
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._models: "OrderedDict[int, FittedModel]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "refits": 0, "evicted": 0}
+
+    def get(self, flight_id: int, version: Tuple[int, int]) -> Optional[FittedModel]:
+        fitted = self._models.get(flight_id)
+        if fitted is None or fitted.version != version:
+            self.stats["misses"] += 1
+            if fitted is not None:
+                self.stats["refits"] += 1  # New price history since it was fitted
+            return None
+        self._models.move_to_end(flight_id)
+        self.stats["hits"] += 1
+        return fitted
+
+    def put(self, flight_id: int, fitted: FittedModel) -> None:
+        self._discard(flight_id)
+        self._models[flight_id] = fitted
+        self._bytes += fitted.size
+        while self._models and (len(self._models) > self.max_entries or self._bytes > self.max_bytes):
+            self._discard(next(iter(self._models)))
+            self.stats["evicted"] += 1
+
+    def _discard(self, flight_id: int) -> None:
+        fitted = self._models.pop(flight_id, None)
+        if fitted is not None:
+            self._bytes -= fitted.size
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "models": len(self._models), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
 class PricePredictionService:
-    def __init__(self):
-        self.model = LinearRegression()
-        self.poly_features = PolynomialFeatures(degree=2)
+    """Price trend predictions from a regression over each flight's price history.
+
+    A flight's model is fitted once per version of its price history and
+    cached, so repeated predictions only check whether new PriceHistory
+    rows have arrived, with one aggregate query.
+    """
+
+    def __init__(self, model_cache: Optional[FittedModelCache] = None, degree: int = 2):
+        self.model_cache = model_cache or FittedModelCache()
+        self.degree = degree
 
     def predict_price_trend(self, db: Session, request: PricePredictionRequest) -> PricePredictionResponse:
         """Predict price trends for a flight."""
@@ -25,30 +120,37 @@ class PricePredictionService:
             if not flight:
                 raise ValueError(f"Flight {request.flight_id} not found")
 
-            # Get price history
-            price_history = db.query(PriceHistory).filter(
+            # Price history only grows, so its row count and newest id identify a version of it
+            count, newest_id = db.query(func.count(PriceHistory.id), func.max(PriceHistory.id)).filter(
                 PriceHistory.flight_id == request.flight_id
-            ).order_by(PriceHistory.recorded_at.asc()).all()
+            ).one()
 
-            if len(price_history) < 3:
+            if count < 3:
                 # Not enough data for prediction
                 return self._create_simple_prediction(flight, request.prediction_days)
 
-            # Prepare data for ML model
-            X, y = self._prepare_training_data(price_history)
-            
-            if len(X) < 3:
-                return self._create_simple_prediction(flight, request.prediction_days)
+            version = (count, newest_id)
+            fitted = self.model_cache.get(flight.id, version)
+            if fitted is None:
+                price_history = db.query(PriceHistory).filter(
+                    PriceHistory.flight_id == request.flight_id
+                ).order_by(PriceHistory.recorded_at.asc()).all()
+
+                # Prepare data for ML model
+                X, y = self._prepare_training_data(price_history)
+                
+                if len(X) < 3:
+                    return self._create_simple_prediction(flight, request.prediction_days)
 
-            # Train model
-            X_poly = self.poly_features.fit_transform(X)
-            self.model.fit(X_poly, y)
+                # Train model
+                fitted = FittedModel.fit(X, y, version, self.degree)
+                self.model_cache.put(flight.id, fitted)
 
             # Generate predictions
             predictions = self._generate_predictions(
                 flight, 
                 request.prediction_days, 
-                len(price_history)
+                fitted
             )
 
             # Calculate recommendation
@@ -90,30 +192,31 @@ class PricePredictionService:
         
         return X, y
 
-    def _generate_predictions(self, flight: Flight, days: int, history_length: int) -> List[Dict[str, Any]]:
+    def _generate_predictions(self, flight: Flight, days: int, fitted: FittedModel) -> List[Dict[str, Any]]:
         """Generate price predictions for future dates."""
         predictions = []
         current_date = datetime.utcnow()
+        future_dates = [current_date + timedelta(days=i) for i in range(days)]
         
-        for i in range(days):
-            future_date = current_date + timedelta(days=i)
-            
-            # Prepare features for prediction
-            features = np.array([[
-                history_length + i,  # day
+        # Prepare features for prediction
+        features = np.array([
+            [
+                fitted.history_length + i,  # day
                 future_date.hour,    # hour
                 future_date.weekday(),  # day_of_week
                 1 if future_date.weekday() >= 5 else 0  # is_weekend
-            ]])
-            
-            # Transform features
-            features_poly = self.poly_features.transform(features)
-            
-            # Predict price
-            predicted_price = self.model.predict(features_poly)[0]
+            ]
+            for i, future_date in enumerate(future_dates)
+        ]).reshape(days, 4)
+        
+        # Predict every day's price at once
+        predicted_prices = fitted.predict(features).tolist()
+        
+        for i, future_date in enumerate(future_dates):
+            predicted_price = predicted_prices[i]
             
             # Add some randomness to make it more realistic
-            noise = np.random.normal(0, predicted_price * 0.05)  # 5% noise
+            noise = np.random.normal(0, abs(predicted_price) * 0.05)  # 5% noise; a negative extrapolation is clamped below
             predicted_price = max(predicted_price + noise, flight.base_price * 0.5)  # Minimum 50% of base price
             
             # Calculate confidence based on model performance
@@ -228,3 +331,9 @@ class PricePredictionService:
         except Exception as e:
             logger.error(f"Error analyzing price patterns: {e}")
             return {"error": str(e)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.model_cache.get_stats()
+
+
+price_prediction_service = PricePredictionService()
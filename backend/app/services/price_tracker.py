@@ -0,0 +1,434 @@
+import asyncio
+import heapq
+import random
+import time
+from datetime import date, datetime, time as dt_time, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import get_sync_sessionmaker
+from ..models.flight import FlightSearch, FlightType, TrackedRoute
+from ..models.user import User
+from ..schemas.flight import FlightSearchRequest, TrackedRouteCreate
+from .flight_service import FlightService
+from .notification_service import NotificationService
+from .price_alerts import PriceAlertService, price_alert_service as default_price_alert_service
+from .search_persistence import flight_key, flight_row, insert_price_history, natural_key, price_history_rows, upsert_flights
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (origin, destination, departure date, return date, passengers, currency); trackers sharing one are priced together
+RouteKey = Tuple[str, str, date, Optional[date], int, str]
+
+
+def route_key(tracked: Any) -> RouteKey:
+    return (
+        tracked.origin_code.upper(),
+        tracked.destination_code.upper(),
+        tracked.departure_date.date(),
+        tracked.return_date.date() if tracked.return_date else None,
+        tracked.passengers or 1,
+        (tracked.preferred_currency or "USD").upper(),
+    )
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, in bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class PriceTracker:
+    """Re-prices tracked routes in the background, records price ticks and notifies price drops.
+
+    Trackers with the same route (see route_key) share one provider fan-out
+    per check, over the regions the region selector picks for the route.
+    Routes wait in a heap ordered by when they are next due, so when the
+    tracker falls behind every route is delayed alike and the longest
+    overdue go first. A token bucket caps route checks at `rate` per second
+    however many routes are tracked, and start times are spread over one
+    interval so routes loaded together do not come due together.
+
+    Due routes are checked in rounds of up to `batch_size`. Each round is
+    written in one transaction: a search record per route, the cheapest
+    flight per region as price history ticks, the trackers' latest prices,
+    and a notification for every tracker whose price fell at least
+    `drop_threshold` below its baseline. The committed ticks are then
+    matched against price alerts.
+    """
+
+    def __init__(
+        self,
+        flight_service: Optional[FlightService] = None,
+        notification_service: Optional[NotificationService] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        price_alerts: Optional[PriceAlertService] = None,
+        enabled: bool = settings.price_tracking_enabled,
+        interval: float = settings.price_tracking_interval_seconds,
+        rate: float = settings.price_tracking_rate_per_second,
+        burst: int = settings.price_tracking_burst,
+        batch_size: int = settings.price_tracking_batch_size,
+        max_concurrency: int = settings.price_tracking_max_concurrency,
+        drop_threshold: float = settings.price_tracking_drop_threshold,
+        seed: Optional[int] = None
+    ):
+        self.flight_service = flight_service or FlightService()
+        self.notification_service = notification_service or NotificationService()
+        self.session_factory = session_factory  # Defaults to synchronous sessions on the app database
+        self.price_alerts = price_alerts or default_price_alert_service
+        self.enabled = enabled
+        self.interval = interval
+        self.bucket = TokenBucket(rate, burst)
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.drop_threshold = drop_threshold
+        self._rng = random.Random(seed)
+        self._routes: Dict[RouteKey, Set[int]] = {}
+        self._route_of: Dict[int, RouteKey] = {}
+        self._heap: List[Tuple[float, int, RouteKey]] = []
+        self._pending: Dict[RouteKey, int] = {}  # Route -> sequence number of its live heap entry; others are stale
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._write: Optional[asyncio.Task] = None  # The previous round's database write
+        self.stats = {"checks": 0, "check_errors": 0, "rounds": 0, "ticks": 0, "notifications": 0, "alerts": 0, "max_lag_seconds": 0.0}
+
+    async def start(self) -> None:
+        """Start the scheduler; tracked routes are loaded from the database in the background."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._write is not None:
+            # Let the last round's transaction finish rather than abandon its thread mid-write
+            await asyncio.gather(self._write, return_exceptions=True)
+            self._write = None
+
+    def track(self, db: Session, user: User, tracked_request: TrackedRouteCreate) -> TrackedRoute:
+        """Start tracking a route for a user; a route nobody else tracks is checked right away."""
+        active = db.query(TrackedRoute).filter(TrackedRoute.user_id == user.id, TrackedRoute.is_active == True).count()
+        if active >= settings.price_tracking_max_routes_per_user:
+            raise ValueError(f"At most {settings.price_tracking_max_routes_per_user} routes can be tracked at once")
+
+        tracked = TrackedRoute(
+            user_id=user.id,
+            origin_code=tracked_request.origin_code.upper(),
+            destination_code=tracked_request.destination_code.upper(),
+            departure_date=tracked_request.departure_date,
+            return_date=tracked_request.return_date,
+            passengers=tracked_request.passengers,
+            preferred_currency=tracked_request.preferred_currency.upper()
+        )
+        db.add(tracked)
+        db.commit()
+        db.refresh(tracked)
+        self.add(tracked.id, route_key(tracked), delay=0.0)
+        return tracked
+
+    def untrack(self, db: Session, user: User, tracked_id: int) -> bool:
+        tracked = db.query(TrackedRoute).filter(TrackedRoute.id == tracked_id, TrackedRoute.user_id == user.id).first()
+        if not tracked:
+            return False
+        tracked.is_active = False
+        db.commit()
+        self.remove(tracked_id)
+        return True
+
+    def get_tracked_routes(self, db: Session, user: User) -> List[TrackedRoute]:
+        return db.query(TrackedRoute).filter(
+            TrackedRoute.user_id == user.id,
+            TrackedRoute.is_active == True
+        ).order_by(TrackedRoute.departure_date).all()
+
+    def add(self, tracked_id: int, key: RouteKey, delay: Optional[float] = None) -> None:
+        """Schedule a tracker; a new route is due after `delay`, by default a random point in one interval."""
+        self._route_of[tracked_id] = key
+        trackers = self._routes.get(key)
+        if trackers is not None:
+            trackers.add(tracked_id)
+            return
+        self._routes[key] = {tracked_id}
+        if key not in self._pending:
+            if delay is None:
+                delay = self._rng.uniform(0, self.interval)
+            self._schedule(time.monotonic() + delay, key)
+
+    def remove(self, tracked_id: int) -> None:
+        key = self._route_of.pop(tracked_id, None)
+        trackers = self._routes.get(key) if key else None
+        if trackers is not None:
+            trackers.discard(tracked_id)
+            if not trackers:
+                # Its heap entry goes stale and is skipped, so adding the route again schedules it afresh
+                del self._routes[key]
+                self._pending.pop(key, None)
+
+    def _schedule(self, due: float, key: RouteKey) -> None:
+        self._sequence += 1
+        self._pending[key] = self._sequence
+        heapq.heappush(self._heap, (due, self._sequence, key))
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        try:
+            for tracked_id, key in await asyncio.to_thread(self._load):
+                self.add(tracked_id, key)
+            logger.info(f"Tracking {len(self._route_of)} routes ({len(self._routes)} distinct)")
+        except Exception as e:
+            logger.error(f"Error loading tracked routes: {e}")
+        while True:
+            due = await self._next_due()
+            try:
+                await self._check_round(due)
+            except Exception as e:
+                logger.error(f"Error in price tracking round: {e}")
+
+    def _load(self) -> List[Tuple[int, RouteKey]]:
+        with self._session() as db:
+            return [(tracked.id, route_key(tracked)) for tracked in db.query(TrackedRoute).filter(TrackedRoute.is_active == True)]
+
+    def _session(self) -> Session:
+        return (self.session_factory or get_sync_sessionmaker())()
+
+    def _is_live(self, entry: Tuple[float, int, RouteKey]) -> bool:
+        _, sequence, key = entry
+        return key in self._routes and self._pending.get(key) == sequence
+
+    async def _next_due(self) -> List[Tuple[float, RouteKey]]:
+        """Wait until at least one route is due and pop up to batch_size due routes."""
+        while True:
+            while self._heap and not self._is_live(self._heap[0]):
+                heapq.heappop(self._heap)
+            now = time.monotonic()
+            if self._heap and self._heap[0][0] <= now:
+                break
+            self._wakeup.clear()
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        due = []
+        while self._heap and len(due) < self.batch_size and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if self._is_live(entry):
+                scheduled, _, key = entry
+                del self._pending[key]
+                due.append((scheduled, key))
+        return due
+
+    async def _check_round(self, due: List[Tuple[float, RouteKey]]) -> None:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def check(key: RouteKey) -> Tuple[RouteKey, Optional[Dict[Optional[str], List[Dict[str, Any]]]], int]:
+            async with semaphore:
+                try:
+                    region_flights, unique_flights = await self.flight_service.reprice(self._search_request(key))
+                    # A coalesced check gets no per-region split; file its flights under no region
+                    return key, region_flights or ({None: unique_flights} if unique_flights else {}), len(unique_flights)
+                except Exception as e:
+                    self.stats["check_errors"] += 1
+                    logger.error(f"Error re-pricing tracked route {key[0]}->{key[1]} on {key[2]}: {e}")
+                    return key, None, 0
+
+        tasks = []
+        for scheduled, key in due:
+            await self.bucket.acquire()
+            self.stats["max_lag_seconds"] = max(self.stats["max_lag_seconds"], round(time.monotonic() - scheduled, 3))
+            tasks.append(asyncio.create_task(check(key)))
+        results = await asyncio.gather(*tasks)
+        self.stats["checks"] += len(results)
+        self.stats["rounds"] += 1
+
+        now = time.monotonic()
+        for scheduled, key in due:
+            if key in self._routes and key not in self._pending:
+                # Keep each route's cadence, but never schedule into the past after falling behind
+                self._schedule(max(scheduled + self.interval, now), key)
+
+        checked = {key: region_flights for key, region_flights, _ in results if region_flights is not None}
+        # Unique flights per route, for the search record; only the cheapest per region is stored
+        found = {key: count for key, region_flights, count in results if region_flights is not None}
+        trackers = {key: sorted(self._routes.get(key, ())) for key in checked}
+        # Write while the next round is checked, keeping at most one write in progress
+        if self._write is not None:
+            await asyncio.shield(self._write)
+        self._write = asyncio.create_task(self._write_round(checked, found, trackers))
+
+    async def _write_round(
+        self,
+        checked: Dict[RouteKey, Dict[Optional[str], List[Dict[str, Any]]]],
+        found: Dict[RouteKey, int],
+        trackers: Dict[RouteKey, List[int]]
+    ) -> None:
+        try:
+            expired, ticks_by_route, notifications = await asyncio.to_thread(self._record, checked, found, trackers)
+        except Exception as e:
+            logger.error(f"Error recording tracked prices: {e}")
+            return
+        self.stats["ticks"] += sum(len(ticks) for ticks in ticks_by_route.values())
+        self.stats["notifications"] += notifications
+        if ticks_by_route:
+            # Alert matching shares its index and stats with searches, so it runs on the event loop
+            try:
+                with self._session() as db:
+                    self.stats["alerts"] += self.price_alerts.notify_matches(db, ticks_by_route)
+            except Exception as e:
+                logger.error(f"Error matching price alerts for tracked prices: {e}")
+        for key in expired:
+            for tracked_id in list(self._routes.get(key, ())):
+                self.remove(tracked_id)
+
+    def _search_request(self, key: RouteKey) -> FlightSearchRequest:
+        origin, destination, departure, return_date, passengers, currency = key
+        return FlightSearchRequest(
+            origin_code=origin,
+            destination_code=destination,
+            departure_date=datetime.combine(departure, dt_time.min),
+            return_date=datetime.combine(return_date, dt_time.min) if return_date else None,
+            passengers=passengers,
+            flight_type=FlightType.ROUND_TRIP if return_date else FlightType.ONE_WAY,
+            preferred_currency=currency
+        )
+
+    def _record(
+        self,
+        checked: Dict[RouteKey, Dict[Optional[str], List[Dict[str, Any]]]],
+        found: Dict[RouteKey, int],
+        trackers: Dict[RouteKey, List[int]]
+    ) -> Tuple[List[RouteKey], Dict[Tuple[str, str, date], List[Dict[str, Any]]], int]:
+        """Write one round's results in one transaction, in a worker thread.
+
+        Returns the routes that have departed, the committed price ticks by
+        (origin, destination, departure date) for alert matching, and the
+        number of drop notifications written.
+        """
+        today = datetime.now(timezone.utc).date()
+        expired = [key for key in trackers if key[2] < today]
+        cheapest_by_route = {}
+        for key, region_flights in checked.items():
+            per_region = {
+                region: [min(flights, key=lambda flight_data: flight_data["price"])]
+                for region, flights in region_flights.items() if flights
+            }
+            if per_region and key[2] >= today:
+                cheapest_by_route[key] = per_region
+
+        route_ticks, notifications = {}, 0
+        with self._session() as db:
+            try:
+                if expired:
+                    expired_ids = [tracked_id for key in expired for tracked_id in trackers[key]]
+                    db.execute(update(TrackedRoute).where(TrackedRoute.id.in_(expired_ids)).values(is_active=False))
+
+                if cheapest_by_route:
+                    route_ticks, notifications = self._record_prices(db, cheapest_by_route, found, trackers)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+        ticks_by_route: Dict[Tuple[str, str, date], List[Dict[str, Any]]] = {}
+        for key, rows in route_ticks.items():
+            ticks_by_route.setdefault(key[:3], []).extend(rows)
+        return expired, ticks_by_route, notifications
+
+    def _record_prices(
+        self,
+        db: Session,
+        cheapest_by_route: Dict[RouteKey, Dict[Optional[str], List[Dict[str, Any]]]],
+        found: Dict[RouteKey, int],
+        trackers: Dict[RouteKey, List[int]]
+    ) -> Tuple[Dict[RouteKey, List[Dict[str, Any]]], int]:
+        keys = list(cheapest_by_route)
+        search_ids = db.execute(
+            insert(FlightSearch.__table__).returning(FlightSearch.__table__.c.id, sort_by_parameter_order=True),
+            [self._search_row(key, cheapest_by_route[key], found[key]) for key in keys]
+        ).scalars().all()
+
+        flights = [flight_data for key in keys for region_flights in cheapest_by_route[key].values() for flight_data in region_flights]
+        flight_ids = {natural_key(row): row["id"] for row in upsert_flights(db, [flight_row(flight_data) for flight_data in flights])}
+        route_ticks = {
+            key: price_history_rows(search_id, cheapest_by_route[key], flight_ids)
+            for key, search_id in zip(keys, search_ids)
+        }
+        insert_price_history(db, [row for rows in route_ticks.values() for row in rows])
+
+        tracked_ids = [tracked_id for key in keys for tracked_id in trackers[key]]
+        baselines = dict(db.query(TrackedRoute.id, TrackedRoute.baseline_price).filter(TrackedRoute.id.in_(tracked_ids)).all())
+        checked_at = datetime.now(timezone.utc)
+        updates, drops = [], []
+        for key in keys:
+            best = min((flights[0] for flights in cheapest_by_route[key].values()), key=lambda flight_data: flight_data["price"])
+            price, flight_id = best["price"], flight_ids.get(flight_key(best))
+            for tracked_id in trackers[key]:
+                if tracked_id not in baselines:
+                    continue
+                baseline = baselines[tracked_id]
+                if baseline is None:
+                    baseline = price
+                elif price <= baseline * (1 - self.drop_threshold):
+                    drops.append((tracked_id, flight_id, baseline, price, key[5]))
+                    baseline = price
+                updates.append({"row_id": tracked_id, "last_price": price, "last_flight_id": flight_id, "baseline_price": baseline, "last_checked_at": checked_at})
+
+        if updates:
+            db.execute(
+                update(TrackedRoute.__table__).where(TrackedRoute.__table__.c.id == bindparam("row_id")),
+                updates
+            )
+        if not drops:
+            return route_ticks, 0
+        users = dict(db.query(TrackedRoute.id, TrackedRoute.user_id).filter(TrackedRoute.id.in_([drop[0] for drop in drops])).all())
+        notifications = self.notification_service.create_notifications(db, [
+            self.notification_service.price_drop_notification(users[tracked_id], flight_id, old_price, new_price, currency)
+            for tracked_id, flight_id, old_price, new_price, currency in drops
+        ])
+        return route_ticks, notifications
+
+    def _search_row(self, key: RouteKey, region_flights: Dict[Optional[str], List[Dict[str, Any]]], results_count: int) -> Dict[str, Any]:
+        origin, destination, departure, return_date, passengers, currency = key
+        regions = [region for region in region_flights if region]
+        return {
+            "origin_code": origin,
+            "destination_code": destination,
+            "departure_date": datetime.combine(departure, dt_time.min),
+            "return_date": datetime.combine(return_date, dt_time.min) if return_date else None,
+            "passengers": passengers,
+            "flight_type": FlightType.ROUND_TRIP if return_date else FlightType.ONE_WAY,
+            "preferred_currency": currency,
+            "search_region": regions[-1] if regions else None,
+            "results_count": results_count,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "trackers": len(self._route_of),
+            "routes": len(self._routes),
+            "scheduled": len(self._heap),
+        }
+
+
+price_tracker = PriceTracker()
@@ -0,0 +1,12 @@
+from .base import FlightProvider
+from .skyscanner import SkyscannerProvider
+from .local_fake import LocalFakeProvider
+from .registry import ProviderRegistry, provider_registry
+
+__all__ = [
+    "FlightProvider",
+    "SkyscannerProvider",
+    "LocalFakeProvider",
+    "ProviderRegistry",
+    "provider_registry"
+]
@@ -0,0 +1,74 @@
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from ...schemas.flight import FlightSearchRequest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FlightProvider(ABC):
+    """A source of flight offers that FlightService aggregates.
+
+    Subclasses fetch raw result batches in whatever shape their API returns
+    and normalise each batch to the flight dicts the rest of the search
+    pipeline uses. Regional providers are searched once per region through
+    a regional egress; others are searched once per search. FlightService
+    enforces `timeout` on each call; `max_concurrency` caps how many calls
+    run at once across all searches.
+    """
+
+    name: str = ""
+    regional: bool = False
+
+    def __init__(self, timeout: float, max_concurrency: int):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats = {"searches": 0, "batches": 0, "flights": 0, "errors": 0, "timeouts": 0, "egress_unavailable": 0}
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the provider's `max_concurrency` call slots."""
+        async with self._semaphore:
+            yield
+
+    async def search(self, search_request: FlightSearchRequest, region: Optional[str] = None, proxy_url: Optional[str] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield batches of normalised flights, waiting for a free concurrency slot first."""
+        async with self.slot():
+            async for flights in self.search_in_slot(search_request, region, proxy_url):
+                yield flights
+
+    async def search_in_slot(self, search_request: FlightSearchRequest, region: Optional[str] = None, proxy_url: Optional[str] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Like search, for a caller already holding a slot()."""
+        self.stats["searches"] += 1
+        async for raw in self.fetch(search_request, region, proxy_url):
+            flights = self.normalise(raw)
+            if not flights:
+                continue
+            for flight_data in flights:
+                flight_data.setdefault("source_api", self.name)
+                # The fare context a price was quoted for is part of the stored flight's key
+                flight_data.setdefault("passengers", search_request.passengers)
+                flight_data.setdefault("trip_type", search_request.flight_type.value)
+            self.stats["batches"] += 1
+            self.stats["flights"] += len(flights)
+            yield flights
+
+    @abstractmethod
+    def fetch(self, search_request: FlightSearchRequest, region: Optional[str], proxy_url: Optional[str]) -> AsyncIterator[Any]:
+        """Yield raw result batches from the provider's API."""
+
+    @abstractmethod
+    def normalise(self, raw: Any) -> List[Dict[str, Any]]:
+        """Turn one raw batch into flight dicts."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "regional": self.regional,
+            "timeout": self.timeout,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.max_concurrency - self._semaphore._value,
+        }
@@ -0,0 +1,116 @@
+import asyncio
+import hashlib
+import random
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+from ...config import settings
+from ...schemas.flight import FlightSearchRequest
+from ..reference_data import ReferenceData, reference_data as default_reference_data
+from .base import FlightProvider
+import logging
+
+logger = logging.getLogger(__name__)
+
+CARRIERS = [
+    ("LF", "Localfake Air"),
+    ("OF", "Offline Airways"),
+    ("BX", "Bench Express"),
+    ("DT", "Deterministic Airlines"),
+]
+
+
+class LocalFakeProvider(FlightProvider):
+    """Deterministic in-process provider for offline development and benchmarks.
+
+    The same route, dates and passenger count always produce the same
+    offers, delivered in `batches` batches `latency` seconds apart. Offers
+    come in their own shape so the normaliser path is exercised too.
+    """
+
+    name = "local_fake"
+    regional = False
+
+    def __init__(
+        self,
+        flights_per_search: int = settings.local_fake_provider_flights,
+        batches: int = settings.local_fake_provider_batches,
+        latency: float = settings.local_fake_provider_latency_seconds,
+        timeout: float = settings.local_fake_provider_timeout_seconds,
+        max_concurrency: int = settings.local_fake_provider_max_concurrency,
+        reference: Optional[ReferenceData] = None
+    ):
+        super().__init__(timeout, max_concurrency)
+        self.reference = reference or default_reference_data
+        self.flights_per_search = flights_per_search
+        self.batches = max(batches, 1)
+        self.latency = latency
+
+    async def fetch(self, search_request: FlightSearchRequest, region: Optional[str], proxy_url: Optional[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        offers = self.generate_offers(search_request)
+        batch_size = -(-len(offers) // self.batches)
+        for start in range(0, len(offers), batch_size):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            yield offers[start:start + batch_size]
+
+    def generate_offers(self, search_request: FlightSearchRequest) -> List[Dict[str, Any]]:
+        seed_text = "|".join([
+            search_request.origin_code.upper(),
+            search_request.destination_code.upper(),
+            search_request.departure_date.date().isoformat(),
+            str(search_request.passengers),
+        ])
+        rng = random.Random(int(hashlib.sha256(seed_text.encode()).hexdigest()[:16], 16))
+        day = datetime.combine(search_request.departure_date.date(), datetime.min.time())
+
+        offers = []
+        for i in range(self.flights_per_search):
+            code, name = CARRIERS[rng.randrange(len(CARRIERS))]
+            departs = day + timedelta(minutes=rng.randrange(0, 24 * 60, 5))
+            arrives = departs + timedelta(minutes=rng.randrange(60, 16 * 60, 5))
+            total = round(rng.uniform(50, 1200) * search_request.passengers, 2)
+            offers.append({
+                "offer_id": f"{seed_text}#{i}",
+                "carrier": {"code": code, "name": name},
+                "number": rng.randrange(100, 9999),
+                "from": search_request.origin_code.upper(),
+                "to": search_request.destination_code.upper(),
+                "departs": departs.isoformat() + "Z",
+                "arrives": arrives.isoformat() + "Z",
+                "stops": rng.choice([0, 0, 1, 1, 2]),
+                "fare": {"total": total, "base": round(total * 0.82, 2), "tax": round(total * 0.18, 2), "currency": "USD"},
+                "seats": rng.randrange(1, 9),
+            })
+        return offers
+
+    def normalise(self, raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        flights = []
+        for offer in raw:
+            departure_time = datetime.fromisoformat(offer["departs"].replace("Z", "+00:00"))
+            arrival_time = datetime.fromisoformat(offer["arrives"].replace("Z", "+00:00"))
+            fare = offer["fare"]
+            flights.append({
+                "flight_number": f"{offer['carrier']['code']}{offer['number']}",
+                "airline_code": offer["carrier"]["code"],
+                "airline_name": offer["carrier"]["name"],
+                "origin_code": offer["from"],
+                "origin_name": self.reference.airport_name(offer["from"]) or offer["from"],
+                "destination_code": offer["to"],
+                "destination_name": self.reference.airport_name(offer["to"]) or offer["to"],
+                "departure_time": departure_time,
+                "arrival_time": arrival_time,
+                "duration_minutes": int((arrival_time - departure_time).total_seconds() / 60),
+                "base_price": fare["base"],
+                "currency": fare["currency"],
+                "taxes": fare["tax"],
+                "fees": 0.0,
+                "price": fare["total"],
+                "stops": offer["stops"],
+                "is_direct": offer["stops"] == 0,
+                "external_id": offer["offer_id"],
+                "source_api": self.name,
+                "available_seats": offer["seats"],
+                "booking_class": "Economy",
+                "aircraft_type": None
+            })
+        return flights
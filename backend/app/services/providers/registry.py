@@ -0,0 +1,52 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from ...config import settings
+from .base import FlightProvider
+from .local_fake import LocalFakeProvider
+from .skyscanner import SkyscannerProvider
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Provider names accepted in settings.search_providers
+PROVIDER_FACTORIES: Dict[str, Callable[[], FlightProvider]] = {
+    SkyscannerProvider.name: SkyscannerProvider,
+    LocalFakeProvider.name: LocalFakeProvider,
+}
+
+
+class ProviderRegistry:
+    """The set of providers a search fans out to, by name."""
+
+    def __init__(self, providers: Iterable[FlightProvider] = ()):
+        self._providers: Dict[str, FlightProvider] = {}
+        for provider in providers:
+            self.register(provider)
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "ProviderRegistry":
+        providers = []
+        for name in names:
+            factory = PROVIDER_FACTORIES.get(name)
+            if factory is None:
+                logger.error(f"Unknown flight provider {name!r}, skipping")
+                continue
+            providers.append(factory())
+        return cls(providers)
+
+    def register(self, provider: FlightProvider) -> None:
+        self._providers[provider.name] = provider
+
+    def get(self, name: str) -> Optional[FlightProvider]:
+        return self._providers.get(name)
+
+    def all(self) -> List[FlightProvider]:
+        return list(self._providers.values())
+
+    def names(self) -> List[str]:
+        return sorted(self._providers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: provider.get_stats() for name, provider in self._providers.items()}
+
+
+provider_registry = ProviderRegistry.from_names(settings.search_providers)
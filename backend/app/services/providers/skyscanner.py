@@ -0,0 +1,195 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+from datetime import datetime
+from ...config import settings
+from ...schemas.flight import FlightSearchRequest
+from ..http_clients import ProviderClientPool, provider_clients as default_provider_clients
+from ..live_pricing import LivePricingPoller
+from ..reference_data import ReferenceData, reference_data as default_reference_data
+from .base import FlightProvider
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-leg fields kept for each leg of a round-trip itinerary
+LEG_FIELDS = (
+    "flight_number", "airline_code", "airline_name", "origin_code", "destination_code",
+    "departure_time", "arrival_time", "duration_minutes", "stops", "external_id"
+)
+
+
+class SkyscannerProvider(FlightProvider):
+    """Skyscanner live pricing, searched per region through the egress pool."""
+
+    name = "skyscanner"
+    regional = True
+
+    def __init__(
+        self,
+        http_clients: Optional[ProviderClientPool] = None,
+        api_key: Optional[str] = settings.skyscanner_api_key,
+        base_url: str = settings.skyscanner_base_url,
+        timeout: float = settings.region_timeout_seconds,
+        max_concurrency: int = settings.skyscanner_max_concurrency,
+        reference: Optional[ReferenceData] = None
+    ):
+        super().__init__(timeout, max_concurrency)
+        self.http_clients = http_clients or default_provider_clients
+        self.reference = reference or default_reference_data
+        self.api_key = api_key
+        self.base_url = base_url
+
+    async def fetch(self, search_request: FlightSearchRequest, region: Optional[str], proxy_url: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the new or repriced part of a live-pricing session as each poll brings it."""
+        if not self.api_key:
+            logger.warning("Skyscanner API key not configured")
+            return
+
+        client = self.http_clients.get("skyscanner", proxy_url)
+        started = asyncio.get_running_loop().time()
+
+        # Create session
+        session_url = f"{self.base_url}/pricing/v1.0"
+        session_data = {
+            "country": region,
+            "currency": search_request.preferred_currency,
+            "locale": "en-US",
+            "originPlace": search_request.origin_code,
+            "destinationPlace": search_request.destination_code,
+            "outboundDate": search_request.departure_date.strftime("%Y-%m-%d"),
+            "adults": search_request.passengers
+        }
+
+        if search_request.return_date:
+            session_data["inboundDate"] = search_request.return_date.strftime("%Y-%m-%d")
+
+        headers = {
+            "X-RapidAPI-Key": self.api_key,
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+
+        response = await client.post(session_url, data=session_data, headers=headers)
+        response.raise_for_status()
+
+        # Poll for results until the session completes or the deadline expires
+        session_key = response.headers.get("Location", "").split("/")[-1]
+        results_url = f"{self.base_url}/pricing/uk2/v1.0/{session_key}"
+
+        poller = LivePricingPoller(client)
+        async for update in poller.poll(results_url, headers=headers, started=started):
+            yield {**update.payload, "Itineraries": update.itineraries}
+
+    def normalise(self, raw: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.parse_results(raw)
+
+    def parse_results(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse Skyscanner API results.
+        
+        Each itinerary becomes one flight described by its outbound leg and
+        priced at the itinerary's cheapest option. Round trips also carry
+        both parsed legs under "legs" and their inbound flight as
+        "return_leg_key", which keeps them apart from round trips with the
+        same outbound leg; ones whose inbound leg is missing or unparseable
+        are skipped.
+        """
+        flights = []
+
+        try:
+            itineraries = results.get("Itineraries", [])
+            # Prices come back in the currency the session asked for
+            currency = (results.get("Query") or {}).get("Currency") or "USD"
+
+            # Index the payload once so each lookup below is O(1)
+            legs = {leg.get("Id"): leg for leg in results.get("Legs", [])}
+            carriers = {carrier.get("Id"): carrier for carrier in results.get("Carriers", [])}
+            places = {place.get("Id"): place for place in results.get("Places", [])}
+
+            for itinerary in itineraries:
+                pricing_options = itinerary.get("PricingOptions", [])
+                if not pricing_options:
+                    continue
+
+                # Get the cheapest option
+                cheapest_option = min(pricing_options, key=lambda x: x.get("Price", float('inf')))
+                price = cheapest_option.get("Price", 0)
+
+                # Get leg information
+                outbound_leg_id = itinerary.get("OutboundLegId")
+                inbound_leg_id = itinerary.get("InboundLegId")
+
+                leg = legs.get(outbound_leg_id)
+                if leg is None:
+                    continue
+                flight_data = self._parse_leg(leg, carriers, places, price, currency)
+                if not flight_data:
+                    continue
+                
+                if inbound_leg_id:
+                    inbound_leg = legs.get(inbound_leg_id)
+                    inbound_data = self._parse_leg(inbound_leg, carriers, places, price, currency) if inbound_leg is not None else None
+                    if not inbound_data:
+                        continue
+                    flight_data["legs"] = [
+                        {field: leg_data[field] for field in LEG_FIELDS}
+                        for leg_data in (flight_data, inbound_data)
+                    ]
+                    flight_data["return_leg_key"] = f"{inbound_data['flight_number']}@{inbound_data['departure_time'].isoformat()}"
+                
+                flights.append(flight_data)
+
+        except Exception as e:
+            logger.error(f"Error parsing Skyscanner results: {e}")
+
+        return flights
+
+    def _parse_leg(self, leg: Dict[str, Any], carriers: Dict[Any, Dict], places: Dict[Any, Dict], price: float, currency: str = "USD") -> Optional[Dict[str, Any]]:
+        """Parse a flight leg into our format using id-indexed carriers and places.
+
+        The payload only maps its ids to codes; names come from the reference
+        data, falling back to the payload's own names for unknown codes.
+        """
+        try:
+            # Get carrier information
+            carrier_id = leg.get("Carriers", [0])[0] if leg.get("Carriers") else None
+            carrier = carriers.get(carrier_id, {})
+            carrier_code = carrier.get("Code", "")
+
+            # Get origin and destination
+            origin = places.get(leg.get("OriginStation"), {})
+            destination = places.get(leg.get("DestinationStation"), {})
+            origin_code = origin.get("Code", "")
+            destination_code = destination.get("Code", "")
+
+            # Calculate duration
+            departure_time = datetime.fromisoformat(leg.get("Departure", "").replace("Z", "+00:00"))
+            arrival_time = datetime.fromisoformat(leg.get("Arrival", "").replace("Z", "+00:00"))
+            duration_minutes = int((arrival_time - departure_time).total_seconds() / 60)
+
+            return {
+                "flight_number": f"{carrier_code}{leg.get('FlightNumber', '')}",
+                "airline_code": carrier_code,
+                "airline_name": self.reference.carrier_name(carrier_code) or carrier.get("Name", ""),
+                "origin_code": origin_code,
+                "origin_name": self.reference.airport_name(origin_code) or origin.get("Name", ""),
+                "destination_code": destination_code,
+                "destination_name": self.reference.airport_name(destination_code) or destination.get("Name", ""),
+                "departure_time": departure_time,
+                "arrival_time": arrival_time,
+                "duration_minutes": duration_minutes,
+                "base_price": price * 0.8,  # Estimate base price
+                "currency": currency,
+                "taxes": price * 0.15,  # Estimate taxes
+                "fees": price * 0.05,  # Estimate fees
+                "price": price,
+                "stops": len(leg.get("Stops", [])),
+                "is_direct": len(leg.get("Stops", [])) == 0,
+                "external_id": str(leg.get("Id", "")),
+                "source_api": self.name,
+                "available_seats": None,
+                "booking_class": "Economy",
+                "aircraft_type": None
+            }
+
+        except Exception as e:
+            logger.error(f"Error parsing leg: {e}")
+            return None
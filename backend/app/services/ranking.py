@@ -0,0 +1,100 @@
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import settings
+from ..schemas.flight import FlightSearchRequest, SearchSort
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FlightRanker:
+    """Filters and orders candidate flights in one vectorised pass.
+
+    Candidates are loaded into columnar NumPy arrays; the request's
+    max_stops, max_price and preferred_airlines become a boolean mask, and
+    the requested sort order becomes a lexsort over the surviving rows.
+    best_value blends min-max normalised price, duration and stops with the
+    configured weights.
+    """
+
+    def __init__(
+        self,
+        price_weight: float = settings.ranking_price_weight,
+        duration_weight: float = settings.ranking_duration_weight,
+        stops_weight: float = settings.ranking_stops_weight
+    ):
+        self.price_weight = price_weight
+        self.duration_weight = duration_weight
+        self.stops_weight = stops_weight
+
+    def rank(self, flights: List[Dict[str, Any]], search_request: FlightSearchRequest, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the flights matching the request's filters, best first."""
+        if not flights:
+            return []
+
+        price, duration, stops = self._columns(flights)
+        candidates = np.flatnonzero(self._filter_mask(search_request, flights, price, stops))
+        if candidates.size == 0:
+            return []
+
+        keys = self._sort_keys(search_request.sort_by, price[candidates], duration[candidates], stops[candidates])
+        if limit is not None and limit < candidates.size:
+            # Only rows that can make the cut (ties included) need a full sort
+            primary = keys[-1]
+            cutoff = np.partition(primary, limit - 1)[limit - 1]
+            shortlist = np.flatnonzero(primary <= cutoff)
+            candidates = candidates[shortlist]
+            keys = tuple(key[shortlist] for key in keys)
+        order = candidates[np.lexsort(keys)]
+        if limit is not None:
+            order = order[:limit]
+        return [flights[i] for i in order]
+
+    def best_value_scores(self, price: np.ndarray, duration: np.ndarray, stops: np.ndarray) -> np.ndarray:
+        """Weighted blend of normalised price, duration and stops; lower is better."""
+        return (
+            self.price_weight * self._normalise(price)
+            + self.duration_weight * self._normalise(duration)
+            + self.stops_weight * self._normalise(stops)
+        )
+
+    def _columns(self, flights: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        count = len(flights)
+        price = np.fromiter((f.get("price", np.inf) for f in flights), dtype=np.float64, count=count)
+        duration = np.fromiter((f.get("duration_minutes", 0) for f in flights), dtype=np.float64, count=count)
+        stops = np.fromiter((f.get("stops", 0) for f in flights), dtype=np.float64, count=count)
+        return price, duration, stops
+
+    def _filter_mask(self, search_request: FlightSearchRequest, flights: List[Dict[str, Any]], price: np.ndarray, stops: np.ndarray) -> np.ndarray:
+        mask = stops <= search_request.max_stops
+        if search_request.max_price is not None:
+            mask &= price <= search_request.max_price
+        if search_request.preferred_airlines:
+            # Airline codes are factorised to small ints so the membership test stays numeric
+            codes: Dict[str, int] = {}
+            airline_ids = np.fromiter(
+                (codes.setdefault(f.get("airline_code", ""), len(codes)) for f in flights),
+                dtype=np.int64,
+                count=len(flights)
+            )
+            preferred = [codes[code.strip().upper()] for code in search_request.preferred_airlines if code.strip().upper() in codes]
+            mask &= np.isin(airline_ids, preferred)
+        return mask
+
+    def _sort_keys(self, sort_by: SearchSort, price: np.ndarray, duration: np.ndarray, stops: np.ndarray) -> Tuple[np.ndarray, ...]:
+        # np.lexsort sorts by the last key first
+        if sort_by == SearchSort.FASTEST:
+            return price, duration
+        if sort_by == SearchSort.BEST_VALUE:
+            return duration, price, self.best_value_scores(price, duration, stops)
+        return duration, price
+
+    @staticmethod
+    def _normalise(values: np.ndarray) -> np.ndarray:
+        low, high = values.min(), values.max()
+        if high <= low:
+            return np.zeros_like(values)
+        return (values - low) / (high - low)
+
+
+flight_ranker = FlightRanker()
@@ -0,0 +1,159 @@
+import csv
+import heapq
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ranks of the keys an airport is indexed under; lower ranks sort first
+CODE_KEY, CITY_KEY, NAME_KEY, WORD_KEY = range(4)
+
+
+def normalise(text: str) -> str:
+    """Lowercase, strip accents and collapse punctuation so "Zürich" and "zurich" match."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    plain = "".join(char if char.isalnum() else " " for char in decomposed if not unicodedata.combining(char))
+    return " ".join(plain.split())
+
+
+class ReferenceData:
+    """Airports and carriers held in memory, with a prefix index over airports.
+
+    Airports live in parallel lists addressed by position. The index is one
+    sorted list of normalised keys (IATA code, city, full name and each word
+    of the name and city) with parallel arrays of airport positions and key
+    ranks, so a prefix lookup is a bisect followed by a short forward scan.
+    """
+
+    def __init__(
+        self,
+        airports_path: str = settings.airports_path,
+        carriers_path: str = settings.carriers_path,
+        max_scan: int = settings.airport_search_max_scan
+    ):
+        self.airports_path = airports_path
+        self.carriers_path = carriers_path
+        self.max_scan = max_scan
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        self.cities: List[str] = []
+        self.countries: List[str] = []
+        self._by_code: Dict[str, int] = {}
+        self._carriers: Dict[str, str] = {}
+        self._keys: List[str] = []
+        self._positions = array("I")
+        self._ranks = array("B")
+        self.loaded = False
+        self.stats = {"searches": 0}
+
+    def load(self) -> None:
+        """Read both datasets and build the index; a missing file leaves that part empty."""
+        start = time.perf_counter()
+        codes, names, cities, countries = [], [], [], []
+        try:
+            with open(self.airports_path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    code = (row.get("iata") or "").strip().upper()
+                    if len(code) != 3:
+                        continue
+                    codes.append(code)
+                    names.append(row.get("name", "").strip())
+                    cities.append(row.get("city", "").strip())
+                    countries.append(row.get("country", "").strip().upper())
+        except Exception as e:
+            logger.error(f"Error loading airports from {self.airports_path}: {e}")
+
+        carriers = {}
+        try:
+            with open(self.carriers_path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    code = (row.get("iata") or "").strip().upper()
+                    if code:
+                        carriers[code] = row.get("name", "").strip()
+        except Exception as e:
+            logger.error(f"Error loading carriers from {self.carriers_path}: {e}")
+
+        entries: Dict[Tuple[str, int], int] = {}
+        for position, (code, name, city) in enumerate(zip(codes, names, cities)):
+            keys = [(code.lower(), CODE_KEY), (normalise(city), CITY_KEY), (normalise(name), NAME_KEY)]
+            keys += [(word, WORD_KEY) for word in set(normalise(f"{name} {city}").split()) if len(word) > 1]
+            for key, rank in keys:
+                if key:
+                    # Keep the best rank when a key repeats for the same airport
+                    entries[(key, position)] = min(rank, entries.get((key, position), rank))
+        ordered = sorted(entries.items())
+
+        # Swap everything in at once so lookups never mix old and new data
+        self.codes, self.names, self.cities, self.countries = codes, names, cities, countries
+        self._by_code = {code: position for position, code in enumerate(codes)}
+        self._carriers = carriers
+        self._keys = [key for (key, _), _ in ordered]
+        self._positions = array("I", (position for (_, position), _ in ordered))
+        self._ranks = array("B", (rank for _, rank in ordered))
+        self.loaded = True
+        logger.info(
+            f"Loaded {len(codes)} airports and {len(carriers)} carriers "
+            f"({len(self._keys)} index keys) in {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+
+    def airport(self, code: str) -> Optional[Dict[str, str]]:
+        position = self._by_code.get(code.upper()) if code else None
+        return self._airport(position) if position is not None else None
+
+    def airport_name(self, code: str) -> Optional[str]:
+        position = self._by_code.get(code.upper()) if code else None
+        return self.names[position] if position is not None else None
+
+    def carrier_name(self, code: str) -> Optional[str]:
+        return self._carriers.get(code.upper()) if code else None
+
+    def search_airports(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Airports whose code, city or name starts with `query`, best matches first.
+
+        An exact code match comes first, then city, full-name and word
+        matches. At most `max_scan` index keys are read, so very short
+        queries stay cheap on a large dataset.
+        """
+        self.stats["searches"] += 1
+        prefix = normalise(query)
+        if not prefix or limit <= 0:
+            return []
+
+        # Every key starting with prefix sorts between prefix and prefix with its last character bumped
+        keys = self._keys
+        start = bisect_left(keys, prefix)
+        end = min(bisect_left(keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), start), start + self.max_scan)
+        best: Dict[int, Tuple[int, int]] = {}
+        for i, key, position, rank in zip(range(start, end), keys[start:end], self._positions[start:end], self._ranks[start:end]):
+            if rank == CODE_KEY and key != prefix:
+                # A partial code is a weaker hint than a city or name prefix
+                rank = WORD_KEY
+            if position not in best or (rank, i) < best[position]:
+                best[position] = (rank, i)
+
+        ranked = heapq.nsmallest(limit, best, key=best.__getitem__)
+        return [self._airport(position) for position in ranked]
+
+    def _airport(self, position: int) -> Dict[str, str]:
+        return {
+            "code": self.codes[position],
+            "name": self.names[position],
+            "city": self.cities[position],
+            "country": self.countries[position],
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "airports": len(self.codes),
+            "carriers": len(self._carriers),
+            "index_keys": len(self._keys),
+        }
+
+
+reference_data = ReferenceData()
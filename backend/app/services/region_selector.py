@@ -0,0 +1,140 @@
+import random
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RegionSelector:
+    """Chooses which regions to search for a route from where its cheapest fares came from.
+
+    Each route keeps a smoothed score per region: how often that region
+    matched the cheapest fare found when it was searched. Once a route has
+    been searched `min_searches` times only its `top_k` best regions are
+    queried, plus, with probability `exploration_rate`, one other region so
+    the scores stay fresh. Regions a route has never seen are always
+    searched. Scores are updated from each search's per-region results as
+    they are persisted; a searched region that found nothing or failed
+    loses that search, so it drops out of the top regions like one that is
+    never cheapest.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.region_selection_enabled,
+        top_k: int = settings.region_selection_top_k,
+        exploration_rate: float = settings.region_selection_exploration_rate,
+        min_searches: int = settings.region_selection_min_searches,
+        smoothing: float = settings.region_selection_smoothing,
+        tolerance: float = settings.region_selection_tolerance,
+        max_routes: int = settings.region_selection_max_routes,
+        seed: Optional[int] = None
+    ):
+        self.enabled = enabled
+        self.top_k = top_k
+        self.exploration_rate = exploration_rate
+        self.min_searches = min_searches
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.max_routes = max_routes
+        self._rng = random.Random(seed)
+        # route -> {"searches": int, "regions": {region: [score, observations]}}
+        self._routes: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self.stats = {"selections": 0, "narrowed": 0, "explorations": 0, "regions_selected": 0, "observations": 0}
+
+    @staticmethod
+    def route_key(origin_code: str, destination_code: str) -> Tuple[str, str]:
+        return (origin_code.upper(), destination_code.upper())
+
+    def select(self, origin_code: str, destination_code: str, regions: List[str]) -> List[str]:
+        """Return the subset of regions to search for this route, in configured order."""
+        self.stats["selections"] += 1
+        chosen = self._choose(self.route_key(origin_code, destination_code), regions)
+        self.stats["regions_selected"] += len(chosen)
+        return chosen
+
+    def _choose(self, route: Tuple[str, str], regions: List[str]) -> List[str]:
+        if not self.enabled or self.top_k >= len(regions):
+            return list(regions)
+
+        route_stats = self._routes.get(route)
+        if route_stats is None or route_stats["searches"] < self.min_searches:
+            return list(regions)
+        self._routes.move_to_end(route)
+
+        scores = route_stats["regions"]
+        unseen = {region for region in regions if region not in scores}
+        seen = sorted((region for region in regions if region in scores), key=lambda region: -scores[region][0])
+        chosen = unseen | set(seen[:self.top_k])
+
+        rest = [region for region in regions if region not in chosen]
+        if rest and self._rng.random() < self.exploration_rate:
+            chosen.add(self._rng.choice(rest))
+            self.stats["explorations"] += 1
+
+        if len(chosen) < len(regions):
+            self.stats["narrowed"] += 1
+        return [region for region in regions if region in chosen]
+
+    def observe(
+        self,
+        origin_code: str,
+        destination_code: str,
+        region_results: Dict[Optional[str], Iterable[Dict[str, Any]]],
+        searched: Iterable[str] = ()
+    ) -> None:
+        """Update a route's region scores from one search's per-region results.
+
+        Regions in `searched` without results lose the search. When no
+        region has results there is nothing to compare and scores are kept.
+        """
+        cheapest = {}
+        for region, flights in region_results.items():
+            prices = [flight_data["price"] for flight_data in flights if flight_data.get("price") is not None]
+            if region is not None and prices:
+                cheapest[region] = min(prices)
+        if not cheapest:
+            return
+        for region in searched:
+            cheapest.setdefault(region, float("inf"))
+
+        route = self.route_key(origin_code, destination_code)
+        route_stats = self._routes.get(route)
+        if route_stats is None:
+            route_stats = self._routes[route] = {"searches": 0, "regions": {}}
+            while len(self._routes) > self.max_routes:
+                self._routes.popitem(last=False)
+        self._routes.move_to_end(route)
+
+        route_stats["searches"] += 1
+        best = min(cheapest.values())
+        for region, price in cheapest.items():
+            won = 1.0 if price <= best * (1 + self.tolerance) else 0.0
+            entry = route_stats["regions"].get(region)
+            if entry is None:
+                route_stats["regions"][region] = [won, 1]
+            else:
+                entry[0] += self.smoothing * (won - entry[0])
+                entry[1] += 1
+        self.stats["observations"] += 1
+
+    def get_route_scores(self, origin_code: str, destination_code: str) -> Dict[str, float]:
+        route_stats = self._routes.get(self.route_key(origin_code, destination_code))
+        if route_stats is None:
+            return {}
+        return {region: round(entry[0], 3) for region, entry in route_stats["regions"].items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        selections = self.stats["selections"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "top_k": self.top_k,
+            "routes": len(self._routes),
+            "avg_regions_per_search": round(self.stats["regions_selected"] / selections, 2) if selections else 0.0,
+        }
+
+
+region_selector = RegionSelector()
@@ -0,0 +1,187 @@
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops calling an upstream that keeps failing or running slow.
+
+    After `failure_threshold` consecutive failures or latency breaches the
+    breaker opens and refuses calls for `open_seconds`. It then lets a single
+    probe through; a good probe closes it, a bad one opens it again. A probe
+    that never reports back is replaced after another `open_seconds`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.circuit_failure_threshold,
+        latency_threshold: Optional[float] = settings.circuit_latency_threshold_seconds,
+        open_seconds: float = settings.circuit_open_seconds
+    ):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.stats = {"opened": 0, "rejected": 0, "failures": 0, "slow_calls": 0}
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == OPEN and now - self._opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self._probe_started = None
+
+        if self.state == HALF_OPEN:
+            if self._probe_started is None or now - self._probe_started >= self.open_seconds:
+                self._probe_started = now
+                return True
+
+        if self.state == CLOSED:
+            return True
+
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self, latency: float) -> None:
+        if self.latency_threshold is not None and latency > self.latency_threshold:
+            self.stats["slow_calls"] += 1
+            self._fail()
+            return
+        self.consecutive_failures = 0
+        self._probe_started = None
+        self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self.stats["failures"] += 1
+        self._fail()
+
+    def _fail(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.stats["opened"] += 1
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "state": self.state, "consecutive_failures": self.consecutive_failures}
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies, for percentile thresholds."""
+
+    def __init__(self, window: int = settings.hedge_window):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        if len(self._samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class UpstreamHealth:
+    """Circuit breakers and latency trackers per upstream target.
+
+    A target is a provider region for regional providers and the provider
+    itself otherwise, so one failing region does not take the rest of its
+    provider down with it. The time to a call's first batch feeds the
+    hedging delay for that target.
+    """
+
+    def __init__(
+        self,
+        breakers_enabled: bool = settings.circuit_breaker_enabled,
+        hedge_enabled: bool = settings.hedge_enabled,
+        hedge_percentile: float = settings.hedge_percentile,
+        hedge_min_samples: int = settings.hedge_min_samples,
+        hedge_min_delay: float = settings.hedge_min_delay_seconds
+    ):
+        self.breakers_enabled = breakers_enabled
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self._breakers: Dict[Tuple[str, Optional[str]], CircuitBreaker] = {}
+        self._latencies: Dict[Tuple[str, Optional[str]], LatencyTracker] = {}
+        self.stats = {"hedges": 0, "hedge_wins": 0, "skipped": 0}
+
+    def breaker(self, provider: str, region: Optional[str] = None) -> CircuitBreaker:
+        key = (provider, region)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker()
+        return breaker
+
+    def allow(self, provider: str, region: Optional[str]) -> bool:
+        if not self.breakers_enabled:
+            return True
+        if not self.breaker(provider, region).allow():
+            self.stats["skipped"] += 1
+            return False
+        return True
+
+    def record_success(self, provider: str, region: Optional[str], latency: float) -> None:
+        if self.breakers_enabled:
+            self.breaker(provider, region).record_success(latency)
+
+    def record_failure(self, provider: str, region: Optional[str]) -> None:
+        if self.breakers_enabled:
+            breaker = self.breaker(provider, region)
+            previous = breaker.state
+            breaker.record_failure()
+            if breaker.state == OPEN and previous != OPEN:
+                logger.warning(f"Circuit opened for {provider} region {region}")
+
+    def record_first_batch(self, provider: str, region: Optional[str], latency: float) -> None:
+        key = (provider, region)
+        tracker = self._latencies.get(key)
+        if tracker is None:
+            tracker = self._latencies[key] = LatencyTracker()
+        tracker.record(latency)
+
+    def hedge_delay(self, provider: str, region: Optional[str]) -> Optional[float]:
+        """Seconds to wait for a first batch before firing a duplicate call, or None to not hedge."""
+        if not self.hedge_enabled:
+            return None
+        tracker = self._latencies.get((provider, region))
+        if tracker is None:
+            return None
+        delay = tracker.percentile(self.hedge_percentile, self.hedge_min_samples)
+        if delay is None:
+            return None
+        return max(delay, self.hedge_min_delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "breakers": {
+                f"{provider}:{region}" if region else provider: breaker.get_stats()
+                for (provider, region), breaker in self._breakers.items()
+            },
+            "first_batch_p95": {
+                f"{provider}:{region}" if region else provider: round(tracker.percentile(95), 4)
+                for (provider, region), tracker in self._latencies.items()
+            },
+        }
+
+
+upstream_health = UpstreamHealth()
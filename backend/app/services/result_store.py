@@ -0,0 +1,119 @@
+import base64
+import binascii
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import settings
+from .search_cache import _decode, _encode
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredResult:
+    expires_at: float
+    rows: List[str]  # One encoded flight per row, in ranked order
+    size: int
+
+
+class SearchResultStore:
+    """In-process store of full ranked search results for cursor paging.
+
+    Each result is kept as one compact JSON string per flight, so a page
+    only decodes the rows it returns and the byte accounting is exact.
+    Results expire after `ttl` seconds; beyond that, least recently used
+    results are evicted to stay within `max_entries` and `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        ttl: int = settings.search_results_ttl_seconds,
+        max_bytes: int = settings.search_results_max_bytes,
+        max_entries: int = settings.search_results_max_entries
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._results: "OrderedDict[str, StoredResult]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"stored": 0, "pages": 0, "expired": 0, "evicted": 0, "truncated": 0, "misses": 0}
+
+    def put(self, flights: List[Dict[str, Any]]) -> Tuple[str, int]:
+        """Store a ranked result set; returns its id and how many rows were kept."""
+        rows: List[str] = []
+        size = 0
+        for flight in flights:
+            row = _encode(flight)
+            if size + len(row) > self.max_bytes:
+                self.stats["truncated"] += 1
+                logger.warning(f"Search result truncated to {len(rows)} of {len(flights)} flights to fit the result store")
+                break
+            rows.append(row)
+            size += len(row)
+
+        result_id = uuid.uuid4().hex
+        self._purge_expired()
+        self._results[result_id] = StoredResult(time.time() + self.ttl, rows, size)
+        self._bytes += size
+        self.stats["stored"] += 1
+        self._evict()
+        return result_id, len(rows)
+
+    def page(self, result_id: str, offset: int, limit: int) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        """Return (flights, total) for a slice of a stored result, or None if it is gone."""
+        result = self._results.get(result_id)
+        if result is None or result.expires_at < time.time():
+            if result is not None:
+                self._discard(result_id)
+                self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        self._results.move_to_end(result_id)
+        self.stats["pages"] += 1
+        return [_decode(row) for row in result.rows[offset:offset + limit]], len(result.rows)
+
+    @staticmethod
+    def encode_cursor(result_id: str, offset: int) -> str:
+        raw = json.dumps({"r": result_id, "o": offset}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """Return (result_id, offset); raises ValueError for a malformed cursor."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            result_id, offset = str(payload["r"]), int(payload["o"])
+        except (binascii.Error, ValueError, KeyError, TypeError) as e:
+            raise ValueError("Invalid cursor") from e
+        if offset < 0:
+            raise ValueError("Invalid cursor")
+        return result_id, offset
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "results": len(self._results), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def _purge_expired(self) -> None:
+        now = time.time()
+        for result_id in [key for key, result in self._results.items() if result.expires_at < now]:
+            self._discard(result_id)
+            self.stats["expired"] += 1
+
+    def _evict(self) -> None:
+        while self._results and (len(self._results) > self.max_entries or self._bytes > self.max_bytes):
+            result_id = next(iter(self._results))
+            self._discard(result_id)
+            self.stats["evicted"] += 1
+
+    def _discard(self, result_id: str) -> None:
+        result = self._results.pop(result_id, None)
+        if result is not None:
+            self._bytes -= result.size
+
+
+search_result_store = SearchResultStore()
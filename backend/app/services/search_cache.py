@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import redis.asyncio as aioredis
+from ..config import settings
+from ..schemas.flight import FlightSearchRequest
+import logging
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "skyninja:search:v2:"
+
+
+def _encode(value: Any) -> str:
+    def default(o: Any) -> Any:
+        if isinstance(o, datetime):
+            return {"$dt": o.isoformat()}
+        if isinstance(o, date):
+            return {"$d": o.isoformat()}
+        raise TypeError(f"Cannot cache value of type {type(o).__name__}")
+    return json.dumps(value, default=default, separators=(",", ":"))
+
+
+def _decode(raw: str) -> Any:
+    def object_hook(o: Dict[str, Any]) -> Any:
+        if len(o) == 1:
+            if "$dt" in o:
+                return datetime.fromisoformat(o["$dt"])
+            if "$d" in o:
+                return date.fromisoformat(o["$d"])
+        return o
+    return json.loads(raw, object_hook=object_hook)
+
+
+class SearchCache:
+    """Two-tier cache for parsed search results.
+
+    An in-process LRU sits in front of Redis. Entries are fresh for `ttl`
+    seconds and may then be served stale for another `stale_ttl` seconds
+    while a single background task refreshes them.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = settings.redis_url,
+        ttl: int = settings.search_cache_ttl_seconds,
+        stale_ttl: int = settings.search_cache_stale_seconds,
+        max_local_entries: int = settings.search_cache_local_entries,
+        enabled: bool = settings.search_cache_enabled
+    ):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_local_entries = max_local_entries
+        self.enabled = enabled
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._redis: Optional[aioredis.Redis] = None
+        self._redis_down_until = 0.0
+        self._refreshing: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "local_hits": 0,
+            "redis_hits": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "empty_refreshes": 0,
+            "redis_errors": 0,
+        }
+
+    @staticmethod
+    def make_key(search_request: FlightSearchRequest, regions: Optional[List[str]] = None, providers: Optional[List[str]] = None) -> str:
+        """Build a cache key from the parts of a request that change provider results.
+
+        Result filters (max_stops, max_price, preferred_airlines) are applied
+        after fetching, so they are deliberately not part of the key.
+        """
+        normalised = {
+            "origin": search_request.origin_code.strip().upper(),
+            "destination": search_request.destination_code.strip().upper(),
+            "departure": search_request.departure_date.date().isoformat(),
+            "return": search_request.return_date.date().isoformat() if search_request.return_date else None,
+            "passengers": search_request.passengers,
+            "flight_type": search_request.flight_type.value,
+            "currency": search_request.preferred_currency.strip().upper(),
+            "regions": sorted(regions or settings.search_regions),
+            "providers": sorted(providers or settings.search_providers),
+        }
+        digest = hashlib.sha256(json.dumps(normalised, sort_keys=True).encode()).hexdigest()
+        return KEY_PREFIX + digest
+
+    async def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Return (value, is_fresh) or None when the key is missing or expired."""
+        if not self.enabled:
+            return None
+
+        entry = self._local_get(key)
+        if entry is not None:
+            self.stats["local_hits"] += 1
+        else:
+            entry = await self._redis_get(key)
+            if entry is not None:
+                self.stats["redis_hits"] += 1
+                self._local_set(key, entry)
+
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        stored_at, value = entry
+        age = time.time() - stored_at
+        if age <= self.ttl:
+            self.stats["hits"] += 1
+            return value, True
+        self.stats["stale_hits"] += 1
+        return value, False
+
+    async def peek(self, key: str) -> Optional[Any]:
+        """Return a fresh value without touching the hit/miss counters."""
+        if not self.enabled:
+            return None
+
+        entry = self._local_get(key) or await self._redis_get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    async def set(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+
+        entry = (time.time(), value)
+        self._local_set(key, entry)
+        await self._redis_set(key, entry)
+
+    def refresh_in_background(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Refresh a stale entry once, without blocking the caller. An empty result keeps the stale entry."""
+        if key in self._refreshing:
+            return
+
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, fetch))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def close(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        served = self.stats["hits"] + self.stats["stale_hits"]
+        lookups = served + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(served / lookups, 3) if lookups else 0.0,
+            "provider_searches_saved": served,
+            "local_entries": len(self._local),
+        }
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            value = await fetch()
+            if not value:
+                # Every provider failed or timed out; serving the stale entry beats caching nothing
+                self.stats["empty_refreshes"] += 1
+                logger.warning("Refreshing a cached search found nothing; keeping the stale entry")
+                return
+            await self.set(key, value)
+            self.stats["refreshes"] += 1
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            logger.error(f"Error refreshing cached search: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def _local_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > self.ttl + self.stale_ttl:
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return entry
+
+    def _local_set(self, key: str, entry: Tuple[float, Any]) -> None:
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+
+    def _get_redis(self) -> Optional[aioredis.Redis]:
+        if not self.redis_url or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        return self._redis
+
+    def _redis_failed(self, e: Exception) -> None:
+        self.stats["redis_errors"] += 1
+        self._redis_down_until = time.monotonic() + settings.search_cache_redis_retry_seconds
+        logger.warning(f"Search cache Redis unavailable, using local tier only: {e}")
+
+    async def _redis_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+        payload = _decode(raw)
+        return payload["stored_at"], payload["value"]
+
+    async def _redis_set(self, key: str, entry: Tuple[float, Any]) -> None:
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            raw = _encode({"stored_at": entry[0], "value": entry[1]})
+            await client.set(key, raw, ex=self.ttl + self.stale_ttl)
+        except Exception as e:
+            self._redis_failed(e)
+
+
+search_cache = SearchCache()
@@ -0,0 +1,232 @@
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from ..models.flight import Flight, FlightRawData, FlightType, PriceHistory
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns filled in by the database that FlightResponse needs back
+_FLIGHT_RETURNING = (Flight.__table__.c.id, Flight.__table__.c.created_at)
+
+# Unique key of a flight (uq_flights_natural_key) and the columns a newer search overwrites.
+# A price is only comparable within one currency, passenger count and trip type, so those are part of the key.
+# Round trips sharing an outbound flight are told apart by their inbound one.
+NATURAL_KEY = (
+    "source_api", "flight_number", "departure_time", "arrival_time", "currency", "passengers", "trip_type", "return_leg_key",
+)
+UPSERT_COLUMNS = (
+    "base_price", "taxes", "fees", "total_price", "available_seats",
+    "booking_class", "duration_minutes", "external_id",
+)
+
+# Natural keys looked up per SELECT; keeps the bound parameters well under SQLite's limit
+_LOOKUP_BATCH = 100
+
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _dialect_insert(db: Session, operation: str) -> Callable[..., Any]:
+    """The INSERT construct with ON CONFLICT support for the session's database."""
+    dialect = db.get_bind().dialect.name
+    dialect_insert = _DIALECT_INSERTS.get(dialect)
+    if dialect_insert is None:
+        raise NotImplementedError(f"{operation} is not supported on {dialect}")
+    return dialect_insert
+
+
+def flight_row(flight_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a parsed flight to Flight column values."""
+    return {
+        "flight_number": flight_data.get("flight_number", ""),
+        "airline_code": flight_data.get("airline_code", ""),
+        "airline_name": flight_data.get("airline_name", ""),
+        "origin_code": flight_data.get("origin_code", ""),
+        "origin_name": flight_data.get("origin_name", ""),
+        "destination_code": flight_data.get("destination_code", ""),
+        "destination_name": flight_data.get("destination_name", ""),
+        "departure_time": flight_data.get("departure_time"),
+        "arrival_time": flight_data.get("arrival_time"),
+        "duration_minutes": flight_data.get("duration_minutes", 0),
+        "base_price": flight_data.get("base_price", 0),
+        "currency": flight_data.get("currency", "USD"),
+        "taxes": flight_data.get("taxes", 0),
+        "fees": flight_data.get("fees", 0),
+        "total_price": flight_data.get("price", 0),
+        "passengers": flight_data.get("passengers", 1),
+        "trip_type": flight_data.get("trip_type", FlightType.ONE_WAY.value),
+        "return_leg_key": flight_data.get("return_leg_key", ""),
+        "available_seats": flight_data.get("available_seats"),
+        "booking_class": flight_data.get("booking_class"),
+        "aircraft_type": flight_data.get("aircraft_type"),
+        "stops": flight_data.get("stops", 0),
+        "is_direct": flight_data.get("is_direct", True),
+        "external_id": flight_data.get("external_id"),
+        "source_api": flight_data.get("source_api", "skyscanner"),
+    }
+
+
+def compress_payload(data: Any) -> bytes:
+    return zlib.compress(json.dumps(data, default=str, separators=(",", ":")).encode(), 6)
+
+
+def decompress_payload(payload: bytes) -> Any:
+    return json.loads(zlib.decompress(payload))
+
+
+def natural_key(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(row.get(column) for column in NATURAL_KEY)
+
+
+def flight_key(flight_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """The natural key of a parsed flight, matching natural_key(flight_row(flight_data))."""
+    return (
+        flight_data.get("source_api", "skyscanner"),
+        flight_data.get("flight_number", ""),
+        flight_data.get("departure_time"),
+        flight_data.get("arrival_time"),
+        flight_data.get("currency", "USD"),
+        flight_data.get("passengers", 1),
+        flight_data.get("trip_type", FlightType.ONE_WAY.value),
+        flight_data.get("return_leg_key", ""),
+    )
+
+
+def _comparable_key(key: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    # SQLite hands datetimes back naive and PostgreSQL in UTC; compare both as UTC
+    return tuple(
+        (part.astimezone(timezone.utc) if part.tzinfo else part.replace(tzinfo=timezone.utc)) if isinstance(part, datetime) else part
+        for part in key
+    )
+
+
+def price_history_rows(
+    search_id: int,
+    region_results: Dict[str, List[Dict[str, Any]]],
+    flight_ids: Dict[Tuple[Any, ...], int]
+) -> List[Dict[str, Any]]:
+    """Map per-region results to PriceHistory column values linked to their flights."""
+    return [
+        {
+            "search_id": search_id,
+            "flight_id": flight_ids.get(flight_key(flight_data)),
+            "price": flight_data.get("price", 0),
+            "currency": flight_data.get("currency", "USD"),
+            "region": region,
+        }
+        for region, region_flights in region_results.items()
+        for flight_data in region_flights
+    ]
+
+
+def upsert_flights(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert or update flight rows on their natural key with multi-row INSERT ... ON CONFLICT.
+
+    Returns one row per distinct flight, with the canonical id and created_at
+    filled in, in natural-key order. Nothing is committed; the caller owns
+    the transaction.
+    """
+    if not rows:
+        return []
+
+    dialect_insert = _dialect_insert(db, "Flight upsert")
+
+    # A statement may touch each key once; keep the cheapest fare per flight.
+    # Sorting also makes concurrent searches lock shared rows in the same order.
+    distinct: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for row in rows:
+        key = natural_key(row)
+        if key not in distinct or row["total_price"] < distinct[key]["total_price"]:
+            distinct[key] = row
+    ordered = [distinct[key] for key in sorted(distinct, key=lambda k: tuple(str(part) for part in k))]
+
+    stmt = dialect_insert(Flight.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(NATURAL_KEY),
+        set_={**{column: stmt.excluded[column] for column in UPSERT_COLUMNS}, "updated_at": func.now()}
+    ).returning(*_FLIGHT_RETURNING, sort_by_parameter_order=True)
+    result = db.execute(stmt, ordered)
+    return [{**row, "id": stored.id, "created_at": stored.created_at} for row, stored in zip(ordered, result)]
+
+
+def find_flights(db: Session, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Look flight rows up on their natural key without writing anything.
+
+    Returns (found, missing): the rows already stored, with their id and
+    created_at filled in, and the rows that are not stored yet.
+    """
+    table = Flight.__table__
+    key_columns = [table.c[column] for column in NATURAL_KEY]
+    distinct = {natural_key(row): row for row in rows}
+    keys = list(distinct)
+
+    stored: Dict[Tuple[Any, ...], Any] = {}
+    for start in range(0, len(keys), _LOOKUP_BATCH):
+        stmt = select(*_FLIGHT_RETURNING, *key_columns).where(tuple_(*key_columns).in_(keys[start:start + _LOOKUP_BATCH]))
+        for stored_row in db.execute(stmt):
+            stored[_comparable_key(tuple(stored_row._mapping[column] for column in NATURAL_KEY))] = stored_row
+
+    found, missing = [], []
+    for key, row in distinct.items():
+        stored_row = stored.get(_comparable_key(key))
+        if stored_row is None:
+            missing.append(row)
+        else:
+            found.append({**row, "id": stored_row.id, "created_at": stored_row.created_at})
+    return found, missing
+
+
+def insert_missing_flights(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert the flight rows that are not stored yet, leaving stored ones as they are.
+
+    For results that were not fetched just now: a concurrent live search
+    may store the same flight at a fresher price first, and that price must
+    win. Returns every row with its stored id and created_at. Nothing is
+    committed; the caller owns the transaction.
+    """
+    if not rows:
+        return []
+
+    distinct = {natural_key(row): row for row in rows}
+    stmt = _dialect_insert(db, "Flight insert")(Flight.__table__).on_conflict_do_nothing(index_elements=list(NATURAL_KEY))
+    db.execute(stmt, [distinct[key] for key in sorted(distinct, key=lambda k: tuple(str(part) for part in k))])
+    found, missing = find_flights(db, rows)
+    if missing:
+        logger.warning(f"{len(missing)} flight(s) neither inserted nor found on their natural key")
+    return found
+
+
+def insert_price_history(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert price history rows in batched multi-row INSERTs."""
+    if rows:
+        db.execute(insert(PriceHistory.__table__), rows)
+
+
+def upsert_raw_data(db: Session, flight_ids: Dict[Tuple[Any, ...], int], flights: List[Dict[str, Any]]) -> None:
+    """Store each flight's parsed API data, compressed, in the flight_raw_data side table.
+
+    Only pass flights fresh from the providers; cached results would
+    rewrite the payloads with the same or older data.
+    """
+    rows = {}
+    for flight_data in flights:
+        flight_id = flight_ids.get(flight_key(flight_data))
+        if flight_id is not None:
+            rows[flight_id] = {"flight_id": flight_id, "payload": compress_payload(flight_data)}
+    if not rows:
+        return
+
+    stmt = _dialect_insert(db, "Raw data upsert")(FlightRawData.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["flight_id"],
+        set_={"payload": stmt.excluded.payload, "updated_at": func.now()}
+    )
+    db.execute(stmt, [rows[flight_id] for flight_id in sorted(rows)])
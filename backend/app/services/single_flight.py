@@ -0,0 +1,183 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import redis.asyncio as aioredis
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "skyninja:lock:"
+
+# Delete the lock only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SharedCall:
+    """One in-flight call that any number of callers can follow.
+
+    The work runs in its own task, so a caller that goes away does not cancel
+    it for the others. Progress items published by the work are replayed to
+    every follower, including ones that joined late.
+    """
+
+    def __init__(self, fn: Callable[[Callable[[Any], None]], Awaitable[Any]]):
+        self.events: List[Any] = []
+        self._wake = asyncio.Event()
+        self.task = asyncio.create_task(fn(self.publish))
+        self.task.add_done_callback(lambda _: self._wake.set())
+
+    def publish(self, item: Any) -> None:
+        self.events.append(item)
+        wake, self._wake = self._wake, asyncio.Event()
+        wake.set()
+
+    async def follow(self) -> AsyncIterator[Any]:
+        """Yield every published item until the call finishes."""
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.task.done():
+                return
+            await self._wake.wait()
+
+    async def result(self) -> Any:
+        return await asyncio.shield(self.task)
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls onto one in-flight call.
+
+    Within a process, callers with the same key share a SharedCall. Across
+    worker processes, redis_lock() and wait_for_leader() let one worker do
+    the work while the others wait for its result to show up elsewhere,
+    typically in the search cache.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.search_coalesce_enabled,
+        redis_url: Optional[str] = settings.redis_url,
+        lock_ttl: float = settings.search_coalesce_lock_ttl_seconds,
+        poll_interval: float = 0.1
+    ):
+        self.enabled = enabled
+        self.redis_url = redis_url
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, SharedCall] = {}
+        self._redis: Optional[aioredis.Redis] = None
+        self.stats = {"leaders": 0, "coalesced": 0, "remote_waits": 0, "remote_hits": 0}
+
+    def join(self, key: str, fn: Callable[[Callable[[Any], None]], Awaitable[Any]]) -> Tuple[SharedCall, bool]:
+        """Join the in-flight call for key, starting it if there is none.
+
+        fn receives a publish callback for progress items. Returns the call
+        and whether this caller started it.
+        """
+        call = self._inflight.get(key) if self.enabled else None
+        if call is not None:
+            self.stats["coalesced"] += 1
+            return call, False
+
+        call = SharedCall(fn)
+        self.stats["leaders"] += 1
+        if self.enabled:
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return call, True
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn once for all concurrent callers with the same key."""
+        call, _ = self.join(key, lambda publish: fn())
+        return await call.result()
+
+    @asynccontextmanager
+    async def redis_lock(self, key: str) -> AsyncIterator[bool]:
+        """Try to become the cross-worker leader for key.
+
+        Yields True when this worker holds the lock, or when Redis is not
+        configured or not available and the worker should just go ahead on
+        its own.
+        """
+        token = uuid.uuid4().hex
+        acquired = False
+        try:
+            client = self._get_redis()
+            if client is not None:
+                acquired = bool(await client.set(LOCK_PREFIX + key, token, nx=True, px=int(self.lock_ttl * 1000)))
+        except Exception as e:
+            logger.warning(f"Coalescing lock unavailable, searching locally: {e}")
+            client = None
+        if client is None:
+            yield True
+            return
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    await client.eval(_RELEASE_SCRIPT, 1, LOCK_PREFIX + key, token)
+                except Exception as e:
+                    logger.warning(f"Error releasing coalescing lock: {e}")
+
+    async def wait_for_leader(self, key: str, check: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Wait for another worker's call to produce a result.
+
+        Polls check() until it returns a value, the leader's lock disappears
+        or the lock TTL has passed. Returns None if no result appeared.
+        """
+        self.stats["remote_waits"] += 1
+        try:
+            client = self._get_redis()
+        except Exception as e:
+            logger.warning(f"Coalescing lock unavailable: {e}")
+            client = None
+        if client is None:
+            return await check()
+        deadline = time.monotonic() + self.lock_ttl
+
+        while time.monotonic() < deadline:
+            value = await check()
+            if value is not None:
+                self.stats["remote_hits"] += 1
+                return value
+            try:
+                if not await client.exists(LOCK_PREFIX + key):
+                    break
+            except Exception:
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        value = await check()
+        if value is not None:
+            self.stats["remote_hits"] += 1
+        return value
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "in_flight": len(self._inflight)}
+
+    def _get_redis(self) -> Optional[aioredis.Redis]:
+        if not self.redis_url:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        return self._redis
+
+
+single_flight = SingleFlight()
@@ -1,4 +1,5 @@
 import asyncio
+import secrets
 import httpx
 from typing import Optional, List, Dict, Any
 from ..config import settings
@@ -11,8 +12,40 @@ class VPNService:
     def __init__(self):
         self.nordvpn_token = settings.nordvpn_token
         self.nordvpn_connect = settings.nordvpn_connect
+        self.egress_proxy_template = settings.egress_proxy_template
         self.current_region = None
 
+    async def open_egress(self, region: str) -> Optional[str]:
+        """Open a dedicated egress for a region and return its proxy URL.
+        
+        Unlike switch_region this does not touch any process-wide state, so
+        several regions can be used at once. Every call fills the template's
+        {session} field with a new id, so with a sticky-session proxy each
+        egress gets its own exit and reopening one really replaces it.
+        Returns None for direct egress when no proxy template is configured.
+        """
+        if not self.egress_proxy_template:
+            return None
+        
+        return self.egress_proxy_template.format(
+            region=region.lower(),
+            token=self.nordvpn_token or "",
+            session=secrets.token_hex(8)
+        )
+
+    async def check_egress(self, proxy_url: Optional[str]) -> bool:
+        """Check that a regional egress can reach the outside world."""
+        if proxy_url is None:
+            return True
+        
+        try:
+            async with httpx.AsyncClient(proxies=proxy_url, timeout=5.0) as client:
+                response = await client.get(settings.egress_health_check_url)
+                return response.status_code < 500
+        except Exception as e:
+            logger.warning(f"Egress health check failed: {e}")
+            return False
+
     async def switch_region(self, region: str) -> bool:
         """Switch VPN to a specific region."""
         try:
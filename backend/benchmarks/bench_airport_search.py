@@ -0,0 +1,116 @@
+"""Airport typeahead: scanning every airport vs. ReferenceData's sorted prefix index.
+
+Writes a synthetic airports CSV of the requested size next to the shipped
+one (the real dataset is a few thousand IATA airports; larger sizes show
+how each approach scales), loads it, and times typeahead queries of 1 to 5
+characters as a debounced search box would send them. Both approaches must
+return the same set of airports for each query.
+
+    cd backend && python -m benchmarks.bench_airport_search --airports 10000 100000
+"""
+import argparse
+import csv
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+from typing import Dict, List, Set
+
+from app.config import settings
+from app.services.reference_data import ReferenceData, normalise
+
+
+def write_airports(path: str, count: int, seed: int = 11) -> None:
+    rng = random.Random(seed)
+    with open(settings.airports_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    codes = {row["iata"] for row in rows}
+    syllables = ["an", "ber", "ca", "del", "er", "fo", "gra", "ha", "in", "ko", "lu", "mar", "no", "or", "pa", "ri", "san", "to", "va", "zu"]
+    while len(rows) < count:
+        code = "".join(rng.choice(string.ascii_uppercase) for _ in range(3))
+        if code in codes and len(codes) < 26 ** 3:
+            continue
+        codes.add(code)
+        city = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).capitalize()
+        rows.append({"iata": code, "name": f"{city} {rng.choice(['International', 'Regional', 'Municipal'])} Airport", "city": city, "country": "XX"})
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["iata", "name", "city", "country"])
+        writer.writeheader()
+        writer.writerows(rows[:count])
+
+
+def linear_search(airports: List[Dict[str, str]], query: str) -> Set[str]:
+    prefix = normalise(query)
+    return {
+        airport["code"]
+        for airport in airports
+        if any(key.startswith(prefix) for key in airport["keys"])
+    }
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(count: int, queries: int, limit: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "airports.csv")
+    write_airports(path, count)
+    reference = ReferenceData(airports_path=path, max_scan=1_000_000)
+    start = time.perf_counter()
+    reference.load()
+    load_time = time.perf_counter() - start
+
+    # The linear scan gets the same pre-normalised keys, so only the lookup differs
+    airports = []
+    for code, name, city in zip(reference.codes, reference.names, reference.cities):
+        keys = {code.lower(), normalise(city), normalise(name)} | {word for word in normalise(f"{name} {city}").split() if len(word) > 1}
+        airports.append({"code": code, "keys": keys})
+
+    rng = random.Random(5)
+    words = [normalise(city) for city in reference.cities] + [code.lower() for code in reference.codes]
+    samples = [rng.choice(words)[:rng.randint(1, 5)] for _ in range(queries)]
+
+    slow, fast = [], []
+    for query in samples:
+        began = time.perf_counter()
+        expected = linear_search(airports, query)
+        slow.append(time.perf_counter() - began)
+
+        began = time.perf_counter()
+        found = reference.search_airports(query, limit=len(reference.codes))
+        fast.append(time.perf_counter() - began)
+        assert {airport["code"] for airport in found} == expected, f"results differ for {query!r}"
+
+    # What the endpoint actually does: top `limit` with the default scan cap
+    capped = ReferenceData(airports_path=path)
+    capped.load()
+    top = []
+    for query in samples:
+        began = time.perf_counter()
+        capped.search_airports(query, limit=limit)
+        top.append(time.perf_counter() - began)
+
+    print(
+        f"{count:>8,} airports  load={load_time * 1000:>6.0f}ms keys={len(reference._keys):>8,}  "
+        f"scan p50={statistics.median(slow) * 1e6:>8.0f}us p99={percentile(slow, 99) * 1e6:>8.0f}us  "
+        f"index p50={statistics.median(fast) * 1e6:>6.0f}us p99={percentile(fast, 99) * 1e6:>6.0f}us  "
+        f"top{limit} p50={statistics.median(top) * 1e6:>4.0f}us p99={percentile(top, 99) * 1e6:>5.0f}us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--airports", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=10, help="Results per typeahead query")
+    args = parser.parse_args()
+
+    for count in args.airports:
+        run(count, args.queries, args.limit)
+
+
+if __name__ == "__main__":
+    main()
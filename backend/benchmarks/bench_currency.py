@@ -0,0 +1,106 @@
+"""Currency normalisation: per-flight conversion vs. ExchangeRateService.convert_flights.
+
+Builds batches of flight dicts priced in a mix of currencies and converts
+them to one target currency with a plain per-flight loop (rate lookup and
+four multiplications per flight) and with the vectorised convert_flights.
+Both must produce the same prices. Finishes with a cold start from the
+on-disk snapshot while the rate source is unreachable.
+
+    cd backend && python -m benchmarks.bench_currency --flights 100 1000 10000
+"""
+import argparse
+import asyncio
+import copy
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from app.services.exchange_rates import PRICE_FIELDS, ExchangeRateService, RateSource, StaticRateSource, STATIC_RATES
+
+
+class UnreachableSource(RateSource):
+    async def fetch(self, base_currency: str) -> Dict[str, float]:
+        raise ConnectionError("rate source unreachable")
+
+
+def build_flights(count: int, seed: int = 5) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    currencies = list(STATIC_RATES)
+    flights = []
+    for _ in range(count):
+        price = round(rng.uniform(50, 2000), 2)
+        flights.append({
+            "price": price,
+            "base_price": round(price * 0.8, 2),
+            "taxes": round(price * 0.15, 2),
+            "fees": round(price * 0.05, 2),
+            "currency": rng.choice(currencies),
+        })
+    return flights
+
+
+def convert_per_flight(service: ExchangeRateService, flights: List[Dict[str, Any]], currency: str) -> None:
+    for flight_data in flights:
+        rate = service.rate(flight_data["currency"], currency)
+        if rate is None or flight_data["currency"] == currency:
+            continue
+        flight_data["original_price"] = flight_data["price"]
+        flight_data["original_currency"] = flight_data["currency"]
+        for field in PRICE_FIELDS:
+            flight_data[field] = round(flight_data[field] * rate, 2)
+        flight_data["currency"] = currency
+
+
+async def cold_start(snapshot_path: str) -> None:
+    service = ExchangeRateService(source=UnreachableSource(), snapshot_path=snapshot_path, refresh_interval=0)
+    began = time.perf_counter()
+    await service.start()
+    elapsed = time.perf_counter() - began
+    stats = service.get_stats()
+    print(
+        f"cold start, source down: {stats['currencies']} currencies from snapshot in {elapsed * 1000:.1f}ms, "
+        f"100 USD = {service.convert(100, 'USD', 'EUR')} EUR"
+    )
+
+
+async def run(sizes: List[int], currency: str, repeat: int) -> None:
+    snapshot_path = os.path.join(tempfile.mkdtemp(), "exchange_rates.json")
+    service = ExchangeRateService(source=StaticRateSource(), snapshot_path=snapshot_path, refresh_interval=0)
+    await service.start()
+
+    print(f"{'flights':>8} {'per-flight':>11} {'vectorised':>11} {'speedup':>8}")
+    for size in sizes:
+        flights = build_flights(size)
+        slow = fast = float("inf")
+        for _ in range(repeat):
+            expected = copy.deepcopy(flights)
+            start = time.perf_counter()
+            convert_per_flight(service, expected, currency)
+            slow = min(slow, time.perf_counter() - start)
+
+            converted = copy.deepcopy(flights)
+            start = time.perf_counter()
+            service.convert_flights(converted, currency)
+            fast = min(fast, time.perf_counter() - start)
+        for field in PRICE_FIELDS:
+            # Rounding to cents can differ by one cent between the two paths
+            assert all(abs(a[field] - b[field]) <= 0.011 for a, b in zip(expected, converted)), f"{field} differs"
+        print(f"{size:>8,} {slow * 1000:>9.2f}ms {fast * 1000:>9.2f}ms {slow / fast:>7.1f}x")
+
+    await cold_start(snapshot_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flights", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--currency", default="EUR")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.flights, args.currency.upper(), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Overlapping multi-region searches: global VPN switching vs. the egress pool.
+
+Runs many concurrent searches against a fake regional endpoint and reports
+latency, throughput and how many requests left through the wrong region.
+
+    cd backend && python -m benchmarks.bench_egress_pool --searches 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+from app.schemas.flight import FlightSearchRequest
+from app.services.egress_pool import EgressPool
+from app.services.flight_service import FlightService
+from app.services.providers import FlightProvider, ProviderRegistry
+from app.services.vpn_service import VPNService
+
+
+class FakeRegionalEndpoint:
+    """Stands in for a provider that prices differently per egress region."""
+
+    def __init__(self, latency: float, jitter: float):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = Counter()
+        self.mismatches = 0
+
+    async def search(self, requested_region: str, egress_region) -> List[Dict[str, Any]]:
+        """Serve one request; egress_region is a callable returning the live egress region."""
+        seen = egress_region()
+        self.calls[seen] += 1
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        # The egress must not change while the request is in flight either.
+        if requested_region != seen or requested_region != egress_region():
+            self.mismatches += 1
+        flight_number = f"SN{random.randint(100, 999)}"
+        return [{"flight_number": flight_number, "external_id": flight_number, "price": random.uniform(100, 900)}]
+
+
+class LegacySearch:
+    """The old behaviour: one process-wide region, switched before every query."""
+
+    def __init__(self, endpoint: FakeRegionalEndpoint, switch_delay: float):
+        self.endpoint = endpoint
+        self.switch_delay = switch_delay
+        self.current_region = None
+
+    async def search(self, regions: List[str]) -> int:
+        results = 0
+        for region in regions:
+            self.current_region = region
+            await asyncio.sleep(self.switch_delay * random.uniform(0.5, 1.5))
+            results += len(await self.endpoint.search(region, lambda: self.current_region))
+        return results
+
+
+class FakeRegionalProvider(FlightProvider):
+    """Regional provider backed by the fake endpoint instead of Skyscanner."""
+
+    name = "fake_regional"
+    regional = True
+
+    def __init__(self, endpoint: FakeRegionalEndpoint, max_concurrency: int):
+        super().__init__(timeout=settings.region_timeout_seconds, max_concurrency=max_concurrency)
+        self.endpoint = endpoint
+
+    async def fetch(self, search_request: FlightSearchRequest, region: Optional[str], proxy_url: Optional[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        yield await self.endpoint.search(search_request.destination_code, lambda: region)
+
+    def normalise(self, raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return raw
+
+
+async def _timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+def _report(name: str, latencies: List[float], wall: float, endpoint: FakeRegionalEndpoint) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(
+        f"{name:<8} searches={len(latencies)} wall={wall:.2f}s "
+        f"throughput={len(latencies) / wall:.1f}/s "
+        f"p50={statistics.median(latencies) * 1000:.0f}ms p95={p95 * 1000:.0f}ms "
+        f"provider_calls={sum(endpoint.calls.values())} wrong_region={endpoint.mismatches}"
+    )
+
+
+async def run(searches: int, latency: float, jitter: float, switch_delay: float, pool_size: int) -> None:
+    regions = settings.search_regions
+
+    # Legacy: shared current_region, sequential switching per search.
+    endpoint = FakeRegionalEndpoint(latency, jitter)
+    legacy = LegacySearch(endpoint, switch_delay)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(legacy.search(regions)) for _ in range(searches)))
+    _report("legacy", list(latencies), time.perf_counter() - start, endpoint)
+
+    # Egress pool: each region owns its connections, regions run concurrently.
+    endpoint = FakeRegionalEndpoint(latency, jitter)
+    pool = EgressPool(VPNService(), connections_per_region=pool_size, health_check_interval=0)
+    await pool.start(regions)
+    service = FlightService(egress_pool=pool, providers=ProviderRegistry([FakeRegionalProvider(endpoint, searches * len(regions))]))
+
+    async def pooled_search() -> None:
+        # Each region request carries its region so the endpoint can detect cross-talk.
+        await asyncio.gather(*(
+            _pooled_region(service, region) for region in regions
+        ))
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(pooled_search()) for _ in range(searches)))
+    _report("pool", list(latencies), time.perf_counter() - start, endpoint)
+    print(f"pool stats: {pool.get_stats()}")
+    await pool.close()
+
+
+async def _pooled_region(service: FlightService, region: str) -> None:
+    request = FlightSearchRequest(
+        origin_code="LHR",
+        destination_code=region,
+        departure_date=datetime.utcnow() + timedelta(days=30)
+    )
+    await service._search_regions(request, [region])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=200, help="Overlapping searches to run")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake endpoint latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Random extra latency in seconds")
+    parser.add_argument("--switch-delay", type=float, default=0.05, help="Legacy VPN switch delay in seconds")
+    parser.add_argument("--pool-size", type=int, default=settings.egress_connections_per_region, help="Egress connections per region, when proxied")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.searches, args.latency, args.jitter, args.switch_delay, args.pool_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Fare calendar: one full search per day vs. FlightService.get_fare_calendar.
+
+Builds a round-trip calendar over LocalFakeProvider and prints provider
+calls and wall time for searching each departure and return day one after
+another, the calendar on a cold cache, and the same calendar again on a
+warm one. Every path must find the same daily fares.
+
+    cd backend && python -m benchmarks.bench_fare_calendar --days 7 --latency 0.2
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from app.schemas.flight import FareCalendarRequest, FlightSearchRequest
+from app.services.flight_service import FlightService
+from app.services.providers import LocalFakeProvider, ProviderRegistry
+from app.services.search_cache import SearchCache
+from app.services.single_flight import SingleFlight
+
+
+async def run(days: int, latency: float, flights: int) -> None:
+    provider = LocalFakeProvider(flights_per_search=flights, batches=1, latency=latency)
+    service = FlightService(
+        providers=ProviderRegistry([provider]),
+        search_cache=SearchCache(redis_url="redis://127.0.0.1:1", enabled=True),
+        single_flight=SingleFlight(enabled=True)
+    )
+    start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=30)
+    calendar_request = FareCalendarRequest(
+        origin_code="LHR",
+        destination_code="JFK",
+        start_date=start,
+        end_date=start + timedelta(days=days - 1),
+        return_start_date=start + timedelta(days=3),
+        return_end_date=start + timedelta(days=days + 2)
+    )
+
+    # Baseline: a full search per day, one after another, as a client would have to
+    began = time.perf_counter()
+    baseline = []
+    for origin, destination, first in (("LHR", "JFK", calendar_request.start_date), ("JFK", "LHR", calendar_request.return_start_date)):
+        for offset in range(days):
+            request = FlightSearchRequest(origin_code=origin, destination_code=destination, departure_date=first + timedelta(days=offset))
+            flights = await service._fetch_unique_flights(request, [])
+            baseline.append(min(flight_data["price"] for flight_data in flights))
+    baseline_time = time.perf_counter() - began
+    print(f"{'per-day searches':<18} provider_calls={provider.stats['searches']:<4} wall={baseline_time:.2f}s")
+
+    for name in ("calendar (cold)", "calendar (warm)"):
+        calls = provider.stats["searches"]
+        began = time.perf_counter()
+        calendar = await service.get_fare_calendar(calendar_request)
+        elapsed = time.perf_counter() - began
+        assert calendar.outbound_prices + calendar.return_prices == [round(price, 2) for price in baseline], "daily fares differ"
+        print(f"{name:<18} provider_calls={provider.stats['searches'] - calls:<4} wall={elapsed:.2f}s")
+
+    cheapest = min(
+        (price, departure, back)
+        for departure, row in zip(calendar.departure_dates, calendar.round_trip_prices)
+        for back, price in zip(calendar.return_dates, row)
+        if price is not None
+    )
+    print(f"{days}x{days} round-trip matrix, cheapest {cheapest[0]:.2f} {calendar.currency} leaving {cheapest[1]} back {cheapest[2]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7, help="Departure days, and return days")
+    parser.add_argument("--latency", type=float, default=0.2, help="Provider latency per search in seconds")
+    parser.add_argument("--flights", type=int, default=200, help="Offers per provider search")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.days, args.latency, args.flights))
+
+
+if __name__ == "__main__":
+    main()
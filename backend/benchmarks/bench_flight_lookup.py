@@ -0,0 +1,95 @@
+"""Flight lookup cost with raw API data inline vs. in the flight_raw_data side table.
+
+Stores the same parsed flights twice: in a copy of the flights table with
+the old raw_data Text column, and through the current schema where the
+payload is compressed into flight_raw_data. Prints the average stored row
+width and the time of random lookups by id for each, plus the cost of
+fetching and decompressing a raw payload on request.
+
+    cd backend && python -m benchmarks.bench_flight_lookup --flights 20000 --lookups 20000
+"""
+import argparse
+import json
+import random
+import time
+
+from sqlalchemy import Column, MetaData, Text, UniqueConstraint, create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base
+import app.models  # noqa: F401 - register every table
+from app.models.flight import Flight, FlightRawData
+from app.services.flight_service import FlightService
+from app.services.providers import SkyscannerProvider
+from app.services.search_persistence import flight_row, natural_key, upsert_flights, upsert_raw_data
+from benchmarks.fake_skyscanner import generate_payload
+
+
+def _legacy_table(engine):
+    """The flights table as it was, with raw JSON stored in every row."""
+    metadata = MetaData()
+    table = Flight.__table__.to_metadata(metadata, name="flights_legacy")
+    table.append_column(Column("raw_data", Text, nullable=True))
+    # Named constraints and indexes would clash with the real table's on Postgres
+    table.constraints = {c for c in table.constraints if not isinstance(c, UniqueConstraint)}
+    table.indexes.clear()
+    metadata.create_all(engine)
+    return table
+
+
+def _row_bytes(db: Session, table) -> float:
+    columns = [func.coalesce(func.length(column), 0) for column in table.columns]
+    total = db.scalar(select(func.sum(sum(columns[1:], columns[0]))))
+    return total / db.scalar(select(func.count()).select_from(table))
+
+
+def _time_lookups(db: Session, fetch, ids, lookups: int) -> float:
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for _ in range(lookups):
+        fetch(rng.choice(ids))
+    return (time.perf_counter() - start) / lookups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://", help="Sync SQLAlchemy URL of a scratch database")
+    parser.add_argument("--flights", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    legacy = _legacy_table(engine)
+    session_factory = sessionmaker(bind=engine)
+
+    service = FlightService()
+    parsed = SkyscannerProvider().parse_results(generate_payload(itineraries=args.flights))
+    flights = list({natural_key(flight_row(f)): f for f in parsed}.values())
+
+    with session_factory() as db:
+        db.execute(legacy.insert(), [{**flight_row(f), "raw_data": json.dumps(f, default=str)} for f in flights])
+        stored = upsert_flights(db, [flight_row(f) for f in flights])
+        upsert_raw_data(db, {natural_key(row): row["id"] for row in stored}, flights)
+        db.commit()
+
+        legacy_ids = db.scalars(select(legacy.c.id)).all()
+        ids = [row["id"] for row in stored]
+
+        legacy_width = _row_bytes(db, legacy)
+        flight_width = _row_bytes(db, Flight.__table__)
+        raw_width = _row_bytes(db, FlightRawData.__table__)
+
+        legacy_time = _time_lookups(db, lambda i: db.execute(select(legacy).where(legacy.c.id == i)).first(), legacy_ids, args.lookups)
+        flights_table = Flight.__table__
+        flight_time = _time_lookups(db, lambda i: db.execute(select(flights_table).where(flights_table.c.id == i)).first(), ids, args.lookups)
+        raw_time = _time_lookups(db, lambda i: service.get_flight_raw_data(db, i), ids, min(args.lookups, 2000))
+
+    print(f"{'':>28} {'row bytes':>10} {'lookup':>10}")
+    print(f"{'flights + inline raw_data':>28} {legacy_width:>10,.0f} {legacy_time * 1e6:>8.0f}us")
+    print(f"{'flights':>28} {flight_width:>10,.0f} {flight_time * 1e6:>8.0f}us")
+    print(f"{'flight_raw_data (on demand)':>28} {raw_width:>10,.0f} {raw_time * 1e6:>8.0f}us")
+
+
+if __name__ == "__main__":
+    main()
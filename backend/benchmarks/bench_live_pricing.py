@@ -0,0 +1,91 @@
+"""Fixed 2 s sleep + single GET vs. adaptive live-pricing polling.
+
+Runs searches against StagedSkyscannerTransport and reports time to first
+results, time to the final result and how many itineraries each approach saw.
+
+    cd backend && python -m benchmarks.bench_live_pricing --stage-interval 0.8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import httpx
+
+from app.schemas.flight import FlightSearchRequest
+from app.services.http_clients import ProviderClientPool
+from app.services.providers import SkyscannerProvider
+from benchmarks.fake_skyscanner import StagedSkyscannerTransport, generate_payload
+
+
+class FakeClientPool(ProviderClientPool):
+    """Client pool whose clients all talk to the staged fake."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        super().__init__()
+        self.transport = transport
+
+    def _create_client(self, provider: str, proxy_url: Optional[str]) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport)
+
+
+async def legacy_search(provider: SkyscannerProvider, request: FlightSearchRequest) -> int:
+    """The old flow: create the session, sleep 2 s, GET once."""
+    client = provider.http_clients.get("skyscanner")
+    response = await client.post(f"{provider.base_url}/pricing/v1.0", data={})
+    results_url = f"{provider.base_url}/pricing/uk2/v1.0/{response.headers['Location'].split('/')[-1]}"
+    await asyncio.sleep(2)
+    results = await client.get(results_url)
+    return len(provider.parse_results(results.json()))
+
+
+async def polled_search(provider: SkyscannerProvider, request: FlightSearchRequest) -> tuple:
+    start = time.perf_counter()
+    first = None
+    count = 0
+    async for batch in provider.search(request, "US"):
+        if first is None:
+            first = time.perf_counter() - start
+        count += len(batch)
+    return first, count
+
+
+async def run(searches: int, itineraries: int, stages: int, stage_interval: float) -> None:
+    payload = generate_payload(itineraries=itineraries)
+    transport = StagedSkyscannerTransport(payload, stages=stages, stage_interval=stage_interval)
+    provider = SkyscannerProvider(http_clients=FakeClientPool(transport), api_key="benchmark", max_concurrency=searches)
+    request = FlightSearchRequest(origin_code="LHR", destination_code="JFK", departure_date=datetime.utcnow() + timedelta(days=30))
+    print(f"session fills in {stages} stages of {stage_interval}s, {itineraries} itineraries when complete")
+
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(legacy_search(provider, request) for _ in range(searches)))
+    elapsed = (time.perf_counter() - start)
+    print(f"fixed-sleep  done={elapsed:.2f}s itineraries(avg)={statistics.mean(counts):.0f} polls/search=1")
+
+    transport.poll_requests = 0
+    start = time.perf_counter()
+    results = await asyncio.gather(*(polled_search(provider, request) for _ in range(searches)))
+    elapsed = (time.perf_counter() - start)
+    firsts: List[float] = [r[0] for r in results if r[0] is not None]
+    print(
+        f"adaptive     first={statistics.median(firsts):.2f}s done={elapsed:.2f}s "
+        f"itineraries(avg)={statistics.mean(r[1] for r in results):.0f} "
+        f"polls/search={transport.poll_requests / searches:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=20)
+    parser.add_argument("--itineraries", type=int, default=1000)
+    parser.add_argument("--stages", type=int, default=4)
+    parser.add_argument("--stage-interval", type=float, default=0.8, help="Seconds between session stages")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.searches, args.itineraries, args.stages, args.stage_interval))
+
+
+if __name__ == "__main__":
+    main()
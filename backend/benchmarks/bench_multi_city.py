@@ -0,0 +1,106 @@
+"""Multi-city itinerary assembly: every combination vs. best-first k-cheapest.
+
+For each leg count, builds per-leg candidate lists, then takes the k
+cheapest connecting itineraries by enumerating and sorting every
+combination and with k_cheapest_combinations. Both must return the same
+totals. Finishes with one end-to-end FlightService.search_multi_city over
+LocalFakeProvider.
+
+    cd backend && python -m benchmarks.bench_multi_city --legs 2 3 4 5 --candidates 50 --k 10
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from app.config import settings
+from app.schemas.flight import MultiCitySearchRequest, SearchLeg
+from app.services.flight_service import FlightService
+from app.services.itinerary import connects, k_cheapest_combinations
+from app.services.providers import LocalFakeProvider, ProviderRegistry
+from app.services.search_cache import SearchCache
+
+
+def build_legs(legs: int, candidates: int, seed: int = 3) -> List[List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    base = datetime(2030, 5, 1)
+    result = []
+    for leg in range(legs):
+        day = base + timedelta(days=2 * leg)
+        flights = []
+        for i in range(candidates):
+            departure = day + timedelta(minutes=rng.randrange(0, 36 * 60, 5))
+            flights.append({
+                "flight_number": f"L{leg}F{i}",
+                "departure_time": departure,
+                "arrival_time": departure + timedelta(minutes=rng.randrange(60, 14 * 60, 5)),
+                "price": round(rng.uniform(60, 900), 2),
+            })
+        result.append(sorted(flights, key=lambda f: f["price"]))
+    return result
+
+
+def brute_force(legs, k: int, min_connection: timedelta):
+    combinations = []
+    for flights in itertools.product(*legs):
+        if all(connects(flights[i], flights[i + 1], min_connection) for i in range(len(flights) - 1)):
+            combinations.append((round(sum(f["price"] for f in flights), 2), list(flights)))
+    combinations.sort(key=lambda combination: combination[0])
+    return combinations[:k]
+
+
+async def end_to_end() -> None:
+    service = FlightService(
+        providers=ProviderRegistry([LocalFakeProvider(latency=0.05)]),
+        search_cache=SearchCache(redis_url="redis://127.0.0.1:1")
+    )
+    start = datetime.utcnow() + timedelta(days=30)
+    request = MultiCitySearchRequest(legs=[
+        SearchLeg(origin_code="LHR", destination_code="JFK", departure_date=start),
+        SearchLeg(origin_code="JFK", destination_code="LAX", departure_date=start + timedelta(days=3)),
+        SearchLeg(origin_code="LAX", destination_code="LHR", departure_date=start + timedelta(days=7)),
+    ], limit=5)
+    began = time.perf_counter()
+    itineraries = await service.search_multi_city(request)
+    elapsed = time.perf_counter() - began
+    print(f"end-to-end 3 legs: {len(itineraries)} itineraries in {elapsed * 1000:.0f}ms, cheapest:")
+    for leg in itineraries[0].legs:
+        print(f"  {leg.origin_code}->{leg.destination_code} {leg.flight_number} {leg.departure_time:%Y-%m-%d %H:%M} {leg.price:.2f}")
+    print(f"  total {itineraries[0].total_price:.2f} {itineraries[0].currency}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--legs", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--candidates", type=int, default=settings.multi_city_candidates_per_leg, help="Flights per leg")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--brute-force-limit", type=int, default=200_000, help="Skip brute force above this many combinations")
+    args = parser.parse_args()
+
+    min_connection = timedelta(minutes=settings.multi_city_min_connection_minutes)
+    print(f"{'legs':>4} {'combinations':>14} {'brute force':>12} {'k-cheapest':>11}")
+    for legs in args.legs:
+        candidates = build_legs(legs, args.candidates)
+        total = args.candidates ** legs
+
+        start = time.perf_counter()
+        best = k_cheapest_combinations(candidates, args.k, min_connection)
+        fast = time.perf_counter() - start
+
+        if total <= args.brute_force_limit:
+            start = time.perf_counter()
+            expected = brute_force(candidates, args.k, min_connection)
+            slow = f"{(time.perf_counter() - start) * 1000:>10.1f}ms"
+            assert [c[0] for c in best] == [c[0] for c in expected], f"{legs} legs: totals differ"
+        else:
+            slow = f"{'skipped':>12}"
+        print(f"{legs:>4} {total:>14,} {slow} {fast * 1000:>9.2f}ms")
+
+    asyncio.run(end_to_end())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Skyscanner payload parsing: linear-scan lookups vs. id-indexed lookups.
+
+Parses synthetic payloads of growing size and prints time per payload and
+per itinerary. With indexed lookups the per-itinerary cost stays flat.
+
+    cd backend && python -m benchmarks.bench_parsing --sizes 1000 2000 4000 8000
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+from app.services.providers import SkyscannerProvider
+from benchmarks.fake_skyscanner import generate_payload
+
+
+def legacy_parse(provider: SkyscannerProvider, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The previous algorithm: scan Legs per itinerary, Carriers/Places per leg."""
+    flights = []
+    legs = results.get("Legs", [])
+    carriers = results.get("Carriers", [])
+    places = results.get("Places", [])
+    for itinerary in results.get("Itineraries", []):
+        price = min(o.get("Price", float('inf')) for o in itinerary["PricingOptions"])
+        for leg in legs:
+            if leg.get("Id") == itinerary.get("OutboundLegId"):
+                carrier_id = leg["Carriers"][0]
+                carrier = next((c for c in carriers if c.get("Id") == carrier_id), {})
+                origin = next((p for p in places if p.get("Id") == leg.get("OriginStation")), {})
+                destination = next((p for p in places if p.get("Id") == leg.get("DestinationStation")), {})
+                flights.append((carrier, origin, destination, price))
+                break
+    return flights
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000], help="Itineraries (and legs) per payload")
+    parser.add_argument("--carriers", type=int, default=500)
+    parser.add_argument("--places", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy-above", type=int, default=8000, help="Legacy parse is quadratic; skip it on bigger payloads")
+    args = parser.parse_args()
+
+    provider = SkyscannerProvider()
+    print(f"{'itineraries':>11} {'legacy':>10} {'indexed':>10} {'indexed/itin':>13} {'speedup':>8}")
+    for size in args.sizes:
+        payload = generate_payload(itineraries=size, carriers=args.carriers, places=args.places)
+        indexed = _time(lambda: provider.parse_results(payload), args.repeat)
+        if size <= args.skip_legacy_above:
+            legacy = _time(lambda: legacy_parse(provider, payload), args.repeat)
+            legacy_text, speedup = f"{legacy * 1000:.1f}ms", f"{legacy / indexed:.1f}x"
+        else:
+            legacy_text, speedup = "skipped", "-"
+        print(f"{size:>11} {legacy_text:>10} {indexed * 1000:>8.1f}ms {indexed / size * 1e6:>11.2f}us {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
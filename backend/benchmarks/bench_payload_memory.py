@@ -0,0 +1,91 @@
+"""Peak memory of decoding a live-pricing payload: json() vs. streamed compact decode.
+
+Payloads are recorded to disk first (or passed with --payload) and then read
+back in chunks, the way a response body arrives. Peak memory is measured with
+tracemalloc around decode + parse. The streamed peak still grows with the
+payload, since the compacted itineraries, legs, carriers and places are all
+kept until the body ends.
+
+    cd backend && python -m benchmarks.bench_payload_memory --sizes 5000 20000 50000
+    cd backend && python -m benchmarks.bench_payload_memory --payload recorded.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import AsyncIterator, List
+
+from app.services.providers import SkyscannerProvider
+from app.services.live_pricing import read_compact_payload
+from benchmarks.fake_skyscanner import generate_payload
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def _chunks(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+            await asyncio.sleep(0)
+
+
+async def decode_whole(provider: SkyscannerProvider, path: str) -> int:
+    body = b"".join([chunk async for chunk in _chunks(path)])
+    return len(provider.parse_results(json.loads(body)))
+
+
+async def decode_streamed(provider: SkyscannerProvider, path: str) -> int:
+    payload = await read_compact_payload(_chunks(path))
+    return len(provider.parse_results(payload))
+
+
+def _measure(coro_fn, provider: SkyscannerProvider, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    flights = asyncio.run(coro_fn(provider, path))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return flights, peak / 1024 / 1024, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000, 50000], help="Itineraries per synthetic payload")
+    parser.add_argument("--payload", action="append", default=[], help="Recorded payload file(s) to use instead of synthetic ones")
+    args = parser.parse_args()
+
+    provider = SkyscannerProvider()
+    paths: List[str] = list(args.payload)
+    tmpdir = None
+    if not paths:
+        tmpdir = tempfile.TemporaryDirectory()
+        for size in args.sizes:
+            path = os.path.join(tmpdir.name, f"payload-{size}.json")
+            with open(path, "w") as f:
+                json.dump(generate_payload(itineraries=size, carriers=300, places=1000), f)
+            paths.append(path)
+
+    print(f"{'payload':>22} {'size':>8} {'json() peak':>12} {'streamed peak':>14} {'json() time':>12} {'streamed time':>14}")
+    for path in paths:
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        whole_flights, whole_peak, whole_time = _measure(decode_whole, provider, path)
+        stream_flights, stream_peak, stream_time = _measure(decode_streamed, provider, path)
+        assert whole_flights == stream_flights, "decoders disagree"
+        print(
+            f"{os.path.basename(path):>22} {size_mb:>6.1f}MB {whole_peak:>10.1f}MB {stream_peak:>12.1f}MB "
+            f"{whole_time:>11.2f}s {stream_time:>13.2f}s"
+        )
+
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Price alert matching: scanning every subscription vs. AlertIndex's sorted threshold buckets.
+
+Builds synthetic alerts ("route under <price> in <month>", mostly in USD,
+some in EUR and GBP) spread over the given number of routes and twelve
+travel months, then replays a stream of fares as price history ticks.
+Each tick claims the alerts it matches, so later ticks only see alerts
+that are still active, as in the service. For the first --scan-ticks ticks
+a linear scan over the remaining alerts must find exactly the same alerts.
+Ticks that match nothing show the cost of the lookup alone; the rest also
+pay for the alerts they trigger.
+
+    cd backend && python -m benchmarks.bench_price_alerts --alerts 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List, Set, Tuple
+
+from app.services.exchange_rates import ExchangeRateService, StaticRateSource
+from app.services.price_alerts import AlertIndex
+
+CURRENCIES = ["USD", "EUR", "GBP"]
+CURRENCY_WEIGHTS = [80, 15, 5]
+
+
+def make_alerts(count: int, routes: int, rates: ExchangeRateService, seed: int = 3) -> Tuple[List[Tuple], Dict[Tuple[str, str], float]]:
+    rng = random.Random(seed)
+    pairs = [(f"A{i % 500:03d}", f"B{i // 500:03d}") for i in range(routes)]
+    base = {pair: rng.uniform(150, 1200) for pair in pairs}
+    months = [f"2027-{month:02d}" for month in range(1, 13)]
+    currencies = rng.choices(CURRENCIES, weights=CURRENCY_WEIGHTS, k=count)
+    alerts = []
+    for alert_id, currency in enumerate(currencies, 1):
+        origin, destination = pair = rng.choice(pairs)
+        max_price = rates.convert(base[pair] * rng.uniform(0.5, 1.05), "USD", currency)
+        alerts.append((alert_id, origin, destination, rng.choice(months), currency, max_price))
+    return alerts, base
+
+
+def make_ticks(count: int, base: Dict[Tuple[str, str], float], seed: int = 4) -> List[Tuple[Tuple[str, str, str], float]]:
+    rng = random.Random(seed)
+    pairs = list(base)
+    ticks = []
+    for _ in range(count):
+        pair = rng.choice(pairs)
+        ticks.append(((pair[0], pair[1], f"2027-{rng.randint(1, 12):02d}"), round(base[pair] * rng.uniform(0.6, 1.4), 2)))
+    return ticks
+
+
+def linear_match(alerts: Dict[int, Tuple], route: Tuple[str, str, str], price: float, rates: ExchangeRateService) -> Set[int]:
+    matched = set()
+    for alert_id, (_, origin, destination, month, currency, max_price) in alerts.items():
+        if (origin, destination, month) == route and rates.convert(price, "USD", currency) <= max_price:
+            matched.add(alert_id)
+    return matched
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(count: int, routes: int, tick_count: int, scan_ticks: int, rates: ExchangeRateService) -> None:
+    alerts, base = make_alerts(count, routes, rates)
+    ticks = make_ticks(tick_count, base)
+
+    # Memory is measured on a separate build, since tracing slows building down
+    tracemalloc.start()
+    measured = AlertIndex()
+    measured.replace(alerts)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del measured
+
+    index = AlertIndex()
+    start = time.perf_counter()
+    index.replace(alerts)
+    build_time = time.perf_counter() - start
+
+    remaining = {alert[0]: alert for alert in alerts}
+    scan, claim, misses = [], [], []
+    matched = 0
+    for n, (route, price) in enumerate(ticks):
+        price_in = lambda currency: rates.convert(price, "USD", currency)
+        if n < scan_ticks:
+            began = time.perf_counter()
+            expected = linear_match(remaining, route, price, rates)
+            scan.append(time.perf_counter() - began)
+
+        began = time.perf_counter()
+        claimed = index.claim(route, price_in)
+        claim.append(time.perf_counter() - began)
+        if not claimed:
+            misses.append(claim[-1])
+        matched += len(claimed)
+
+        if n < scan_ticks:
+            assert {alert_id for alert_id, *_ in claimed} == expected, f"matches differ for tick {n}"
+        for alert_id, *_ in claimed:
+            remaining.pop(alert_id, None)
+
+    print(
+        f"{count:>9,} alerts  build={build_time * 1000:>6.0f}ms index={memory / 2 ** 20:>6.1f}MiB  "
+        f"scan p50={statistics.median(scan) * 1e3:>7.2f}ms  "
+        f"index p50={statistics.median(claim) * 1e6:>5.1f}us p99={percentile(claim, 99) * 1e6:>6.1f}us "
+        f"(no match p50={statistics.median(misses) * 1e6:>4.1f}us)  "
+        f"{tick_count:,} ticks triggered {matched:,} alerts"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--routes", type=int, default=5_000, help="Distinct origin/destination pairs")
+    parser.add_argument("--ticks", type=int, default=100_000, help="Fares replayed against the index")
+    parser.add_argument("--scan-ticks", type=int, default=20, help="Leading ticks also matched by a linear scan")
+    args = parser.parse_args()
+
+    rates = ExchangeRateService(source=StaticRateSource(), snapshot_path=None, refresh_interval=0)
+    asyncio.run(rates.refresh())
+    for count in args.alerts:
+        run(count, args.routes, args.ticks, args.scan_ticks, rates)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Price predictions: refitting on every request vs. the fitted model cache.
+
+Fills an in-memory SQLite database with flights and their price history,
+then sends prediction requests for a skewed mix of flights (a few popular
+flights get most of the requests), as the predict-price endpoint would.
+Every --tick-every requests a new price history row arrives for a random
+flight, so its next prediction has to refit. The same run is repeated with
+the cache disabled (max_entries=0), which refits every time as the service
+used to.
+
+    cd backend && python -m benchmarks.bench_price_prediction --flights 2000 --history 200 --requests 5000
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import *  # noqa: F401,F403 - register all tables
+from app.models.flight import Flight, FlightSearch, PriceHistory
+from app.schemas.flight import PricePredictionRequest
+from app.services.price_prediction_service import FittedModelCache, PricePredictionService
+
+
+def populate(db: Session, flights: int, history: int, seed: int = 7) -> List[int]:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    db.execute(insert(Flight.__table__), [
+        {
+            "flight_number": f"SN{i}", "airline_code": "SN", "airline_name": "SkyNinja Air",
+            "origin_code": "LHR", "origin_name": "London Heathrow", "destination_code": "JFK", "destination_name": "New York JFK",
+            "departure_time": now + timedelta(days=30), "arrival_time": now + timedelta(days=30, hours=8), "duration_minutes": 480,
+            "base_price": 300.0, "total_price": 350.0,
+        }
+        for i in range(flights)
+    ])
+    search = FlightSearch(origin_code="LHR", destination_code="JFK", departure_date=now + timedelta(days=30))
+    db.add(search)
+    db.flush()
+    flight_ids = [flight_id for (flight_id,) in db.query(Flight.id).order_by(Flight.id)]
+    rows = [
+        {
+            "search_id": search.id, "flight_id": flight_id, "price": round(350 + rng.gauss(0, 30), 2),
+            "currency": "USD", "recorded_at": now - timedelta(hours=history - i),
+        }
+        for flight_id in flight_ids for i in range(history)
+    ]
+    for start in range(0, len(rows), 50_000):
+        db.execute(insert(PriceHistory.__table__), rows[start:start + 50_000])
+    db.commit()
+    return flight_ids
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(label: str, service: PricePredictionService, db: Session, flight_ids: List[int], args: argparse.Namespace) -> None:
+    rng = random.Random(11)
+    # Zipf-like popularity: the k-th flight is requested in proportion to 1/k
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(flight_ids) + 1)))
+    requested = rng.choices(flight_ids, cum_weights=cum_weights, k=args.requests)
+    search_id = db.query(FlightSearch.id).scalar()
+
+    latencies = []
+    start = time.perf_counter()
+    for n, flight_id in enumerate(requested, 1):
+        began = time.perf_counter()
+        service.predict_price_trend(db, PricePredictionRequest(flight_id=flight_id, prediction_days=args.days))
+        latencies.append(time.perf_counter() - began)
+        if n % args.tick_every == 0:
+            db.add(PriceHistory(search_id=search_id, flight_id=rng.choice(flight_ids), price=round(rng.uniform(300, 400), 2), currency="USD"))
+            db.commit()
+    elapsed = time.perf_counter() - start
+
+    stats = service.get_stats()
+    print(
+        f"{label:<8} {args.requests / elapsed:>7.0f} req/s  p50={statistics.median(latencies) * 1e3:>6.2f}ms "
+        f"p99={percentile(latencies, 99) * 1e3:>6.2f}ms  fits={stats['misses']:>5,} hits={stats['hits']:>5,} "
+        f"refits={stats['refits']:>4,} models={stats['models']:>5,} ({stats['bytes'] / 1024:.0f} KiB)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flights", type=int, default=2000)
+    parser.add_argument("--history", type=int, default=200, help="Price history rows per flight")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=30, help="Days predicted per request")
+    parser.add_argument("--tick-every", type=int, default=10, help="Requests between new price history rows")
+    parser.add_argument("--max-entries", type=int, default=1000, help="Cached models, below --flights to exercise eviction")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+
+    for label, max_entries in (("refit", 0), ("cached", args.max_entries)):
+        # A fresh database per run, so both see the same history and the same new rows
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        with session_factory() as db:
+            flight_ids = populate(db, args.flights, args.history)
+            run(label, PricePredictionService(model_cache=FittedModelCache(max_entries=max_entries)), db, flight_ids, args)
+
+
+if __name__ == "__main__":
+    main()
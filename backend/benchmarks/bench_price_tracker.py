@@ -0,0 +1,166 @@
+"""Price tracking at scale: provider load, fairness and write throughput of PriceTracker.
+
+Tracks --trackers routes for --users users over --routes distinct routes
+(popular routes are tracked by many users) in SQLite, then runs the tracker
+for --duration seconds against LocalFakeProvider with a re-pricing interval
+shorter than the token bucket allows, so it has to fall behind. Prints
+provider calls against one call per tracker, the peak provider call rate
+per second against --rate, how evenly routes were checked (no route
+should be checked twice while another has waited longer), and price ticks
+and notifications written per second.
+
+    cd backend && python -m benchmarks.bench_price_tracker --trackers 100000 --routes 5000 --rate 300 --duration 40
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import *  # noqa: F401,F403 - register all tables
+from app.models.flight import TrackedRoute
+from app.services.flight_service import FlightService
+from app.services.price_tracker import PriceTracker, route_key
+from app.services.providers import LocalFakeProvider, ProviderRegistry
+from app.services.region_selector import RegionSelector
+from app.services.search_cache import SearchCache
+from app.services.single_flight import SingleFlight
+
+
+class CountingProvider(LocalFakeProvider):
+    """LocalFakeProvider that records when each search starts and drifts prices down over time."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started: List[float] = []
+
+    async def fetch(self, search_request, region, proxy_url):
+        self.started.append(time.monotonic())
+        async for raw in super().fetch(search_request, region, proxy_url):
+            yield raw
+
+    def normalise(self, raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        flights = super().normalise(raw)
+        factor = 0.97 ** (len(self.started) % 7)
+        for flight_data in flights:
+            for field in ("price", "base_price", "taxes", "fees"):
+                flight_data[field] = round(flight_data[field] * factor, 2)
+        return flights
+
+
+def populate(session_factory, users: int, routes: int, trackers: int) -> None:
+    rng = random.Random(2)
+    start = datetime.utcnow() + timedelta(days=14)
+    route_list = [(f"O{i % 400:03d}", f"D{i // 400:03d}", start + timedelta(days=i % 90)) for i in range(routes)]
+    # Every route is tracked at least once; popularity falls off with rank, so a few are tracked by many users
+    popular = rng.choices(route_list, cum_weights=list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(routes))), k=max(trackers - routes, 0))
+    with session_factory() as db:
+        db.execute(insert(User.__table__), [
+            {"email": f"user{i}@example.com", "username": f"user{i}", "first_name": "Bench", "last_name": "User", "hashed_password": "x"}
+            for i in range(users)
+        ])
+        picks = route_list[:trackers] + popular
+        rows = [
+            {"user_id": rng.randrange(users) + 1, "origin_code": origin, "destination_code": destination, "departure_date": departure,
+             "passengers": 1, "preferred_currency": "USD", "is_active": True}
+            for origin, destination, departure in picks
+        ]
+        db.execute(insert(TrackedRoute.__table__), rows)
+        db.commit()
+
+
+async def run(args) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+
+    began = time.perf_counter()
+    populate(session_factory, args.users, args.routes, args.trackers)
+    print(f"populated {args.trackers:,} trackers for {args.users:,} users in {time.perf_counter() - began:.1f}s")
+
+    provider = CountingProvider(flights_per_search=args.flights, batches=1, latency=args.latency, max_concurrency=10_000)
+    service = FlightService(
+        providers=ProviderRegistry([provider]),
+        search_cache=SearchCache(enabled=False),
+        single_flight=SingleFlight(enabled=False),
+        region_selector=RegionSelector(enabled=False)
+    )
+    tracker = PriceTracker(
+        flight_service=service,
+        session_factory=session_factory,
+        interval=args.interval,
+        rate=args.rate,
+        burst=args.burst,
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency,
+        seed=1
+    )
+    checked: Counter = Counter()
+    original = tracker._search_request
+
+    def counting_search_request(key):
+        checked[key] += 1
+        return original(key)
+
+    tracker._search_request = counting_search_request
+
+    await tracker.start()
+    began = time.monotonic()
+    await asyncio.sleep(args.duration)
+    await tracker.close()
+    elapsed = time.monotonic() - began
+
+    stats = tracker.get_stats()
+    per_second = Counter(int(started - began) for started in provider.started)
+    counts = Counter(checked.values())
+    with session_factory() as db:
+        ticks = db.query(func.count(PriceHistory.id)).scalar()
+        notifications = db.query(func.count(Notification.id)).scalar()
+        distinct = db.query(TrackedRoute).count()
+    print(
+        f"tracked routes: {distinct:,} trackers over {stats['routes']:,} distinct routes; "
+        f"interval {args.interval:.0f}s needs {stats['routes'] / args.interval:.0f} checks/s, rate allows {args.rate:.0f}/s"
+    )
+    print(
+        f"provider calls: {len(provider.started):,} in {elapsed:.1f}s "
+        f"(one call per tracker would be {stats['trackers'] * len(provider.started) / max(stats['routes'], 1):,.0f}), "
+        f"peak {max(per_second.values(), default=0)}/s against rate {args.rate:.0f}/s + burst {args.burst}"
+    )
+    print(
+        f"fairness: {len(checked):,} of {stats['routes']:,} routes checked, times checked {dict(sorted(counts.items()))}, "
+        f"max lag behind schedule {stats['max_lag_seconds']:.1f}s"
+    )
+    print(
+        f"writes: {ticks:,} price ticks ({ticks / elapsed:,.0f}/s) and {notifications:,} drop notifications "
+        f"in {stats['rounds']} rounds, {stats['check_errors']} check errors"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trackers", type=int, default=100_000)
+    parser.add_argument("--routes", type=int, default=5_000, help="Distinct routes the trackers are spread over")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--rate", type=float, default=300.0, help="Route checks per second")
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=10.0, help="Re-pricing interval in seconds")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--flights", type=int, default=10, help="Offers per provider search")
+    parser.add_argument("--latency", type=float, default=0.02, help="Provider latency per search in seconds")
+    parser.add_argument("--duration", type=float, default=40.0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Multi-provider aggregation throughput, fully offline.
+
+Runs concurrent searches through FlightService._fetch_unique_flights with
+LocalFakeProvider (and optionally the staged fake Skyscanner transport)
+registered, and prints searches/sec, merged flights per search and each
+provider's own counters. The search cache and coalescing are disabled and
+every search uses a different date so nothing is shared.
+
+    cd backend && python -m benchmarks.bench_providers --searches 200 --with-skyscanner
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from app.schemas.flight import FlightSearchRequest
+from app.services.egress_pool import EgressPool
+from app.services.flight_service import FlightService
+from app.services.providers import LocalFakeProvider, ProviderRegistry, SkyscannerProvider
+from app.services.search_cache import SearchCache
+from app.services.single_flight import SingleFlight
+from benchmarks.bench_live_pricing import FakeClientPool
+from benchmarks.fake_skyscanner import StagedSkyscannerTransport, generate_payload
+
+
+async def run(searches: int, flights: int, latency: float, with_skyscanner: bool, regions) -> None:
+    providers = [LocalFakeProvider(flights_per_search=flights, latency=latency, max_concurrency=searches)]
+    if with_skyscanner:
+        transport = StagedSkyscannerTransport(generate_payload(itineraries=flights), stages=2, stage_interval=latency)
+        providers.append(SkyscannerProvider(http_clients=FakeClientPool(transport), api_key="benchmark", max_concurrency=searches * len(regions)))
+
+    service = FlightService(
+        egress_pool=EgressPool(connections_per_region=searches, health_check_interval=0),
+        providers=ProviderRegistry(providers),
+        search_cache=SearchCache(enabled=False),
+        single_flight=SingleFlight(enabled=False)
+    )
+    start_date = datetime.utcnow() + timedelta(days=30)
+    requests = [
+        FlightSearchRequest(origin_code="LHR", destination_code="JFK", departure_date=start_date + timedelta(days=i))
+        for i in range(searches)
+    ]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(service._fetch_unique_flights(request, regions) for request in requests))
+    elapsed = time.perf_counter() - start
+
+    merged = sum(len(r) for r in results) / len(results)
+    by_source = {}
+    for result in results:
+        for flight_data in result:
+            by_source[flight_data["source_api"]] = by_source.get(flight_data["source_api"], 0) + 1
+
+    print(f"providers={','.join(service.providers.names())} regions={','.join(regions)}")
+    print(f"searches={searches} wall={elapsed:.2f}s throughput={searches / elapsed:.1f}/s merged_flights(avg)={merged:.0f}")
+    print(f"merged flights by source: {by_source}")
+    for name, stats in service.providers.get_stats().items():
+        print(f"{name:<12} {stats}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=100, help="Concurrent distinct searches")
+    parser.add_argument("--flights", type=int, default=200, help="Offers per provider per search")
+    parser.add_argument("--latency", type=float, default=0.05, help="Delay between provider batches in seconds")
+    parser.add_argument("--with-skyscanner", action="store_true", help="Also aggregate the fake Skyscanner transport")
+    parser.add_argument("--regions", nargs="+", default=["US", "UK"])
+    args = parser.parse_args()
+
+    asyncio.run(run(args.searches, args.flights, args.latency, args.with_skyscanner, args.regions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Filter-and-rank of search candidates: Python sorted() over dicts vs. FlightRanker.
+
+Builds tens of thousands of parsed candidate flights, applies the same
+request filters and sort order both ways and prints the time per pass. The
+Python baseline mirrors what FlightRanker computes, so the top results of
+both must agree.
+
+    cd backend && python -m benchmarks.bench_ranking --sizes 10000 50000 100000
+"""
+import argparse
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.schemas.flight import FlightSearchRequest, SearchSort
+from app.services.providers import SkyscannerProvider
+from app.services.ranking import FlightRanker
+from benchmarks.fake_skyscanner import generate_payload
+
+
+def python_rank(ranker: FlightRanker, flights: List[Dict[str, Any]], request: FlightSearchRequest, limit: Optional[int]) -> List[Dict[str, Any]]:
+    preferred = {code.upper() for code in request.preferred_airlines or []}
+    candidates = [
+        f for f in flights
+        if f["stops"] <= request.max_stops
+        and (request.max_price is None or f["price"] <= request.max_price)
+        and (not preferred or f["airline_code"] in preferred)
+    ]
+    if request.sort_by == SearchSort.FASTEST:
+        key = lambda f: (f["duration_minutes"], f["price"])
+    elif request.sort_by == SearchSort.BEST_VALUE:
+        bounds = {
+            field: (min(f[field] for f in candidates), max(f[field] for f in candidates))
+            for field in ("price", "duration_minutes", "stops")
+        }
+
+        def normalise(f, field):
+            low, high = bounds[field]
+            return (f[field] - low) / (high - low) if high > low else 0.0
+
+        key = lambda f: (
+            ranker.price_weight * normalise(f, "price")
+            + ranker.duration_weight * normalise(f, "duration_minutes")
+            + ranker.stops_weight * normalise(f, "stops"),
+            f["price"],
+            f["duration_minutes"],
+        )
+    else:
+        key = lambda f: (f["price"], f["duration_minutes"])
+    return sorted(candidates, key=key)[:limit]
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000], help="Candidate flights per pass")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    provider = SkyscannerProvider()
+    ranker = FlightRanker()
+    print(f"{'candidates':>10} {'sort':>10} {'python':>10} {'numpy':>10} {'speedup':>8}")
+    for size in args.sizes:
+        flights = provider.parse_results(generate_payload(itineraries=size, carriers=40))
+        airlines = sorted({f["airline_code"] for f in flights})[:20]
+        for sort_by in SearchSort:
+            request = FlightSearchRequest(
+                origin_code="AAA",
+                destination_code="BAA",
+                departure_date=datetime(2030, 3, 1),
+                max_stops=1,
+                max_price=1200,
+                preferred_airlines=airlines,
+                sort_by=sort_by,
+            )
+            expected = python_rank(ranker, flights, request, args.limit)
+            ranked = ranker.rank(flights, request, limit=args.limit)
+            assert [f["price"] for f in ranked] == [f["price"] for f in expected], f"{sort_by.value} order differs"
+
+            baseline = _time(lambda: python_rank(ranker, flights, request, args.limit), args.repeat)
+            vectorised = _time(lambda: ranker.rank(flights, request, limit=args.limit), args.repeat)
+            print(
+                f"{size:>10} {sort_by.value:>10} {baseline * 1000:>8.1f}ms {vectorised * 1000:>8.1f}ms "
+                f"{baseline / vectorised:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Provider calls and fares found with every region searched vs. learned region selection.
+
+Runs searches for a set of routes through FlightService.search_flights_stream
+(SQLite, cache and coalescing off) against a fake regional provider in which
+each route has one or two regions that usually price cheapest, plus noise.
+With --empty-regions the last regions never return flights, like regions
+a route is not sold in. Prints provider calls per search and how often, and by how much, the
+cheapest fare found misses the cheapest fare across all regions.
+
+    cd backend && python -m benchmarks.bench_region_selection --routes 20 --searches 400
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base
+from app.models import *  # noqa: F401,F403 - register all tables
+from app.schemas.flight import FlightSearchRequest
+from app.services.egress_pool import EgressPool
+from app.services.flight_service import FlightService
+from app.services.providers import FlightProvider, ProviderRegistry
+from app.services.region_selector import RegionSelector
+from app.services.search_cache import SearchCache
+from app.services.single_flight import SingleFlight
+
+
+def _rng(*parts: Any) -> random.Random:
+    return random.Random(int(hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:16], 16))
+
+
+class RegionPricedProvider(FlightProvider):
+    """Prices the same flights differently per region, deterministically per route and date."""
+
+    name = "region_priced"
+    regional = True
+
+    def __init__(self, regions: List[str], flights: int, noise: float, empty_regions: int = 0):
+        super().__init__(timeout=5.0, max_concurrency=1000)
+        self.regions = regions[:len(regions) - empty_regions]
+        self.flights = flights
+        self.noise = noise
+        self.calls = 0
+
+    def region_factor(self, request: FlightSearchRequest, region: str) -> float:
+        route = _rng(request.origin_code, request.destination_code)
+        cheap = set(route.sample(self.regions, route.choice([1, 2])))
+        base = 0.9 if region in cheap else 1.0 + _rng(request.origin_code, request.destination_code, region).uniform(0.02, 0.15)
+        return base * (1 + _rng(request.origin_code, request.destination_code, request.departure_date.date(), region).uniform(-self.noise, self.noise))
+
+    def cheapest(self, request: FlightSearchRequest, region: str) -> float:
+        return min(self.prices(request, region))
+
+    def prices(self, request: FlightSearchRequest, region: str) -> List[float]:
+        factor = self.region_factor(request, region)
+        fares = _rng(request.origin_code, request.destination_code, request.departure_date.date())
+        return [round(fares.uniform(100, 900) * factor, 2) for _ in range(self.flights)]
+
+    async def fetch(self, search_request: FlightSearchRequest, region: Optional[str], proxy_url: Optional[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        self.calls += 1
+        await asyncio.sleep(0)
+        if region not in self.regions:
+            return
+        departure = datetime.combine(search_request.departure_date.date(), datetime.min.time())
+        yield [
+            {
+                "flight_number": f"RP{i}",
+                "airline_code": "RP",
+                "airline_name": "Region Priced",
+                "origin_code": search_request.origin_code,
+                "origin_name": search_request.origin_code,
+                "destination_code": search_request.destination_code,
+                "destination_name": search_request.destination_code,
+                "departure_time": departure + timedelta(hours=i % 24),
+                "arrival_time": departure + timedelta(hours=i % 24 + 7),
+                "duration_minutes": 420,
+                "base_price": price * 0.8,
+                "currency": "USD",
+                "taxes": price * 0.15,
+                "fees": price * 0.05,
+                "price": price,
+                "stops": 0,
+                "is_direct": True,
+                "external_id": f"{region}-{i}",
+                "available_seats": None,
+                "booking_class": "Economy",
+                "aircraft_type": None,
+            }
+            for i, price in enumerate(self.prices(search_request, region))
+        ]
+
+    def normalise(self, raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return raw
+
+
+async def run_case(name: str, selector: RegionSelector, args, db_factory) -> None:
+    regions = settings.search_regions
+    provider = RegionPricedProvider(regions, args.flights, args.noise, args.empty_regions)
+    service = FlightService(
+        egress_pool=EgressPool(connections_per_region=4, health_check_interval=0),
+        providers=ProviderRegistry([provider]),
+        search_cache=SearchCache(enabled=False),
+        single_flight=SingleFlight(enabled=False),
+        region_selector=selector
+    )
+    routes = [(f"A{i:02d}", f"B{i:02d}") for i in range(args.routes)]
+    start_date = datetime(2030, 1, 1)
+    rng = random.Random(1)
+    db = db_factory()
+
+    matched = 0
+    overpay = 0.0
+    start = time.perf_counter()
+    for n in range(args.searches):
+        origin, destination = rng.choice(routes)
+        request = FlightSearchRequest(origin_code=origin, destination_code=destination, departure_date=start_date + timedelta(days=n))
+        page = await service.search_flights_page(db, request)
+        found = min(flight.total_price for flight in page.flights)
+        best = min(provider.cheapest(request, region) for region in provider.regions)
+        matched += found <= best + 0.005
+        overpay += found / best - 1
+    elapsed = time.perf_counter() - start
+    db.close()
+
+    print(
+        f"{name:<10} provider_calls/search={provider.calls / args.searches:.2f} "
+        f"cheapest_found={matched / args.searches:.1%} avg_overpay={overpay / args.searches:.2%} wall={elapsed:.1f}s"
+    )
+
+
+async def run(args) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db_factory = sessionmaker(bind=engine)
+    print(f"routes={args.routes} searches={args.searches} regions={len(settings.search_regions)} empty={args.empty_regions} noise=±{args.noise:.0%}")
+    await run_case("all", RegionSelector(enabled=False), args, db_factory)
+    await run_case(
+        "learned", RegionSelector(enabled=True, top_k=args.top_k, exploration_rate=args.exploration_rate, seed=1), args, db_factory
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", type=int, default=20)
+    parser.add_argument("--searches", type=int, default=400)
+    parser.add_argument("--flights", type=int, default=20, help="Flights per region response")
+    parser.add_argument("--noise", type=float, default=0.03, help="Per-search price noise per region")
+    parser.add_argument("--empty-regions", type=int, default=0, help="Regions that never return flights")
+    parser.add_argument("--top-k", type=int, default=settings.region_selection_top_k)
+    parser.add_argument("--exploration-rate", type=float, default=settings.region_selection_exploration_rate)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
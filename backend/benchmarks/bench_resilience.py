@@ -0,0 +1,119 @@
+"""Search tail latency with one bad upstream: plain fan-out vs. circuit breakers and hedging.
+
+Runs searches through FlightService._fetch_unique_flights against a fake
+regional provider. In the "dead-region" scenario one region never answers
+and every search waits out its timeout until the breaker opens. In the
+"stalls" scenario any call may stall before its first batch, and hedging
+fires a duplicate call once a call is later than the target's percentile.
+
+    cd backend && python -m benchmarks.bench_resilience --searches 600
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.schemas.flight import FlightSearchRequest
+from app.services.egress_pool import EgressPool
+from app.services.flight_service import FlightService
+from app.services.providers import FlightProvider, ProviderRegistry
+from app.services.resilience import UpstreamHealth
+
+REGIONS = ["US", "UK", "DE", "FR", "IT"]
+
+
+class FlakyRegionalProvider(FlightProvider):
+    """Answers after `latency`, except that `dead_region` hangs and any call may stall."""
+
+    name = "flaky"
+    regional = True
+
+    def __init__(self, latency: float, timeout: float, dead_region: Optional[str], stall_rate: float, stall: float, seed: int = 7):
+        super().__init__(timeout=timeout, max_concurrency=10_000)
+        self.latency = latency
+        self.dead_region = dead_region
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    async def fetch(self, search_request: FlightSearchRequest, region: Optional[str], proxy_url: Optional[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        self.calls += 1
+        if region == self.dead_region:
+            await asyncio.sleep(3600)
+        delay = self.latency + (self.stall if self.rng.random() < self.stall_rate else 0.0)
+        await asyncio.sleep(delay)
+        yield [{"flight_number": f"FL{region}{i}", "external_id": f"{region}-{i}", "price": 100.0 + i} for i in range(5)]
+
+    def normalise(self, raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return raw
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run_case(name: str, args, provider: FlakyRegionalProvider, health: UpstreamHealth) -> None:
+    service = FlightService(
+        egress_pool=EgressPool(connections_per_region=args.concurrency * 2, health_check_interval=0),
+        providers=ProviderRegistry([provider]),
+        upstream_health=health
+    )
+    request = FlightSearchRequest(origin_code="LHR", destination_code="JFK", departure_date=datetime.utcnow() + timedelta(days=30))
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+
+    async def one_search() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await service._fetch_unique_flights(request, REGIONS)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_search() for _ in range(args.searches)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    stats = health.get_stats()
+    print(
+        f"{name:<22} p50={_percentile(latencies, 50) * 1000:>6.0f}ms p95={_percentile(latencies, 95) * 1000:>6.0f}ms "
+        f"p99={_percentile(latencies, 99) * 1000:>6.0f}ms throughput={args.searches / wall:>6.1f}/s "
+        f"provider_calls={provider.calls} skipped={stats['skipped']} hedges={stats['hedges']} hedge_wins={stats['hedge_wins']}"
+    )
+
+
+async def run(args) -> None:
+    def provider(dead_region=None, stall_rate=0.0):
+        return FlakyRegionalProvider(args.latency, args.timeout, dead_region, stall_rate, args.stall)
+
+    print(f"dead-region: {REGIONS[-1]} never answers, timeout={args.timeout}s")
+    await run_case("no breakers", args, provider(REGIONS[-1]), UpstreamHealth(breakers_enabled=False, hedge_enabled=False))
+    await run_case("breakers", args, provider(REGIONS[-1]), UpstreamHealth(breakers_enabled=True, hedge_enabled=False))
+
+    print(f"stalls: {args.stall_rate:.0%} of calls stall {args.stall}s before answering")
+    await run_case("no hedging", args, provider(stall_rate=args.stall_rate), UpstreamHealth(breakers_enabled=False, hedge_enabled=False))
+    await run_case(
+        f"hedging at p{args.hedge_percentile:g}", args, provider(stall_rate=args.stall_rate),
+        UpstreamHealth(breakers_enabled=False, hedge_enabled=True, hedge_percentile=args.hedge_percentile, hedge_min_samples=20, hedge_min_delay=0.0)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Normal time to first batch in seconds")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Per-call provider timeout in seconds")
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall", type=float, default=0.8, help="Extra delay of a stalled call in seconds")
+    parser.add_argument("--hedge-percentile", type=float, default=90.0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""End-to-end load on POST /flights/search against the local Skyscanner stand-in.
+
+Sends N searches at a fixed concurrency and prints p50/p95/p99 latency,
+throughput, status codes and provider calls per search (read from the
+stand-in's /stats). Each search uses its own departure date unless
+--distinct is smaller than --requests, so the search cache and coalescing
+only help when asked to.
+
+The app is served in-process with get_db overridden to yield a synchronous
+session, which is what the services are written against. The bench user is
+registered on first use. --app-url loads a running backend instead. The run
+fails when more than --max-error-rate of the searches are not 2xx.
+
+    cd backend && python -m benchmarks.fake_skyscanner_server --port 8900 &
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db SKYSCANNER_BASE_URL=http://localhost:8900/apiservices SKYSCANNER_API_KEY=local \
+        python -m benchmarks.bench_search_load --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+IN_PROCESS_URL = "http://localhost"
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def _login(client: httpx.AsyncClient, username: str, password: str, register: bool = False) -> str:
+    credentials = {"username": username, "password": password}
+    response = await client.post("/auth/login", json=credentials)
+    if response.status_code == 401 and register:
+        registered = await client.post("/auth/register", json={
+            **credentials, "email": f"{username}@example.com", "first_name": "Load", "last_name": "Bench"
+        })
+        registered.raise_for_status()
+        response = await client.post("/auth/login", json=credentials)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _sync_db() -> AsyncIterator[Any]:
+    from app.database import get_sync_sessionmaker
+
+    db = get_sync_sessionmaker()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def _in_process_app() -> AsyncIterator[httpx.ASGITransport]:
+    """Run the app's lifespan with get_db yielding synchronous sessions."""
+    from app.database import get_db
+    from app.main import app
+
+    app.dependency_overrides[get_db] = _sync_db
+    try:
+        async with app.router.lifespan_context(app):
+            yield httpx.ASGITransport(app=app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+async def _stub_stats(stub: Optional[httpx.AsyncClient]) -> Dict[str, int]:
+    if stub is None:
+        return {}
+    response = await stub.get("/stats")
+    response.raise_for_status()
+    return response.json()
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    stub: Optional[httpx.AsyncClient],
+    token: str,
+    requests: int,
+    concurrency: int,
+    distinct: int,
+    origin: str = "LHR",
+    destination: str = "JFK"
+) -> Dict[str, Any]:
+    """Fire `requests` searches through `client`, at most `concurrency` at a time."""
+    start_date = datetime.utcnow() + timedelta(days=30)
+    bodies = [
+        {
+            "origin_code": origin,
+            "destination_code": destination,
+            "departure_date": (start_date + timedelta(days=i % distinct)).isoformat()
+        }
+        for i in range(requests)
+    ]
+    headers = {"Authorization": f"Bearer {token}"}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async def one_search(body: Dict[str, Any]) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post("/flights/search", json=body, headers=headers)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    before = await _stub_stats(stub)
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one_search(body) for body in bodies))
+    wall = time.perf_counter() - wall_start
+    after = await _stub_stats(stub)
+
+    latencies.sort()
+    provider = {key: after[key] - before.get(key, 0) for key in ("sessions", "polls", "injected_errors") if key in after}
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall": wall,
+        "throughput": requests / wall if wall else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "statuses": dict(statuses),
+        "provider": provider,
+    }
+
+
+def error_rate(report: Dict[str, Any]) -> float:
+    """Share of searches that did not get a 2xx response."""
+    failed = sum(count for status, count in report["statuses"].items() if not (isinstance(status, int) and 200 <= status < 300))
+    return failed / report["requests"] if report["requests"] else 0.0
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"requests={report['requests']} concurrency={report['concurrency']} wall={report['wall']:.2f}s "
+        f"throughput={report['throughput']:.1f}/s"
+    )
+    print(f"latency p50={report['p50'] * 1000:.0f}ms p95={report['p95'] * 1000:.0f}ms p99={report['p99'] * 1000:.0f}ms")
+    print(f"statuses={report['statuses']} errors={error_rate(report):.1%}")
+    provider = report["provider"]
+    if provider:
+        searches = report["requests"]
+        print(
+            f"provider sessions/search={provider['sessions'] / searches:.2f} "
+            f"polls/search={provider['polls'] / searches:.2f} "
+            f"calls/search={(provider['sessions'] + provider['polls']) / searches:.2f} "
+            f"injected_errors={provider['injected_errors']}"
+        )
+
+
+async def _load(args, client: httpx.AsyncClient) -> Dict[str, Any]:
+    token = args.token or await _login(client, args.username, args.password, register=not args.app_url)
+    stub = httpx.AsyncClient(base_url=args.stub_url) if args.stub_url else None
+    try:
+        return await run_load(client, stub, token, args.requests, args.concurrency, args.distinct or args.requests)
+    finally:
+        if stub is not None:
+            await stub.aclose()
+
+
+async def run(args) -> Dict[str, Any]:
+    if args.app_url:
+        async with httpx.AsyncClient(base_url=args.app_url, timeout=args.timeout) as client:
+            return await _load(args, client)
+    async with _in_process_app() as transport:
+        async with httpx.AsyncClient(transport=transport, base_url=IN_PROCESS_URL, timeout=args.timeout) as client:
+            return await _load(args, client)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-url", default="", help="Running backend to load; empty to serve the app in-process")
+    parser.add_argument("--stub-url", default="http://localhost:8900", help="Stand-in to read provider call counts from; empty to skip")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--distinct", type=int, default=0, help="Distinct searches to cycle through (default: all distinct)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Client timeout per search in seconds")
+    parser.add_argument("--token", help="Bearer token; otherwise log in with --username/--password")
+    parser.add_argument("--username", default="bench")
+    parser.add_argument("--password", default="bench")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Share of non-2xx searches above which the run fails")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if error_rate(report) > args.max_error_rate:
+        sys.exit(f"FAILED: {error_rate(report):.1%} of searches were not 2xx (limit {args.max_error_rate:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Provider calls under duplicate-search concurrency, with and without coalescing.
+
+Fires N identical searches at once through FlightService.search_flights_stream
+against the staged fake provider and counts provider sessions created. The
+search cache is disabled so only coalescing is measured.
+
+    cd backend && python -m benchmarks.bench_single_flight --levels 1 10 50 200
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import *  # noqa: F401,F403 - register all tables
+from app.schemas.flight import FlightSearchRequest
+from app.services.egress_pool import EgressPool
+from app.services.flight_service import FlightService
+from app.services.providers import ProviderRegistry, SkyscannerProvider
+from app.services.search_cache import SearchCache
+from app.services.single_flight import SingleFlight
+from benchmarks.bench_live_pricing import FakeClientPool
+from benchmarks.fake_skyscanner import StagedSkyscannerTransport, generate_payload
+
+
+async def run_level(concurrency: int, coalesce: bool, db_factory, payload) -> None:
+    transport = StagedSkyscannerTransport(payload, stages=3, stage_interval=0.2)
+    service = FlightService(
+        egress_pool=EgressPool(connections_per_region=max(concurrency, 1), health_check_interval=0),
+        providers=ProviderRegistry([SkyscannerProvider(http_clients=FakeClientPool(transport), api_key="benchmark")]),
+        search_cache=SearchCache(enabled=False),
+        single_flight=SingleFlight(enabled=coalesce)
+    )
+    request = FlightSearchRequest(origin_code="LHR", destination_code="JFK", departure_date=datetime.utcnow() + timedelta(days=30))
+    db = db_factory()
+
+    async def one_search() -> None:
+        async for _ in service.search_flights_stream(db, request):
+            pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_search() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    db.close()
+
+    print(
+        f"{'coalesced' if coalesce else 'baseline':<10} concurrency={concurrency:<4} "
+        f"provider_sessions={transport.session_requests:<5} polls={transport.poll_requests:<6} wall={elapsed:.2f}s"
+    )
+
+
+async def run(levels, itineraries: int) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db_factory = sessionmaker(bind=engine)
+    payload = generate_payload(itineraries=itineraries)
+
+    for coalesce in (False, True):
+        for concurrency in levels:
+            await run_level(concurrency, coalesce, db_factory, payload)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 50, 200], help="Duplicate concurrency levels")
+    parser.add_argument("--itineraries", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.levels, args.itineraries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Offline stand-ins for the Skyscanner live-pricing API.
+
+generate_payload() builds deterministic synthetic session payloads and
+StagedSkyscannerTransport serves them through httpx, releasing itineraries in
+stages the way a real live-pricing session fills up.
+"""
+import asyncio
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import httpx
+
+SESSION_PATH = "/pricing/v1.0"
+RESULTS_PATH = "/pricing/uk2/v1.0/"
+
+
+def generate_payload(
+    itineraries: int = 500,
+    legs: Optional[int] = None,
+    carriers: int = 40,
+    places: int = 60,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """Build a complete Skyscanner-shaped payload with the given sizes."""
+    rng = random.Random(seed)
+    legs = legs or itineraries
+    base = datetime(2030, 3, 1, 6, 0)
+
+    place_rows = [
+        {"Id": 1000 + i, "Code": f"{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}{chr(65 + i // 676 % 26)}", "Name": f"Airport {i}"}
+        for i in range(places)
+    ]
+    carrier_rows = [
+        {"Id": 2000 + i, "Code": f"{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}", "Name": f"Carrier {i}"}
+        for i in range(carriers)
+    ]
+
+    leg_rows = []
+    for i in range(legs):
+        departure = base + timedelta(minutes=rng.randrange(0, 60 * 24 * 2, 5))
+        arrival = departure + timedelta(minutes=rng.randrange(60, 60 * 14, 5))
+        stops = rng.choice([0, 0, 0, 1, 1, 2])
+        leg_rows.append({
+            "Id": f"leg-{i}",
+            "Carriers": [carrier_rows[rng.randrange(carriers)]["Id"]],
+            "FlightNumber": str(rng.randrange(100, 9999)),
+            "OriginStation": place_rows[0]["Id"],
+            "DestinationStation": place_rows[1]["Id"],
+            "Departure": departure.isoformat() + "Z",
+            "Arrival": arrival.isoformat() + "Z",
+            "Stops": [place_rows[rng.randrange(2, places)]["Id"] for _ in range(stops)],
+        })
+
+    itinerary_rows = []
+    for i in range(itineraries):
+        options = [
+            {
+                "Price": round(rng.uniform(60, 1500), 2),
+                "Agents": [rng.randrange(1, 500)],
+                "DeeplinkUrl": f"https://example.invalid/book/{i}/{j}?token={uuid.UUID(int=rng.getrandbits(128)).hex}"
+            }
+            for j in range(rng.randint(1, 4))
+        ]
+        itinerary_rows.append({
+            "OutboundLegId": leg_rows[i % legs]["Id"],
+            "InboundLegId": None,
+            "PricingOptions": options,
+        })
+
+    return {
+        "SessionKey": "synthetic",
+        "Status": "UpdatesComplete",
+        "Itineraries": itinerary_rows,
+        "Legs": leg_rows,
+        "Carriers": carrier_rows,
+        "Places": place_rows,
+    }
+
+
+class StagedSkyscannerTransport(httpx.AsyncBaseTransport):
+    """httpx transport that fakes live-pricing sessions filling up over time.
+
+    A session reveals ceil(n * stage / stages) itineraries, with one more stage
+    every stage_interval seconds after creation, and reports UpdatesComplete
+    once the last stage is reached.
+    """
+
+    def __init__(self, payload: Dict[str, Any], stages: int = 4, stage_interval: float = 0.5, latency: float = 0.0):
+        self.payload = payload
+        self.stages = stages
+        self.stage_interval = stage_interval
+        self.latency = latency
+        self.sessions: Dict[str, float] = {}
+        self.session_requests = 0
+        self.poll_requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        path = request.url.path
+        if request.method == "POST" and path.endswith(SESSION_PATH):
+            self.session_requests += 1
+            session_key = uuid.uuid4().hex
+            self.sessions[session_key] = time.monotonic()
+            location = str(request.url.copy_with(path=path.replace(SESSION_PATH, RESULTS_PATH) + session_key))
+            return httpx.Response(201, headers={"Location": location})
+
+        if request.method == "GET" and RESULTS_PATH in path:
+            self.poll_requests += 1
+            created = self.sessions.get(path.rsplit("/", 1)[-1])
+            if created is None:
+                return httpx.Response(410, json={"ValidationErrors": ["Session expired"]})
+            return httpx.Response(200, json=self.snapshot(time.monotonic() - created))
+
+        return httpx.Response(404)
+
+    def snapshot(self, elapsed: float) -> Dict[str, Any]:
+        """Return the session payload as it looks `elapsed` seconds after creation."""
+        stage = min(self.stages, int(elapsed / self.stage_interval) + 1)
+        itineraries = self.payload["Itineraries"]
+        visible = math.ceil(len(itineraries) * stage / self.stages)
+        return {
+            **self.payload,
+            "Status": "UpdatesComplete" if stage == self.stages else "UpdatesPending",
+            "Itineraries": itineraries[:visible],
+        }
@@ -0,0 +1,95 @@
+"""Local HTTP stand-in for the Skyscanner live-pricing endpoints.
+
+Serves the same staged sessions as StagedSkyscannerTransport over real HTTP
+so a running backend can be searched end to end without the live API. Point
+the backend at it through the environment:
+
+    cd backend && python -m benchmarks.fake_skyscanner_server --port 8900 --latency 0.05 --error-rate 0.01
+    SKYSCANNER_BASE_URL=http://localhost:8900/apiservices SKYSCANNER_API_KEY=local uvicorn app.main:app
+
+GET /stats returns how many sessions, polls and injected errors it served.
+"""
+import argparse
+import random
+from typing import Any, Dict
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from benchmarks.fake_skyscanner import SESSION_PATH, RESULTS_PATH, StagedSkyscannerTransport, generate_payload
+
+API_PREFIX = "/apiservices"
+
+
+def create_app(
+    itineraries: int = 500,
+    stages: int = 3,
+    stage_interval: float = 0.3,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    seed: int = 42
+) -> FastAPI:
+    """Build the stand-in app; every request fails with `error_status` with probability `error_rate`."""
+    transport = StagedSkyscannerTransport(
+        generate_payload(itineraries=itineraries, seed=seed),
+        stages=stages,
+        stage_interval=stage_interval,
+        latency=latency
+    )
+    rng = random.Random(seed)
+    stats: Dict[str, Any] = {"requests": 0, "injected_errors": 0}
+    app = FastAPI(title="Fake Skyscanner")
+
+    async def forward(request: Request) -> Response:
+        stats["requests"] += 1
+        if error_rate and rng.random() < error_rate:
+            stats["injected_errors"] += 1
+            return Response(status_code=error_status)
+        upstream = await transport.handle_async_request(
+            httpx.Request(request.method, str(request.url), content=await request.body())
+        )
+        headers = {k: v for k, v in upstream.headers.items() if k.lower() in ("location", "content-type")}
+        return Response(content=upstream.content, status_code=upstream.status_code, headers=headers)
+
+    app.add_api_route(API_PREFIX + SESSION_PATH, forward, methods=["POST"])
+    app.add_api_route(API_PREFIX + RESULTS_PATH + "{session_key}", forward, methods=["GET"])
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, Any]:
+        return {
+            **stats,
+            "sessions": transport.session_requests,
+            "polls": transport.poll_requests,
+            "open_sessions": len(transport.sessions),
+        }
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--itineraries", type=int, default=500, help="Itineraries per completed session")
+    parser.add_argument("--stages", type=int, default=3, help="Polls it takes a session to complete")
+    parser.add_argument("--stage-interval", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.0, help="Added delay per request in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    app = create_app(
+        itineraries=args.itineraries,
+        stages=args.stages,
+        stage_interval=args.stage_interval,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
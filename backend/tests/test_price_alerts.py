@@ -0,0 +1,169 @@
+from datetime import date
+from typing import Optional
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Notification, PriceAlert, User
+from app.schemas.flight import PriceAlertCreate
+from app.services.price_alerts import AlertIndex, PriceAlertService, travel_month
+
+ROUTE = ("LHR", "JFK", "2026-11")
+DEPARTURE = date(2026, 11, 14)
+
+
+class FixedRates:
+    """One EUR buys two USD."""
+
+    RATES = {"USD": 1.0, "EUR": 0.5}
+
+    def convert(self, amount: float, from_currency: str, to_currency: str) -> Optional[float]:
+        if from_currency not in self.RATES or to_currency not in self.RATES:
+            return None
+        return amount / self.RATES[from_currency] * self.RATES[to_currency]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(db) -> User:
+    user = User(email="alerts@example.com", username="alerts", first_name="A", last_name="B", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def service() -> PriceAlertService:
+    return PriceAlertService(exchange_rates=FixedRates(), max_per_user=3)
+
+
+def _alert(service, db, user, max_price: float, currency: str = "USD", month: str = "2026-11") -> PriceAlert:
+    return service.create_alert(db, user, PriceAlertCreate(
+        origin_code="lhr", destination_code="jfk", travel_month=month, max_price=max_price, currency=currency
+    ))
+
+
+def _ticks(*prices, currency: str = "USD", flight_id: Optional[int] = None):
+    return {("LHR", "JFK", DEPARTURE): [{"price": price, "currency": currency, "flight_id": flight_id} for price in prices]}
+
+
+def test_index_claims_every_alert_at_or_above_the_fare():
+    index = AlertIndex()
+    index.replace([(1, *ROUTE, "USD", 300.0), (2, *ROUTE, "USD", 400.0), (3, *ROUTE, "USD", 399.99)])
+
+    claimed = index.claim(ROUTE, lambda currency: 400.0)
+
+    assert [alert_id for alert_id, *_ in claimed] == [2]
+    assert len(index) == 2
+    assert index.claim(ROUTE, lambda currency: 400.0) == []
+
+
+def test_index_matches_each_currency_separately():
+    index = AlertIndex()
+    index.replace([(1, *ROUTE, "USD", 300.0), (2, *ROUTE, "EUR", 300.0)])
+    prices = {"USD": 500.0, "EUR": 250.0}
+
+    assert [alert_id for alert_id, *_ in index.claim(ROUTE, prices.get)] == [2]
+    assert index.claim(("LHR", "JFK", "2026-12"), prices.get) == []
+
+
+def test_index_remove_and_restore():
+    index = AlertIndex()
+    index.add(1, ROUTE, "USD", 300.0)
+    index.add(2, ROUTE, "USD", 300.0)
+
+    assert index.remove(1, ROUTE, "USD", 300.0)
+    assert not index.remove(1, ROUTE, "USD", 300.0)
+    claimed = index.claim(ROUTE, lambda currency: 100.0)
+    index.restore(claimed)
+
+    assert len(index) == 1
+    assert index.get_stats() == {"alerts": 1, "routes": 1}
+
+
+def test_travel_month_is_normalised_and_validated():
+    assert travel_month(" 2026-11 ") == "2026-11"
+    for bad in ("2026-13", "November", "2026/11"):
+        with pytest.raises(ValueError):
+            travel_month(bad)
+
+
+def test_create_alert_enforces_the_per_user_limit(service, db, user):
+    for max_price in (100, 200, 300):
+        _alert(service, db, user, max_price)
+
+    with pytest.raises(ValueError):
+        _alert(service, db, user, 400)
+    with pytest.raises(ValueError):
+        _alert(PriceAlertService(exchange_rates=FixedRates()), db, user, 0)
+
+
+def test_fare_under_threshold_triggers_the_alert_once(service, db, user):
+    alert = _alert(service, db, user, 400)
+    _alert(service, db, user, 200)
+
+    assert service.notify_matches(db, _ticks(450.0, 380.0)) == 1
+    assert service.notify_matches(db, _ticks(150.0)) == 1
+    assert service.notify_matches(db, _ticks(100.0)) == 0
+
+    db.refresh(alert)
+    assert not alert.is_active
+    assert alert.triggered_price == 380.0
+    assert db.query(Notification).filter(Notification.user_id == user.id).count() == 2
+
+
+def test_fare_above_threshold_leaves_the_alert_active(service, db, user):
+    alert = _alert(service, db, user, 400)
+
+    assert service.notify_matches(db, _ticks(400.01)) == 0
+    db.refresh(alert)
+    assert alert.is_active
+    assert len(service.index) == 1
+
+
+def test_fare_is_converted_to_the_alert_currency(service, db, user):
+    alert = _alert(service, db, user, 220, currency="eur")
+
+    assert service.notify_matches(db, _ticks(460.0)) == 0
+    assert service.notify_matches(db, _ticks(440.0)) == 1
+    db.refresh(alert)
+    assert alert.triggered_price == 220.0
+
+
+def test_other_months_do_not_match(service, db, user):
+    _alert(service, db, user, 400, month="2026-12")
+
+    assert service.notify_matches(db, _ticks(100.0)) == 0
+
+
+def test_deleted_alert_is_not_matched(service, db, user):
+    alert = _alert(service, db, user, 400)
+    assert service.delete_alert(db, user, alert.id)
+
+    assert service.notify_matches(db, _ticks(100.0)) == 0
+    assert len(service.index) == 0
+
+
+def test_failed_notification_keeps_the_alert_active(service, db, user):
+    alert = _alert(service, db, user, 400)
+
+    def fail(*args):
+        raise RuntimeError("notifications unavailable")
+
+    service.notification_service.price_alert_notification = fail
+    assert service.notify_matches(db, _ticks(100.0)) == 0
+    assert service.stats["match_errors"] == 1
+    assert len(service.index) == 1
+    db.refresh(alert)
+    assert alert.is_active
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from app.schemas.flight import FlightSearchRequest, SearchSort
+from app.services.ranking import FlightRanker
+
+
+def _request(**overrides) -> FlightSearchRequest:
+    fields = {"origin_code": "LHR", "destination_code": "JFK", "departure_date": datetime(2026, 11, 1, 9)}
+    return FlightSearchRequest(**{**fields, **overrides})
+
+
+def _flight(flight_number: str, price: float, duration: int, stops: int = 0, airline: str = "BA"):
+    return {"flight_number": flight_number, "price": price, "duration_minutes": duration, "stops": stops, "airline_code": airline}
+
+
+FLIGHTS = [
+    _flight("A", 300, 600, stops=1, airline="AA"),
+    _flight("B", 200, 700, stops=2),
+    _flight("C", 200, 500),
+    _flight("D", 450, 420, airline="VS"),
+]
+
+
+def _numbers(flights):
+    return [f["flight_number"] for f in flights]
+
+
+def test_cheapest_breaks_price_ties_on_duration():
+    assert _numbers(FlightRanker().rank(FLIGHTS, _request())) == ["C", "B", "A", "D"]
+
+
+def test_fastest_orders_by_duration():
+    assert _numbers(FlightRanker().rank(FLIGHTS, _request(sort_by=SearchSort.FASTEST))) == ["D", "C", "A", "B"]
+
+
+def test_best_value_blends_price_duration_and_stops():
+    ranker = FlightRanker(price_weight=0.5, duration_weight=0.5, stops_weight=0.0)
+
+    # B and D score the same; the cheaper one goes first
+    assert _numbers(ranker.rank(FLIGHTS, _request(sort_by=SearchSort.BEST_VALUE))) == ["C", "B", "D", "A"]
+
+
+def test_filters_on_stops_price_and_airlines():
+    ranker = FlightRanker()
+
+    assert _numbers(ranker.rank(FLIGHTS, _request(max_stops=0))) == ["C", "D"]
+    assert _numbers(ranker.rank(FLIGHTS, _request(max_price=300))) == ["C", "B", "A"]
+    assert _numbers(ranker.rank(FLIGHTS, _request(preferred_airlines=[" vs", "AA", "ZZ"]))) == ["A", "D"]
+    assert ranker.rank(FLIGHTS, _request(preferred_airlines=["ZZ"])) == []
+
+
+def test_limit_keeps_the_same_leading_order():
+    ranker = FlightRanker()
+    flights = [_flight(str(i), price=100 + (i * 37) % 50, duration=300 + i) for i in range(200)]
+    full = ranker.rank(flights, _request())
+
+    assert ranker.rank(flights, _request(), limit=10) == full[:10]
+    assert len(ranker.rank(FLIGHTS, _request(), limit=10)) == 4
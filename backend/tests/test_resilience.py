@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.schemas.flight import FlightSearchRequest
+from app.services import resilience as resilience_module
+from app.services.egress_pool import EgressPool
+from app.services.flight_service import FlightService
+from app.services.providers import LocalFakeProvider, ProviderRegistry
+from app.services.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, UpstreamHealth
+from app.services.vpn_service import VPNService
+
+
+@pytest.fixture
+def breaker(clock, monkeypatch) -> CircuitBreaker:
+    monkeypatch.setattr(resilience_module, "time", clock)
+    return CircuitBreaker(failure_threshold=3, latency_threshold=2.0, open_seconds=30)
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.get_stats()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(0.5)
+    breaker.record_failure()
+
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 1
+
+
+def test_slow_calls_count_as_failures(breaker):
+    for _ in range(3):
+        breaker.record_success(2.5)
+
+    assert breaker.state == OPEN
+    assert breaker.stats["slow_calls"] == 3
+
+
+def test_lets_one_probe_through_after_open_seconds(breaker, clock):
+    _open(breaker)
+    clock.advance(29)
+    assert not breaker.allow()
+
+    clock.advance(1)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_good_probe_closes(breaker, clock):
+    _open(breaker)
+    clock.advance(30)
+    breaker.allow()
+    breaker.record_success(0.5)
+
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_bad_probe_reopens(breaker, clock):
+    _open(breaker)
+    clock.advance(30)
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats["opened"] == 2
+
+
+def test_lost_probe_is_replaced(breaker, clock):
+    _open(breaker)
+    clock.advance(30)
+    assert breaker.allow()
+
+    clock.advance(30)
+    assert breaker.allow()
+
+
+def test_breakers_are_per_region():
+    health = UpstreamHealth(breakers_enabled=True)
+    for _ in range(health.breaker("skyscanner", "IT").failure_threshold):
+        health.record_failure("skyscanner", "IT")
+
+    assert not health.allow("skyscanner", "IT")
+    assert health.allow("skyscanner", "US")
+    assert health.stats["skipped"] == 1
+
+
+class RegionalFake(LocalFakeProvider):
+    name = "regional_fake"
+    regional = True
+
+
+async def _search_repeatedly(provider: LocalFakeProvider, times: int) -> UpstreamHealth:
+    health = UpstreamHealth(breakers_enabled=True, hedge_enabled=False)
+    service = FlightService(
+        egress_pool=EgressPool(VPNService(), health_check_interval=0),
+        upstream_health=health,
+        providers=ProviderRegistry([provider]),
+    )
+    request = FlightSearchRequest(origin_code="LHR", destination_code="JFK", departure_date=datetime.utcnow() + timedelta(days=9))
+    for _ in range(times):
+        await service._search_regions(request, ["US"])
+    return health
+
+
+async def test_timeout_after_results_does_not_trip_the_breaker():
+    provider = RegionalFake(latency=0.05, batches=5, flights_per_search=10, timeout=0.12)
+    threshold = CircuitBreaker().failure_threshold
+    health = await _search_repeatedly(provider, threshold)
+
+    assert provider.stats["timeouts"] == threshold
+    assert provider.stats["flights"] > 0
+    assert health.breaker(provider.name, "US").state == CLOSED
+
+
+async def test_timeout_without_results_trips_the_breaker():
+    provider = RegionalFake(latency=0.3, batches=1, flights_per_search=10, timeout=0.05)
+    threshold = CircuitBreaker().failure_threshold
+    health = await _search_repeatedly(provider, threshold)
+
+    assert health.breaker(provider.name, "US").state == OPEN
+    assert not health.allow(provider.name, "US")
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import flights as flights_api
+from app.services import result_store as result_store_module
+from app.services.result_store import SearchResultStore
+
+
+@pytest.fixture
+def store(clock, monkeypatch) -> SearchResultStore:
+    monkeypatch.setattr(result_store_module, "time", clock)
+    return SearchResultStore(ttl=60, max_bytes=1_000_000, max_entries=10)
+
+
+@pytest.fixture
+def client(store, monkeypatch) -> TestClient:
+    monkeypatch.setattr(flights_api.flight_service, "result_store", store)
+    app = FastAPI()
+    app.include_router(flights_api.router)
+    return TestClient(app)
+
+
+def _flight(i: int):
+    return {
+        "id": i, "flight_number": f"BA{i}", "airline_code": "BA", "airline_name": "British Airways",
+        "origin_code": "LHR", "origin_name": "Heathrow", "destination_code": "JFK", "destination_name": "John F. Kennedy",
+        "departure_time": datetime(2026, 11, 1, 9), "arrival_time": datetime(2026, 11, 1, 17), "duration_minutes": 480,
+        "base_price": 80.0 + i, "currency": "USD", "taxes": 15.0, "fees": 5.0, "total_price": 100.0 + i,
+        "stops": 0, "is_direct": True, "created_at": datetime(2026, 10, 17),
+    }
+
+
+def test_cursor_round_trips():
+    cursor = SearchResultStore.encode_cursor("abc", 50)
+
+    assert SearchResultStore.decode_cursor(cursor) == ("abc", 50)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", SearchResultStore.encode_cursor("abc", -1)])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        SearchResultStore.decode_cursor(cursor)
+
+
+def test_pages_follow_ranked_order(store):
+    result_id, kept = store.put([_flight(i) for i in range(5)])
+
+    flights, total = store.page(result_id, 2, 2)
+    assert (kept, total) == (5, 5)
+    assert [f["flight_number"] for f in flights] == ["BA2", "BA3"]
+    assert flights[0]["departure_time"] == datetime(2026, 11, 1, 9)
+
+
+def test_result_expires_after_ttl(store, clock):
+    result_id, _ = store.put([_flight(1)])
+    clock.advance(61)
+
+    assert store.page(result_id, 0, 10) is None
+    assert store.get_stats()["results"] == 0
+    assert store.stats["expired"] == 1
+
+
+def test_oversized_result_is_truncated_and_old_results_evicted(clock, monkeypatch):
+    monkeypatch.setattr(result_store_module, "time", clock)
+    store = SearchResultStore(ttl=60, max_bytes=2000, max_entries=2)
+
+    first, _ = store.put([_flight(1)])
+    _, kept = store.put([_flight(i) for i in range(20)])
+    store.put([_flight(2)])
+
+    assert 0 < kept < 20
+    assert store.page(first, 0, 10) is None
+    assert store.get_stats()["bytes"] <= 2000
+
+
+def test_endpoint_pages_through_results(client, store):
+    result_id, _ = store.put([_flight(i) for i in range(3)])
+
+    response = client.get("/flights/search/results", params={"cursor": store.encode_cursor(result_id, 0), "limit": 2})
+    assert response.status_code == 200
+    page = response.json()
+    assert [f["flight_number"] for f in page["flights"]] == ["BA0", "BA1"]
+    assert page["total"] == 3
+
+    response = client.get("/flights/search/results", params={"cursor": page["next_cursor"], "limit": 2})
+    assert [f["flight_number"] for f in response.json()["flights"]] == ["BA2"]
+    assert response.json()["next_cursor"] is None
+
+
+def test_endpoint_answers_410_for_an_expired_result(client, store, clock):
+    result_id, _ = store.put([_flight(1)])
+    clock.advance(61)
+
+    response = client.get("/flights/search/results", params={"cursor": store.encode_cursor(result_id, 0)})
+    assert response.status_code == 410
+
+
+def test_endpoint_answers_400_for_a_malformed_cursor(client):
+    response = client.get("/flights/search/results", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
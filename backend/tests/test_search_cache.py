@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.schemas.flight import FlightSearchRequest
+from app.services import search_cache as search_cache_module
+from app.services.search_cache import SearchCache, _decode, _encode
+
+
+@pytest.fixture
+def cache(clock, monkeypatch) -> SearchCache:
+    monkeypatch.setattr(search_cache_module, "time", clock)
+    return SearchCache(redis_url="", ttl=60, stale_ttl=30, max_local_entries=3, enabled=True)
+
+
+def _request(**overrides) -> FlightSearchRequest:
+    fields = {"origin_code": "LHR", "destination_code": "JFK", "departure_date": datetime(2026, 11, 1, 9)}
+    return FlightSearchRequest(**{**fields, **overrides})
+
+
+async def test_entry_is_fresh_within_ttl(cache, clock):
+    await cache.set("k", ["flight"])
+    clock.advance(60)
+
+    assert await cache.get("k") == (["flight"], True)
+    assert await cache.peek("k") == ["flight"]
+    assert cache.stats["hits"] == 1
+
+
+async def test_entry_is_served_stale_after_ttl(cache, clock):
+    await cache.set("k", ["flight"])
+    clock.advance(61)
+
+    assert await cache.get("k") == (["flight"], False)
+    assert await cache.peek("k") is None
+    assert cache.stats["stale_hits"] == 1
+
+
+async def test_entry_expires_after_stale_window(cache, clock):
+    await cache.set("k", ["flight"])
+    clock.advance(91)
+
+    assert await cache.get("k") is None
+    assert cache.stats["misses"] == 1
+    assert cache.get_stats()["local_entries"] == 0
+
+
+async def test_disabled_cache_stores_nothing(cache):
+    cache.enabled = False
+    await cache.set("k", ["flight"])
+
+    assert await cache.get("k") is None
+
+
+async def test_least_recently_used_entry_is_evicted(cache):
+    for key in ("a", "b", "c"):
+        await cache.set(key, [key])
+    await cache.get("a")
+    await cache.set("d", ["d"])
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == (["a"], True)
+
+
+async def test_background_refresh_replaces_stale_entry_once(cache, clock):
+    await cache.set("k", ["old"])
+    clock.advance(61)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return ["new"]
+
+    cache.refresh_in_background("k", fetch)
+    cache.refresh_in_background("k", fetch)
+    await asyncio.gather(*cache._background)
+
+    assert calls == 1
+    assert await cache.get("k") == (["new"], True)
+    assert cache.stats["refreshes"] == 1
+
+
+async def test_empty_refresh_keeps_stale_entry(cache, clock):
+    await cache.set("k", ["old"])
+    clock.advance(61)
+
+    async def fetch():
+        return []
+
+    cache.refresh_in_background("k", fetch)
+    await asyncio.gather(*cache._background)
+
+    assert await cache.get("k") == (["old"], False)
+    assert cache.stats["empty_refreshes"] == 1
+
+
+async def test_failed_refresh_keeps_stale_entry_and_allows_retry(cache, clock):
+    await cache.set("k", ["old"])
+    clock.advance(61)
+
+    async def fetch():
+        raise RuntimeError("provider down")
+
+    cache.refresh_in_background("k", fetch)
+    await asyncio.gather(*cache._background)
+
+    assert await cache.get("k") == (["old"], False)
+    assert cache.stats["refresh_errors"] == 1
+    assert "k" not in cache._refreshing
+
+
+def test_key_ignores_result_filters_but_not_fare_context():
+    base = SearchCache.make_key(_request())
+
+    assert SearchCache.make_key(_request(max_stops=0, max_price=300, preferred_airlines=["BA"])) == base
+    assert SearchCache.make_key(_request(origin_code=" lhr ")) == base
+    assert SearchCache.make_key(_request(passengers=2)) != base
+    assert SearchCache.make_key(_request(preferred_currency="EUR")) != base
+
+
+def test_redis_encoding_round_trips_datetimes():
+    value = [{"departure_time": datetime(2026, 11, 1, 9, 30), "price": 120.5}]
+
+    assert _decode(_encode(value)) == value
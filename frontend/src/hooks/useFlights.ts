@@ -20,6 +20,19 @@ export const useFlightSearch = (searchRequest: FlightSearchRequest) => {
   );
 };
 
+// Airport typeahead hook; pass an already debounced query
+export const useAirportSearch = (query: string) => {
+  return useQuery(
+    ['flights', 'airports', query],
+    () => flightService.searchAirports(query),
+    {
+      enabled: query.trim().length > 0,
+      staleTime: 60 * 60 * 1000, // 1 hour; reference data rarely changes
+      keepPreviousData: true
+    }
+  );
+};
+
 // Get flight by ID hook
 export const useFlight = (flightId: number) => {
   return useQuery(
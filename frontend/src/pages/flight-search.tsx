@@ -20,6 +20,7 @@ import {
 } from 'lucide-react';
 import { flightService, Flight, FlightSearchRequest } from '../services/flights';
 import { useDebounce } from '../hooks/useDebounce';
+import { useAirportSearch } from '../hooks/useFlights';
 import toast from 'react-hot-toast';
 
 interface SearchFilters {
@@ -60,6 +61,10 @@ const FlightSearch = () => {
   });
 
   const debouncedSearch = useDebounce(searchForm.watch(), 1000);
+  const debouncedOrigin = useDebounce(searchForm.watch('origin_code'), 150);
+  const debouncedDestination = useDebounce(searchForm.watch('destination_code'), 150);
+  const { data: originAirports = [] } = useAirportSearch(debouncedOrigin);
+  const { data: destinationAirports = [] } = useAirportSearch(debouncedDestination);
 
   const handleSearch = async (data: FlightSearchRequest) => {
     setIsLoading(true);
@@ -153,7 +158,14 @@ const FlightSearch = () => {
                   type="text"
                   placeholder="City or Airport"
                   className="input"
+                  list="origin-airports"
+                  autoComplete="off"
                 />
+                <datalist id="origin-airports">
+                  {originAirports.map(airport => (
+                    <option key={airport.code} value={airport.code}>{airport.city} – {airport.name}</option>
+                  ))}
+                </datalist>
               </div>
               <div>
                 <label className="block text-sm font-medium text-gray-700 mb-2">To</label>
@@ -162,7 +174,14 @@ const FlightSearch = () => {
                   type="text"
                   placeholder="City or Airport"
                   className="input"
+                  list="destination-airports"
+                  autoComplete="off"
                 />
+                <datalist id="destination-airports">
+                  {destinationAirports.map(airport => (
+                    <option key={airport.code} value={airport.code}>{airport.city} – {airport.name}</option>
+                  ))}
+                </datalist>
               </div>
               <div>
                 <label className="block text-sm font-medium text-gray-700 mb-2">Departure</label>
@@ -55,6 +55,13 @@ export interface FlightSearchResponse {
   price_history: PriceHistory[];
 }
 
+export interface Airport {
+  code: string;
+  name: string;
+  city: string;
+  country: string;
+}
+
 export interface PriceHistory {
   id: number;
   search_id: number;
@@ -103,6 +110,12 @@ export const flightService = {
     return response.data;
   },
 
+  // Airport typeahead
+  searchAirports: async (query: string, limit: number = 8): Promise<Airport[]> => {
+    const response = await apiClient.get('/flights/airports', { params: { q: query, limit } });
+    return response.data;
+  },
+
   // Get flight by ID
   getFlight: async (flightId: number): Promise<Flight> => {
     const response = await apiClient.get(`/flights/${flightId}`);